@@ -1,5 +1,50 @@
-from ui.main_view import MainApp
+import sys
+from pathlib import Path
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_REPORT = "startup_profile.json"
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    profiling = PROFILE_FLAG in argv
+    catalog_path = None
+
+    if profiling:
+        # --profile-startup [libro.xlsx]: con un libro se mide tambien su carga
+        following = argv[argv.index(PROFILE_FLAG) + 1:]
+        if following and not following[0].startswith("--"):
+            catalog_path = Path(following[0])
+            if not catalog_path.exists():
+                print(f"El archivo {catalog_path} no existe")
+                return 2
+
+        # Se activa antes de importar la UI para medir tambien esos imports
+        from logic import startup_profile
+        startup_profile.enable()
+
+    from ui.main_view import MainApp
+
+    app = MainApp(catalog_path)
+    if profiling:
+        # Medir hasta que el catalogo quede cargado y cerrar la app
+        app.bind("<<CatalogLoaded>>", lambda e: app.after_idle(lambda: _finish_profile(app)))
+    app.mainloop()
+
+    if profiling:
+        # Codigo de salida 1 si no se cumplio el presupuesto (o la app se cerro antes)
+        report = getattr(app, "startup_report", None)
+        return 0 if report and report["dentro_del_presupuesto"] else 1
+    return 0
+
+def _finish_profile(app):
+    from logic import startup_profile
+
+    data = startup_profile.report()
+    print(startup_profile.format_report(data))
+    startup_profile.write_report(PROFILE_REPORT, data)
+    print(f"Reporte guardado en {PROFILE_REPORT}")
+    app.startup_report = data
+    app.destroy()
 
 if __name__ == "__main__":
-    app = MainApp()
-    app.mainloop()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Entorno comun de los scripts de bench/ (importarlo antes que logic).
+
+Los scripts se corren desde la raiz del repo, por ejemplo
+`python bench/bench_pipeline.py`. Usan una carpeta temporal como APP_ROOT
+(con la plantilla de correo del repo) y como carpeta de datos del usuario
+(COTIZACIONES_DATA_DIR), para no tocar data/ ni los datos reales: la bandeja
+de salida, las imagenes y los reportes de envio quedan ahi y se borran al
+terminar.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+WORK_DIR = Path(tempfile.mkdtemp(prefix="cotizaciones-bench-"))
+(WORK_DIR / "data").mkdir()
+shutil.copyfile(REPO_ROOT / "data" / "email_template.txt", WORK_DIR / "data" / "email_template.txt")
+os.environ["APP_ROOT"] = str(WORK_DIR)
+os.environ["COTIZACIONES_DATA_DIR"] = str(WORK_DIR / "usuario")
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
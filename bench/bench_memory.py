@@ -0,0 +1,76 @@
+"""Memoria del catalogo cargado: DataFrames compactos y registros para la UI.
+
+Arma un catalogo de 50.000 productos y 2.000 proveedores con el mismo
+lector de filas que usa la carga del libro (sin escribir un .xlsx) y
+compara:
+  - los DataFrames tal como se leen contra su forma compacta (Descripcion y
+    Foto categoricas cuando se repiten),
+  - la copia de la lista para la UI con to_dict(orient="records") contra
+    list_products() (registros con __slots__, sin la descripcion).
+
+Los numeros dependen de si pyarrow esta instalado (columnas de texto Arrow).
+
+    python bench/bench_memory.py
+"""
+import gc
+import random
+import tracemalloc
+
+import bench_env  # noqa: F401
+
+from logic import catalog_records, data_manager
+
+PRODUCTS = 50000
+SUPPLIERS = 2000
+
+def catalog_rows():
+    random.seed(1)
+    words = ("camara tornillo cable acero rojo azul pieza motor bomba valvula filtro sensor panel "
+             "soporte kit tubo codo brida").split()
+    descriptions = [" ".join(random.choices(words, k=random.randint(15, 40))) for _ in range(3000)]
+    fotos = [f"{random.getrandbits(256):064x}.jpg" for _ in range(2000)]
+    products = [("Nombre", "Descripcion", "Foto")] + [
+        (f"Producto {i} " + " ".join(random.choices(words, k=3)),
+         random.choice(descriptions) if i % 5 else f"Descripcion unica {i} " + random.choice(descriptions),
+         random.choice(fotos) if i % 3 == 0 else "")
+        for i in range(PRODUCTS)
+    ]
+    suppliers = [("Nombre", "Correo")] + [(f"Proveedor {i}", f"ventas{i}@prov{i % 300}.com") for i in range(SUPPLIERS)]
+    return products, suppliers
+
+def deep_mb(*frames) -> float:
+    return sum(df.memory_usage(deep=True).sum() for df in frames) / 1e6
+
+def traced_mb(build):
+    """MB que siguen ocupados por lo que retorna build()"""
+    gc.collect()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    return result, (after - before) / 1e6
+
+def main():
+    product_rows, supplier_rows = catalog_rows()
+    products = data_manager._rows_to_frame(product_rows, "Productos", data_manager.COLUMNS_PRODUCTS, ["Nombre"])
+    suppliers = data_manager._rows_to_frame(supplier_rows, "Proveedores", data_manager.COLUMNS_SUPPLIERS,
+                                            ["Nombre", "Correo"])
+    compact_products, compact_suppliers = data_manager._compact_catalog(products, suppliers)
+    assert compact_products.astype(str).equals(products.astype(str))
+
+    tracemalloc.start()
+    records, records_mb = traced_mb(lambda: products.to_dict(orient="records"))
+    del records
+    light, light_mb = traced_mb(lambda: catalog_records.product_records(compact_products))
+    assert len(light) == PRODUCTS
+    tracemalloc.stop()
+
+    print(f"{PRODUCTS} productos, {SUPPLIERS} proveedores (texto: {products['Nombre'].dtype})")
+    print(f"  DataFrames leidos:               {deep_mb(products, suppliers):6.1f} MB")
+    print(f"  DataFrames compactos:            {deep_mb(compact_products, compact_suppliers):6.1f} MB "
+          f"({', '.join(f'{c}: {compact_products[c].dtype}' for c in ('Descripcion', 'Foto'))})")
+    print(f"  lista para la UI con to_dict:    {records_mb:6.1f} MB")
+    print(f"  lista para la UI con registros:  {light_mb:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Envio masivo con hilos: tiempo de 40 envios segun la cantidad de hilos.
+
+Usa MemoryTransport con 0.1 s de latencia por mensaje (lo que tardaria
+Outlook o el servidor), sin limite de mensajes por segundo. Con 1 hilo el
+lote tarda ~4 s (como el envio en serie de antes, sin sus pausas fijas) y
+con N hilos ~4/N s.
+
+    python bench/bench_pipeline.py
+"""
+import contextlib
+import io
+import time
+
+import bench_env  # noqa: F401
+
+from logic import email_sender
+from logic.mail_transport import MemoryTransport
+
+SUPPLIERS = 40
+LATENCY = 0.1
+
+def main():
+    suppliers = [{"Nombre": f"Proveedor {i}", "Correo": f"ventas{i}@prov{i % 5}.com"} for i in range(SUPPLIERS)]
+    products = [{"Nombre": "Tornillo", "Descripcion": "Acero 1/4", "Foto": ""}]
+    print(f"{SUPPLIERS} envios, {LATENCY:g} s por mensaje")
+    for workers in (1, 4, 8):
+        transport = MemoryTransport(latency=LATENCY)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = email_sender.send_bulk_emails(suppliers, products, workers=workers,
+                                                    rate_per_second=0, transport=transport)
+        seconds = time.perf_counter() - start
+        sent = sum(1 for r in results if r.ok)
+        assert sent == SUPPLIERS and len(transport.outbox) == SUPPLIERS, (sent, len(transport.outbox))
+        print(f"  {workers} hilo(s): {seconds:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Respaldo por PowerShell con un programa de prueba en lugar de powershell.exe.
+
+Usa bench/powershell_stub.py (se puede correr en Linux) y verifica que
+PowerShellBridge:
+  - envie 100 mensajes con un solo proceso,
+  - informe el rechazo de un mensaje sin reiniciar el proceso,
+  - mate y reinicie el proceso si deja de responder o si termina,
+y compara el tiempo de 100 mensajes con un proceso por mensaje (como antes)
+contra un solo proceso para todo el lote.
+
+    python bench/bench_powershell.py
+"""
+import os
+import sys
+import time
+
+import bench_env
+
+from logic.email_sender import PowerShellBridge
+from logic.mail_transport import OutgoingMessage
+
+STUB = str(bench_env.REPO_ROOT / "bench" / "powershell_stub.py")
+MESSAGES = 100
+
+def message(to: str) -> OutgoingMessage:
+    return OutgoingMessage(to, "Solicitud de cotización", "Estimado proveedor:\náéíóú ñ \"comillas\" $(no se ejecuta)",
+                           cc="copia@example.com")
+
+def expect_error(bridge: PowerShellBridge, to: str, text: str) -> None:
+    try:
+        bridge.send(message(to))
+    except Exception as e:
+        assert text in str(e), str(e)
+        print(f"  {to}: {e}")
+    else:
+        raise AssertionError(f"{to} deberia fallar")
+
+def main():
+    if os.name == "nt":
+        # En Windows el .py no se puede ejecutar directo como programa
+        sys.exit("Este script usa un programa de prueba en lugar de powershell.exe: correrlo en Linux o macOS")
+    log_path = bench_env.WORK_DIR / "powershell_stub.log"
+    os.environ["PS_STUB_LOG"] = str(log_path)
+
+    bridge = PowerShellBridge(executable=STUB, timeout=2)
+    try:
+        for i in range(MESSAGES):
+            bridge.send(message(f"proveedor{i}@example.com"))
+        assert bridge.processes_started == 1, bridge.processes_started
+        print(f"{MESSAGES} mensajes con {bridge.processes_started} proceso")
+
+        expect_error(bridge, "bad@x.com", "Destinatario rechazado")
+        assert bridge.processes_started == 1
+        expect_error(bridge, "hang@x.com", "Timeout")
+        bridge.send(message("despues-del-cuelgue@example.com"))
+        expect_error(bridge, "die@x.com", "terminó inesperadamente")
+        bridge.send(message("despues-del-error@example.com"))
+        assert bridge.processes_started == 3, bridge.processes_started
+        print(f"{MESSAGES + 5} mensajes con {bridge.processes_started} procesos "
+              "(el primero, uno despues del cuelgue y otro despues del error)")
+    finally:
+        bridge.close()
+    started = sum(1 for line in log_path.read_text(encoding="utf-8").splitlines() if line.startswith("inicio"))
+    assert started == 3, started
+
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        single = PowerShellBridge(executable=STUB)
+        try:
+            single.send(message(f"proveedor{i}@example.com"))
+        finally:
+            single.close()
+    per_message = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bridge = PowerShellBridge(executable=STUB)
+    try:
+        for i in range(MESSAGES):
+            bridge.send(message(f"proveedor{i}@example.com"))
+    finally:
+        bridge.close()
+    one_process = time.perf_counter() - start
+
+    print(f"{MESSAGES} mensajes: un proceso por mensaje {per_message:.2f} s, un solo proceso {one_process:.2f} s")
+
+if __name__ == "__main__":
+    main()
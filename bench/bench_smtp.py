@@ -0,0 +1,97 @@
+"""SMTP: conexion por mensaje contra SmtpTransport (una conexion por hilo).
+
+Levanta un servidor SMTP local que acepta y descarta los mensajes (un hilo
+por conexion) y envia 200 correos con 1, 4 y 8 hilos. La referencia abre y
+cierra una conexion por mensaje, como hacia cada envio por Outlook; el
+transporte reutiliza la conexion de cada hilo entre mensajes.
+
+    python bench/bench_smtp.py [segundos de latencia por mensaje del servidor]
+"""
+import contextlib
+import io
+import socketserver
+import sys
+import threading
+import time
+
+import bench_env  # noqa: F401
+
+from logic import email_sender
+from logic.mail_transport import SmtpTransport
+
+MESSAGES = 200
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Lo minimo de SMTP para que smtplib entregue: responde 250 a todo y descarta los datos"""
+    latency = 0.0
+    received = 0
+    lock = threading.Lock()
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 sink listo")
+        for raw in self.rfile:
+            command = raw[:4].decode("ascii", "replace").upper()
+            if command == "EHLO":
+                self.reply("250-sink")
+                self.reply("250 8BITMIME")
+            elif command == "DATA":
+                self.reply("354 fin con <CRLF>.<CRLF>")
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                time.sleep(self.latency)
+                with self.lock:
+                    SinkHandler.received += 1
+                self.reply("250 aceptado")
+            elif command == "QUIT":
+                self.reply("221 chau")
+                return
+            else:
+                self.reply("250 ok")
+
+class PerMessageTransport(SmtpTransport):
+    """Referencia: una conexion nueva para cada mensaje"""
+
+    def send(self, message):
+        conn = self._connect()
+        try:
+            conn.sendmail(self.sender, self._recipients(message), self._payload(message))
+        finally:
+            conn.quit()
+        return self.name
+
+def main():
+    SinkHandler.latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    socketserver.ThreadingTCPServer.daemon_threads = True
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SinkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    suppliers = [{"Nombre": f"Proveedor {i}", "Correo": f"ventas{i}@prov{i % 5}.com"} for i in range(MESSAGES)]
+    products = [{"Nombre": "Tornillo", "Descripcion": "Acero 1/4", "Foto": ""}]
+    print(f"{MESSAGES} mensajes, latencia del servidor {SinkHandler.latency:g} s")
+    try:
+        for cls in (PerMessageTransport, SmtpTransport):
+            for workers in (1, 4, 8):
+                transport = cls(host, port, sender="compras@example.com", security="none")
+                before = SinkHandler.received
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = email_sender.send_bulk_emails(suppliers, products, "copia@example.com",
+                                                            workers=workers, rate_per_second=0,
+                                                            transport=transport)
+                seconds = time.perf_counter() - start
+                transport.close()
+                sent = sum(1 for r in results if r.ok)
+                assert sent == MESSAGES, [r.error for r in results if not r.ok][:3]
+                # Una transaccion DATA por mensaje (proveedor y CC van juntos)
+                assert SinkHandler.received - before == MESSAGES
+                print(f"  {cls.__name__:<20} {workers} hilo(s): {seconds:6.2f} s  {MESSAGES / seconds:5.0f} msg/s")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Snapshot del catalogo: leer el libro contra leer su snapshot.
+
+Genera un libro de 8.000 productos y 800 proveedores en una carpeta
+temporal y mide la lectura del Excel (openpyxl, o calamine si esta
+instalado), del snapshot Feather (si hay pyarrow) y del snapshot en JSON.
+Verifica que el snapshot devuelva las mismas hojas que el Excel y que un
+libro modificado no use el snapshot viejo.
+
+    python bench/bench_snapshot.py
+"""
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+import bench_env
+
+from logic import catalog_snapshot, data_manager
+
+PRODUCTS = 8000
+SUPPLIERS = 800
+
+def make_workbook(path, count=PRODUCTS):
+    products = pd.DataFrame({
+        "Nombre": [f"Producto {i}" for i in range(count)],
+        "Descripcion": [f"Descripcion del producto {i % 500}" for i in range(count)],
+        "Foto": [f"foto{i % 300}.jpg" if i % 3 == 0 else "" for i in range(count)],
+    })
+    suppliers = pd.DataFrame({
+        "Nombre": [f"Proveedor {i}" for i in range(SUPPLIERS)],
+        "Correo": [f"ventas{i}@prov{i % 60}.com" for i in range(SUPPLIERS)],
+    })
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        products.to_excel(writer, sheet_name="Productos", index=False)
+        suppliers.to_excel(writer, sheet_name="Proveedores", index=False)
+
+def timed_read(path):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        frames = data_manager._read_workbook(path)
+    return frames, data_manager.get_load_stats()["engine"], time.perf_counter() - start
+
+def same(a, b):
+    return all(x.reset_index(drop=True).astype(str).equals(y.reset_index(drop=True).astype(str)) for x, y in zip(a, b))
+
+def main():
+    path = bench_env.WORK_DIR / "catalogo.xlsx"
+    make_workbook(path)
+    print(f"Libro de {PRODUCTS} productos y {SUPPLIERS} proveedores")
+
+    excel, engine, seconds = timed_read(path)
+    print(f"  Excel ({engine}): {seconds:7.3f} s")
+
+    formats = [("feather", True)] if catalog_snapshot._has_pyarrow() else []
+    formats.append(("json", False))
+    has_pyarrow = catalog_snapshot._has_pyarrow
+    try:
+        for name, pyarrow in formats:
+            catalog_snapshot._has_pyarrow = lambda pyarrow=pyarrow: pyarrow
+            with contextlib.redirect_stdout(io.StringIO()):
+                data_manager._save_snapshot(path, *excel)
+            frames, engine, seconds = timed_read(path)
+            assert engine == "snapshot" and same(frames, excel), (name, engine)
+            print(f"  snapshot {name}: {seconds:7.3f} s")
+    finally:
+        catalog_snapshot._has_pyarrow = has_pyarrow
+
+    # Otro contenido: el snapshot no corresponde y se vuelve a leer el Excel
+    make_workbook(path, PRODUCTS - 1)
+    _, engine, _ = timed_read(path)
+    assert engine != "snapshot", engine
+    print("  libro modificado: se leyo el Excel")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Plantilla de correo: armar 1.000 mensajes de 200 productos.
+
+Compara el armado anterior (leer la plantilla y hacer str.format con la
+lista de productos para cada proveedor, copiado abajo como referencia) con
+la plantilla compilada: prepare() arma la lista una vez por lote y cada
+proveedor solo es un join. Antes de medir verifica que el texto sea el
+mismo con la plantilla del repo y con dos plantillas que usan la seccion
+{nota_imagenes}.
+
+    python bench/bench_template.py
+"""
+import time
+
+import bench_env  # noqa: F401
+
+from logic import email_sender
+from logic.email_template import compile_template
+
+RECIPIENTS = 1000
+PRODUCTS = 200
+
+def old_build_message(template: str, supplier_name: str, products: list[dict]) -> str:
+    """build_message antes de compilar la plantilla (referencia)"""
+    if not products:
+        product_lines = "No se especificaron productos."
+        has_images = False
+    else:
+        product_lines = []
+        has_images = False
+        for p in products:
+            nombre = str(p.get('Nombre', 'Sin nombre')).strip()
+            descripcion = str(p.get('Descripcion', 'Sin descripción')).strip()
+            foto = p.get('Foto', '').strip()
+            product_lines.append(f"- {nombre}: {descripcion}")
+            if foto:
+                has_images = True
+        product_lines = "\n".join(product_lines)
+
+    message = template.format(
+        nombre_proveedor=str(supplier_name).strip(),
+        lista_productos=product_lines
+    )
+
+    if has_images:
+        message = message.replace("{nota_imagenes}", "")
+        message = message.replace("{/nota_imagenes}", "")
+    else:
+        start_tag = "{nota_imagenes}"
+        end_tag = "{/nota_imagenes}"
+        start_pos = message.find(start_tag)
+        end_pos = message.find(end_tag)
+        if start_pos != -1 and end_pos != -1:
+            message = message[:start_pos] + message[end_pos + len(end_tag):]
+
+    return message
+
+def old_load_template() -> str:
+    with open(email_sender.TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+def main():
+    products = [
+        {"Nombre": f"Producto {i}", "Descripcion": "Descripcion larga del producto " * 3,
+         "Foto": "x.jpg" if i % 3 == 0 else ""}
+        for i in range(PRODUCTS)
+    ]
+    names = [f"  Proveedor {i} " for i in range(RECIPIENTS)]
+
+    templates = [
+        old_load_template(),
+        "Hola {nombre_proveedor}\n{{nota_imagenes}}Ver fotos, {nombre_proveedor}{{/nota_imagenes}}\n"
+        "{lista_productos}\nChao {nombre_proveedor!r}",
+        "A {nombre_proveedor}{{nota_imagenes}}x{{/nota_imagenes}}{lista_productos}",
+    ]
+    for template in templates:
+        for batch in (products, products[1:3], []):
+            for name in names[:3]:
+                expected = old_build_message(template, name, batch)
+                assert email_sender.build_message(template, name, batch) == expected
+                assert compile_template(template).prepare(batch).render(name) == expected
+    print("Mismo texto que el armado anterior")
+
+    start = time.perf_counter()
+    for name in names:
+        old_build_message(old_load_template(), name, products)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prepared = email_sender.get_compiled_template().prepare(products)
+    for name in names:
+        prepared.render(name)
+    after = time.perf_counter() - start
+
+    print(f"{RECIPIENTS} proveedores x {PRODUCTS} productos:")
+    print(f"  leer plantilla + format por proveedor: {before * 1000:7.1f} ms")
+    print(f"  prepare una vez + render por proveedor: {after * 1000:6.1f} ms  (x{before / after:.0f})")
+
+if __name__ == "__main__":
+    main()
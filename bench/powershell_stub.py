@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Reemplazo de powershell.exe para probar PowerShellBridge sin Windows.
+
+Recibe los mismos argumentos (el script va en -EncodedCommand), lee un
+mensaje JSON por linea y responde {id, ok, error} como el script real. Los
+destinatarios especiales simulan problemas:
+
+    bad@x.com    Outlook rechaza el mensaje (el proceso sigue)
+    hang@x.com   el proceso deja de responder
+    die@x.com    el proceso termina con un error
+
+Si PS_STUB_LOG esta definida, anota ahi cada inicio de proceso y cada envio.
+"""
+import base64
+import json
+import os
+import sys
+import time
+
+def log(line: str) -> None:
+    path = os.environ.get("PS_STUB_LOG")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+def main():
+    # El script llega codificado en UTF-16LE, como lo espera powershell -EncodedCommand
+    if sys.argv[-2:-1] != ["-EncodedCommand"] or \
+            "ConvertFrom-Json" not in base64.b64decode(sys.argv[-1]).decode("utf-16-le"):
+        print("Argumentos inesperados", flush=True)
+        return 1
+    log(f"inicio {os.getpid()}")
+    for line in sys.stdin:
+        message = json.loads(line)
+        if message["to"] == "hang@x.com":
+            time.sleep(3600)
+        if message["to"] == "die@x.com":
+            print("Error fatal de PowerShell", flush=True)
+            return 1
+        ok = message["to"] != "bad@x.com"
+        log(f"envio {message['to']} {len(message['attachments'])} adjunto(s)")
+        print(json.dumps({"id": message["id"], "ok": ok, "error": "" if ok else "Destinatario rechazado"}),
+              flush=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
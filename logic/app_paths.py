@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+# --- Carpetas de la app ---
+# app_root(): lo que viene con la app (plantilla del correo, imagenes
+# guardadas con el esquema anterior). En el exe de un solo archivo es la
+# carpeta temporal de PyInstaller (sys._MEIPASS, ver runtime_hooks.py): se
+# crea al abrir la app y se borra al cerrarla, asi que ahi no se guarda nada.
+#
+# USER_DATA_DIR: lo que la app genera y tiene que seguir ahi la proxima vez
+# (bandeja de salida, reportes de envio, almacen de imagenes, base SQLite por
+# defecto). Es una carpeta por usuario:
+#
+#   Windows   %LOCALAPPDATA%\CotizacionesApp
+#   macOS     ~/Library/Application Support/CotizacionesApp
+#   otros     $XDG_DATA_HOME/CotizacionesApp (~/.local/share/CotizacionesApp)
+#
+# COTIZACIONES_DATA_DIR la reemplaza (instalaciones portables, pruebas).
+
+APP_NAME = "CotizacionesApp"
+
+def app_root() -> Path:
+    """Carpeta de los archivos que vienen con la app (en el exe APP_ROOT apunta a los datos empaquetados)"""
+    if 'APP_ROOT' in os.environ:
+        return Path(os.environ['APP_ROOT'])
+    return Path(__file__).resolve().parents[1]
+
+def _user_data_dir() -> Path:
+    override = os.environ.get("COTIZACIONES_DATA_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+    return Path(base) / APP_NAME
+
+# Se resuelve una sola vez: todos los modulos usan la misma carpeta
+USER_DATA_DIR = _user_data_dir()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator
+
+# --- Registros del catalogo para la UI y los correos ---
+# En lugar de copiar filas con to_dict(orient="records") (un dict por fila,
+# con todas sus columnas) se entregan objetos con __slots__. Se pueden leer
+# como antes (registro["Nombre"], registro.get("Foto", "")) y la Descripcion
+# no se copia: se lee del DataFrame del catalogo recien cuando alguien la pide
+# (las listas de la UI nunca la muestran).
+
+class _Record:
+    __slots__ = ()
+    _FIELDS: Dict[str, str] = {}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._FIELDS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        attr = self._FIELDS.get(key)
+        return default if attr is None else getattr(self, attr)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._FIELDS)
+
+    def keys(self):
+        return self._FIELDS.keys()
+
+    def to_dict(self) -> Dict[str, str]:
+        """Copia como dict {columna: valor} (por ejemplo para guardarla en JSON)"""
+        return {key: getattr(self, attr) for key, attr in self._FIELDS.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+class ProductRecord(_Record):
+    """Producto del catalogo; la descripcion se lee del DataFrame al pedirla"""
+    __slots__ = ("nombre", "foto", "_frame", "_label")
+    _FIELDS = {"Nombre": "nombre", "Descripcion": "descripcion", "Foto": "foto"}
+
+    def __init__(self, nombre: str, foto: str, frame, label):
+        self.nombre = nombre
+        self.foto = foto
+        # Referencia al DataFrame del cache (no se copia; esos DataFrames no se modifican)
+        self._frame = frame
+        self._label = label
+
+    @property
+    def descripcion(self) -> str:
+        if "Descripcion" not in self._frame.columns:
+            return ""
+        return str(self._frame.at[self._label, "Descripcion"])
+
+class SupplierRecord(_Record):
+    """Proveedor del catalogo"""
+    __slots__ = ("nombre", "correo")
+    _FIELDS = {"Nombre": "nombre", "Correo": "correo"}
+
+    def __init__(self, nombre: str, correo: str):
+        self.nombre = nombre
+        self.correo = correo
+
+def product_records(df, labels=None) -> list:
+    """Registros de las filas `labels` (todas si es None) de un DataFrame de productos"""
+    rows = df if labels is None else df.loc[labels, [c for c in ("Nombre", "Foto") if c in df.columns]]
+    fotos = rows["Foto"].tolist() if "Foto" in rows.columns else [""] * len(rows)
+    return [
+        ProductRecord(nombre, foto, df, label)
+        for label, nombre, foto in zip(rows.index.tolist(), rows["Nombre"].tolist(), fotos)
+    ]
+
+def supplier_records(df) -> list:
+    """Registros de todas las filas de un DataFrame de proveedores"""
+    correos = df["Correo"].tolist() if "Correo" in df.columns else [""] * len(df)
+    return [SupplierRecord(nombre, correo) for nombre, correo in zip(df["Nombre"].tolist(), correos)]
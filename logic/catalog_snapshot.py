@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+# --- Snapshot del catalogo junto al Excel ---
+# Parsear el XML del .xlsx es lo mas lento de abrir la app. Despues de leer un
+# libro se guarda una copia columnar de sus hojas (Feather si pyarrow esta
+# instalado, si no JSON por columnas) con la firma del libro. Mientras el libro
+# no cambie, las siguientes cargas leen el snapshot en lugar del Excel.
+#
+# No se usa pickle: el snapshot vive en la misma carpeta (compartida) que el
+# libro y cargar un pickle ajeno permitiria ejecutar codigo.
+
+# 2: incluye las demas columnas de cada hoja (no solo las que usa la app)
+SNAPSHOT_VERSION = 2
+_KINDS = ("products", "suppliers")
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _meta_path(excel_path: Path) -> Path:
+    return excel_path.with_name(f".{excel_path.name}.snapshot.json")
+
+def _data_path(excel_path: Path, kind: str, fmt: str) -> Path:
+    ext = "feather" if fmt == "feather" else "json"
+    return excel_path.with_name(f".{excel_path.name}.snapshot.{kind}.{ext}")
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _replace_atomically(path: Path, write) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def _read_meta(excel_path: Path) -> Optional[Dict]:
+    try:
+        with open(_meta_path(excel_path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("version") == SNAPSHOT_VERSION else None
+
+def load_snapshot(excel_path: Path) -> Optional[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Devuelve (productos, proveedores) del snapshot si corresponde al libro actual"""
+    meta = _read_meta(excel_path)
+    if meta is None:
+        return None
+
+    try:
+        st = excel_path.stat()
+    except OSError:
+        return None
+
+    if (meta.get("size"), meta.get("mtime_ns")) != (st.st_size, st.st_mtime_ns):
+        # Mismo tamaño pero otra fecha (por ejemplo una copia): comparar contenido
+        if meta.get("size") != st.st_size or meta.get("sha1") != _file_hash(excel_path):
+            return None
+        meta.update(mtime_ns=st.st_mtime_ns)
+        _write_meta(excel_path, meta)
+
+    fmt = meta.get("format")
+    if fmt == "feather" and not _has_pyarrow():
+        return None
+    try:
+        frames = []
+        for kind in _KINDS:
+            path = _data_path(excel_path, kind, fmt)
+            if fmt == "feather":
+                from pyarrow import feather
+                # memory_map evita copiar el archivo a memoria antes de convertirlo
+                df = feather.read_table(str(path), memory_map=True).to_pandas()
+            else:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                df = pd.DataFrame(data["columns"], columns=data["order"])
+            frames.append(df)
+    except Exception as e:
+        print(f"Snapshot del catalogo invalido, se leera el Excel: {e}")
+        return None
+    return frames[0], frames[1]
+
+def _write_meta(excel_path: Path, meta: Dict) -> None:
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    _replace_atomically(_meta_path(excel_path), write)
+
+def save_snapshot(excel_path: Path, products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> None:
+    """Guarda el snapshot de las hojas recien leidas/escritas del libro"""
+    st = excel_path.stat()
+    fmt = "feather" if _has_pyarrow() else "json"
+
+    # Primero los datos y al final la meta: sin meta valida el snapshot no se usa
+    _meta_path(excel_path).unlink(missing_ok=True)
+    for kind, df in zip(_KINDS, (products_df, suppliers_df)):
+        df = df.reset_index(drop=True)
+        if fmt == "feather":
+            from pyarrow import feather
+            write = lambda tmp, df=df: feather.write_feather(df, str(tmp), compression="uncompressed")
+        else:
+            def write(tmp, df=df):
+                data = {"order": list(df.columns), "columns": {c: df[c].tolist() for c in df.columns}}
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+        _replace_atomically(_data_path(excel_path, kind, fmt), write)
+
+    _write_meta(excel_path, {
+        "version": SNAPSHOT_VERSION,
+        "format": fmt,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": _file_hash(excel_path),
+    })
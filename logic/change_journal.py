@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+# --- Diario de cambios (append-only) ---
+# Cada alta/baja del catalogo se agrega como una linea JSON al final del
+# archivo y se hace fsync, asi guardar un cambio cuesta una escritura pequeña
+# en lugar de reescribir todo el Excel. El diario se consolida en el libro
+# periodicamente (ver data_manager.compact_journal) y se vuelve a aplicar al
+# cargar, lo que tambien recupera los cambios si la app se cerro de golpe.
+
+def journal_path_for(excel_path: Path) -> Path:
+    """Ruta del diario que acompaña a un Excel (database.xlsx -> database.xlsx.journal)"""
+    return excel_path.with_name(excel_path.name + ".journal")
+
+class ChangeJournal:
+    """Archivo JSONL con los cambios aun no consolidados en el Excel"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def append(self, changes: List[Dict]) -> None:
+        """Agrega los cambios al final del diario con una sola escritura y fsync"""
+        if not changes:
+            return
+        stamp = datetime.now().isoformat(timespec="seconds")
+        data = "".join(
+            json.dumps({"ts": stamp, **change}, ensure_ascii=False) + "\n"
+            for change in changes
+        ).encode("utf-8")
+
+        with open(self.path, "ab") as f:
+            # Si la ultima linea quedo cortada (cierre inesperado) empezar una nueva
+            if f.tell() > 0 and not self._ends_with_newline():
+                data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def read(self, limit: int = None) -> List[Dict]:
+        """Lee los cambios del diario (los primeros `limit` bytes si se indica).
+
+        Las lineas que no se pueden interpretar (por ejemplo una escritura
+        interrumpida) se ignoran.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read() if limit is None else f.read(limit)
+        except FileNotFoundError:
+            return []
+
+        changes = []
+        for line in data.splitlines():
+            try:
+                change = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(change, dict) and "op" in change and "kind" in change:
+                changes.append(change)
+        return changes
+
+    def drop_prefix(self, nbytes: int) -> None:
+        """Elimina los primeros `nbytes` (ya consolidados) conservando lo agregado despues"""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(nbytes)
+                rest = f.read()
+        except FileNotFoundError:
+            return
+
+        if not rest.strip():
+            self.path.unlink(missing_ok=True)
+            return
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(rest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
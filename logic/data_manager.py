@@ -1,20 +1,34 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Iterable, List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional
+import os
 import re
+import threading
+import time
 import pandas as pd
-import tkinter as tk
-from tkinter import filedialog, messagebox
+
+from logic import catalog_snapshot, image_store, sqlite_store
+from logic.app_paths import USER_DATA_DIR
+from logic.catalog_records import ProductRecord, SupplierRecord, product_records, supplier_records
+from logic.change_journal import ChangeJournal, journal_path_for
+from logic.search_index import NGramIndex
 
 # --- Configuracion de rutas y Base de Datos ---
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 EXCEL_PATH = None  # Se establecerá cuando se cargue un archivo
-IMAGES_DIR = BASE_DIR / "data" / "product_images"
+SQLITE_PATH = None  # Base SQLite, solo se usa en modo "sqlite" (ver set_mode)
+IMAGES_DIR = image_store.IMAGES_DIR  # Imagenes de productos (ver logic/image_store.py)
+
+# Backend activo: "excel" (por defecto) o "sqlite"
+_MODE = "excel"
 
-# Crear directorio de imágenes si no existe
-IMAGES_DIR.mkdir(parents=True, exist_ok=True)
+# Diario de cambios del modo Excel: se consolida en el libro tras este tiempo
+# sin cambios nuevos, o de inmediato si el diario supera este tamaño
+JOURNAL_IDLE_SECONDS = 30.0
+JOURNAL_COMPACT_BYTES = 256 * 1024
 
 # Columnas esperadas
 COLUMNS_PRODUCTS = ["Nombre", "Descripcion", "Foto"]
@@ -26,34 +40,473 @@ def _normalize_text(s: str) -> str:
     return (s or "").strip()
 
 def _casefold(s: str) -> str:
-    """Normalizamos para comparaciones insensibles a mayusculas/acentos."""
+    """Normalizamos nombres para comparaciones insensibles a mayusculas.
+    
+    La busqueda por texto ademas ignora acentos (ver logic.search_index.fold).
+    """
     return _normalize_text(s).casefold()
 
+# Validacion simple de correo (suficiente para la app); compilada una sola vez
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
 def _is_valid_email(email: str) -> bool:
     """Validacion simple de correo (suficiente para la app)"""
     email = _normalize_text(email)
-    pattern = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
+
+# -------------------- Cache en memoria del catalogo --------------------
+
+# Los DataFrames se guardan en memoria junto con la "firma" del archivo
+# (ruta, mtime, tamaño) del backend activo. Solo se vuelve a leer si cambia.
+# Los DataFrames del cache se comparten con quien los pide: no modificarlos.
+# Junto a cada DataFrame se guardan dos indices que se actualizan en cada
+# alta/baja sin reconstruirse:
+#  - "names": nombre normalizado (_casefold) -> etiquetas de fila, para
+#    duplicados y busquedas exactas por nombre en O(1).
+#  - "search": indice de trigramas (se construye en la primera busqueda).
+_cache = {"key": None, "products": None, "suppliers": None,
+          "names": {"products": None, "suppliers": None},
+          "search": {"products": None, "suppliers": None}}
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Protege cache, cambios pendientes y diario (la consolidacion corre en otro hilo)
+_lock = threading.RLock()
+
+# Campos indexados para la busqueda por substring
+_SEARCH_FIELDS = {
+    "products": ["Nombre", "Descripcion"],
+    "suppliers": ["Nombre", "Correo"],
+}
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """Firma barata del archivo para detectar cambios sin leerlo"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+def _storage_path() -> Optional[Path]:
+    """Archivo del backend activo (Excel o SQLite)"""
+    return SQLITE_PATH if _MODE == "sqlite" else EXCEL_PATH
+
+def _cache_key() -> Optional[tuple]:
+    """Firma del estado en disco: el archivo del backend y, en Excel, su diario"""
+    path = _storage_path()
+    if path is None:
+        return None
+    signature = _file_signature(path)
+    if signature is None or _MODE == "sqlite":
+        return signature
+    return (signature, _file_signature(journal_path_for(path)))
+
+def _store_cache(products_df: pd.DataFrame, suppliers_df: pd.DataFrame,
+                 indexes: Optional[Dict[str, Dict]] = None) -> None:
+    """Guarda los DataFrames en el cache con la firma actual del backend.
+    
+    `indexes` son los indices ya construidos para estos DataFrames (ver
+    _build_indexes); si no se pasan se reconstruye el de nombres.
+    """
+    _cache["key"] = _cache_key()
+    _set_frames(products_df, suppliers_df)
+    for kind, built in (indexes or {}).items():
+        _cache["names"][kind] = built["names"]
+        _cache["search"][kind] = built["search"]
+
+def _build_indexes(products_df: pd.DataFrame, suppliers_df: pd.DataFrame,
+                   progress: Optional[Callable] = None) -> Dict[str, Dict]:
+    """Construye los indices de nombres y de busqueda de un catalogo que aun no esta en el cache"""
+    indexes = {}
+    for kind, df in (("products", products_df), ("suppliers", suppliers_df)):
+        if progress:
+            progress("index", kind=kind, rows=len(df))
+        indexes[kind] = {
+            "names": _build_name_index(df),
+            "search": NGramIndex.from_frame(df, _SEARCH_FIELDS[kind]),
+        }
+    return indexes
+
+def _set_frames(products_df: Optional[pd.DataFrame], suppliers_df: Optional[pd.DataFrame],
+                incremental: bool = False) -> None:
+    """Reemplaza los DataFrames del cache manteniendo sus indices.
+    
+    Con incremental=True los nuevos DataFrames son una modificacion de los
+    anteriores (mismas etiquetas de fila) y los indices solo reciben las altas
+    y bajas; si no, se reconstruye el de nombres y se descarta el de busqueda.
+    """
+    for kind, new_df in (("products", products_df), ("suppliers", suppliers_df)):
+        old_df = _cache[kind]
+        if new_df is old_df:
+            continue
+        names = _cache["names"][kind]
+        index = _cache["search"][kind]
+        if incremental and old_df is not None and new_df is not None and names is not None:
+            removed = old_df.index.difference(new_df.index)
+            added = new_df.loc[new_df.index.difference(old_df.index)]
+            for label, name in zip(removed.tolist(), old_df.loc[removed, "Nombre"].tolist()):
+                labels = names.get(_casefold(name), [])
+                if label in labels:
+                    labels.remove(label)
+                if not labels:
+                    names.pop(_casefold(name), None)
+            for label, name in zip(added.index.tolist(), added["Nombre"].tolist()):
+                names.setdefault(_casefold(name), []).append(label)
+            if index is not None:
+                for label in removed.tolist():
+                    index.remove(label)
+                index.add_frame(added)
+        else:
+            _cache["names"][kind] = _build_name_index(new_df) if new_df is not None else None
+            _cache["search"][kind] = None
+        _cache[kind] = new_df
+
+def _build_name_index(df: pd.DataFrame) -> Dict[str, List[int]]:
+    """Diccionario nombre normalizado -> etiquetas de las filas con ese nombre"""
+    names: Dict[str, List[int]] = {}
+    if "Nombre" in df.columns:
+        for label, name in zip(df.index.tolist(), df["Nombre"].tolist()):
+            names.setdefault(_casefold(name), []).append(label)
+    return names
+
+def _name_index(kind: str, df: pd.DataFrame) -> Dict[str, List[int]]:
+    """Indice de nombres del DataFrame del cache (lo construye si hace falta)"""
+    names = _cache["names"][kind]
+    if names is None or _cache[kind] is not df:
+        names = _build_name_index(df)
+        if _cache[kind] is df:
+            _cache["names"][kind] = names
+    return names
+
+def _labels_for_names(kind: str, df: pd.DataFrame, wanted: Iterable[str]) -> List[int]:
+    """Etiquetas (en orden de fila) de las filas cuyos nombres normalizados se piden"""
+    names = _name_index(kind, df)
+    return sorted(label for key in wanted for label in names.get(key, ()))
+
+def _search_index(kind: str, df: pd.DataFrame) -> NGramIndex:
+    """Indice de busqueda del DataFrame del cache (lo construye si hace falta)"""
+    index = _cache["search"][kind]
+    if index is None or _cache[kind] is not df:
+        index = NGramIndex.from_frame(df, _SEARCH_FIELDS[kind])
+        if _cache[kind] is df:
+            _cache["search"][kind] = index
+    return index
+
+def _next_label(df: pd.DataFrame) -> int:
+    """Etiqueta para una fila nueva (las existentes no cambian, asi el indice sigue valido)"""
+    return int(df.index.max()) + 1 if len(df) else 0
+
+# Columnas que se guardan como categoricas si tienen muchos valores repetidos
+# (descripciones compartidas entre productos, la misma foto, Foto vacia). Los
+# textos (Nombre, Correo) usan el tipo str de pandas, que con pyarrow ya se
+# guarda en formato Arrow.
+_CATEGORY_COLUMNS = {"products": ["Descripcion", "Foto"], "suppliers": []}
+_CATEGORY_MAX_RATIO = 0.5
+
+def _compact_frame(kind: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Representacion compacta en memoria de un DataFrame recien leido del disco"""
+    if df is None or df.empty:
+        return df
+    for column in _CATEGORY_COLUMNS[kind]:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            if df[column].nunique() <= len(df) * _CATEGORY_MAX_RATIO:
+                df = df.assign(**{column: df[column].astype("category")})
+    return df
+
+def _compact_catalog(products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return _compact_frame("products", products_df), _compact_frame("suppliers", suppliers_df)
+
+def _with_categories(df: pd.DataFrame, column: str, values: Iterable[str]) -> pd.DataFrame:
+    """Si la columna es categorica, le agrega los valores que aun no son categorias"""
+    dtype = df[column].dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        missing = pd.Index(pd.unique(pd.Series(list(values), dtype=object))).difference(dtype.categories)
+        if len(missing):
+            df = df.assign(**{column: df[column].cat.add_categories(missing)})
+    return df
+
+def _append_rows(df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """Concatena filas nuevas sin que las columnas categoricas vuelvan a ser texto"""
+    if df.empty:
+        return new_rows
+    new_rows = new_rows.copy()
+    # Columnas propias del libro (Precio, Telefono...): vacias en las filas nuevas
+    for column in df.columns.difference(new_rows.columns):
+        new_rows[column] = ""
+    for column in new_rows.columns.intersection(df.columns):
+        df = _with_categories(df, column, new_rows[column])
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            new_rows[column] = new_rows[column].astype(df[column].dtype)
+    return pd.concat([df, new_rows])
+
+def clear_cache() -> None:
+    """Descarta el catalogo en memoria; la proxima lectura vuelve al disco"""
+    _cache["key"] = None
+    _set_frames(None, None)
+
+def get_cache_stats() -> Dict[str, int]:
+    """Devuelve los contadores de aciertos/fallos del cache"""
+    return dict(_cache_stats)
 
 # -------------------- Funciones de Excel --------------------
 
-def _load_excel_data() -> tuple[pd.DataFrame, pd.DataFrame]:
-    """Carga datos desde Excel"""
-    if EXCEL_PATH is None or not EXCEL_PATH.exists():
-        return pd.DataFrame(), pd.DataFrame()
+# Hojas del libro: (nombre de hoja, columnas esperadas, columnas obligatorias)
+_SHEETS = (
+    ("Productos", COLUMNS_PRODUCTS, ["Nombre"]),
+    ("Proveedores", COLUMNS_SUPPLIERS, ["Nombre", "Correo"]),
+)
+
+# Tiempos de la ultima lectura del Excel (ver get_load_stats)
+_load_stats: Dict[str, object] = {}
+
+def _cell_to_str(value) -> str:
+    """Convierte una celda a texto igual que read_excel(dtype=str)"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+# Cada cuantas filas leidas se informa el avance (ver load_catalog_file)
+_PROGRESS_ROWS = 1000
+
+def _rows_to_frame(rows: Iterable, sheet_name: str, columns: List[str], required: List[str],
+                   progress: Optional[Callable] = None, row_numbers: bool = False,
+                   keep_extra: bool = False) -> pd.DataFrame:
+    """Construye el DataFrame de una hoja a partir de sus filas (la primera es el encabezado).
+    
+    Con row_numbers=True se agrega la columna "Fila" con el numero de fila en
+    el archivo (para reportar errores de importacion). Con keep_extra=True
+    tambien se leen las demas columnas de la hoja (despues de las esperadas),
+    asi al guardar el libro se escriben de vuelta.
+    """
+    rows = iter(rows)
+    header = next(rows, None) or ()
+    positions = {}
+    for i, title in enumerate(header):
+        title = _cell_to_str(title).strip()
+        if title and title not in positions:
+            positions[title] = i
+    
+    missing = [c for c in required if c not in positions]
+    if missing:
+        if len(required) == 1:
+            raise ValueError(f"El archivo Excel debe tener una columna '{required[0]}' en la hoja '{sheet_name}'")
+        names = " y ".join(f"'{c}'" for c in required)
+        raise ValueError(f"El archivo Excel debe tener columnas {names} en la hoja '{sheet_name}'")
+    
+    # Las columnas esperadas que falten quedan vacias
+    if keep_extra:
+        columns = columns + [title for title in positions if title not in columns]
+    indexes = [positions.get(c) for c in columns]
+    records = []
+    for count, row in enumerate(rows, 1):
+        values = tuple(
+            _cell_to_str(row[i]) if i is not None and i < len(row) else ""
+            for i in indexes
+        )
+        if any(values):
+            records.append(values + (count + 1,) if row_numbers else values)
+        if progress and count % _PROGRESS_ROWS == 0:
+            progress("rows", sheet=sheet_name, rows=count)
+    return pd.DataFrame.from_records(records, columns=columns + ["Fila"] if row_numbers else columns)
+
+def _iter_sheets_openpyxl(path: Path):
+    """Recorre las hojas en modo solo-lectura (streaming) con openpyxl"""
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet_name, _, _ in _SHEETS:
+            if sheet_name not in wb.sheetnames:
+                raise ValueError(f"El archivo Excel no tiene la hoja '{sheet_name}'")
+            yield sheet_name, wb[sheet_name].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def _iter_sheets_calamine(path: Path):
+    """Recorre las hojas con python-calamine (mas rapido si esta instalado)"""
+    from python_calamine import CalamineWorkbook
     
+    wb = CalamineWorkbook.from_path(str(path))
+    for sheet_name, _, _ in _SHEETS:
+        if sheet_name not in wb.sheet_names:
+            raise ValueError(f"El archivo Excel no tiene la hoja '{sheet_name}'")
+        yield sheet_name, _calamine_rows(wb, sheet_name)
+
+def _calamine_rows(wb, sheet_name: str):
+    # to_python() convierte toda la hoja de una vez: se llama recien al pedir la
+    # primera fila, asi el tiempo de cada hoja (ver _read_excel_file) la incluye
+    yield from wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+
+def _excel_engine() -> str:
+    """Motor de lectura a usar: calamine si esta disponible, si no openpyxl"""
     try:
-        products_df = pd.read_excel(EXCEL_PATH, sheet_name="Productos", dtype=str)
-        suppliers_df = pd.read_excel(EXCEL_PATH, sheet_name="Proveedores", dtype=str)
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+def _read_excel_file(path: Path, progress: Optional[Callable] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Lee las hojas de productos y proveedores del Excel abriendo el archivo una sola vez"""
+    engine = _excel_engine()
+    iter_sheets = _iter_sheets_calamine if engine == "calamine" else _iter_sheets_openpyxl
+    spec = {name: (columns, required) for name, columns, required in _SHEETS}
+    
+    frames = {}
+    sheet_stats = {}
+    start = time.perf_counter()
+    for sheet_name, rows in iter_sheets(path):
+        sheet_start = time.perf_counter()
+        columns, required = spec[sheet_name]
+        frames[sheet_name] = _rows_to_frame(rows, sheet_name, columns, required, progress, keep_extra=True)
+        sheet_stats[sheet_name] = {
+            "rows": len(frames[sheet_name]),
+            "seconds": time.perf_counter() - sheet_start,
+        }
+        if progress:
+            progress("sheet", sheet=sheet_name, rows=len(frames[sheet_name]))
+    
+    _load_stats.clear()
+    _load_stats.update({
+        "path": str(path),
+        "engine": engine,
+        "sheets": sheet_stats,
+        "total_seconds": time.perf_counter() - start,
+    })
+    print(
+        f"Excel leido con {engine} en {_load_stats['total_seconds']:.2f}s ("
+        + ", ".join(f"{k}: {v['rows']} filas/{v['seconds']:.2f}s" for k, v in sheet_stats.items())
+        + ")"
+    )
+    return frames["Productos"], frames["Proveedores"]
+
+def _read_workbook(path: Path, progress: Optional[Callable] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Lee las hojas del libro, desde su snapshot si el libro no cambio desde la ultima lectura"""
+    start = time.perf_counter()
+    frames = catalog_snapshot.load_snapshot(path)
+    if frames is not None:
+        _load_stats.clear()
+        _load_stats.update({
+            "path": str(path),
+            "engine": "snapshot",
+            "sheets": {
+                sheet_name: {"rows": len(df)}
+                for (sheet_name, _, _), df in zip(_SHEETS, frames)
+            },
+            "total_seconds": time.perf_counter() - start,
+        })
+        print(f"Catalogo leido del snapshot en {_load_stats['total_seconds']:.3f}s")
+        if progress:
+            for (sheet_name, _, _), df in zip(_SHEETS, frames):
+                progress("sheet", sheet=sheet_name, rows=len(df))
+        return frames
+    
+    products_df, suppliers_df = _read_excel_file(path, progress)
+    _save_snapshot(path, products_df, suppliers_df)
+    return products_df, suppliers_df
+
+def _save_snapshot(path: Path, products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> None:
+    """Guarda el snapshot del libro; si falla solo se pierde la aceleracion"""
+    try:
+        catalog_snapshot.save_snapshot(path, products_df, suppliers_df)
+    except Exception as e:
+        print(f"No se pudo guardar el snapshot del catalogo: {e}")
+
+def get_load_stats() -> Dict[str, object]:
+    """Devuelve motor, filas y segundos por hoja de la ultima lectura del Excel"""
+    return {**_load_stats, "sheets": {k: dict(v) for k, v in _load_stats.get("sheets", {}).items()}}
+
+def _replay_changes(products_df: pd.DataFrame, suppliers_df: pd.DataFrame,
+                    changes: List[Dict]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Aplica sobre los DataFrames los cambios del diario.
+    
+    Las altas solo agregan el nombre si no existe y las bajas eliminan por
+    nombre, asi aplicar dos veces los mismos cambios (por ejemplo si la app se
+    cerro justo al consolidar) deja el mismo resultado. Las filas quedan en el
+    orden del libro (las altas al final) y se conservan las demas columnas.
+    """
+    frames = {"products": products_df, "suppliers": suppliers_df}
+    base_columns = {"products": COLUMNS_PRODUCTS, "suppliers": COLUMNS_SUPPLIERS}
+    columns, records, positions = {}, {}, {}
+    for kind, df in frames.items():
+        columns[kind] = base_columns[kind] + [c for c in df.columns if c not in base_columns[kind]]
+        records[kind] = df.reindex(columns=columns[kind], fill_value="").to_dict(orient="records")
+        positions[kind] = {}
+        for position, record in enumerate(records[kind]):
+            positions[kind].setdefault(_casefold(record["Nombre"]), []).append(position)
+    
+    for change in changes:
+        kind = change["kind"]
+        by_name = positions.get(kind)
+        if by_name is None:
+            continue
+        rows = records[kind]
+        if change["op"] == "add":
+            for record in change.get("rows", []):
+                key = _casefold(record.get("Nombre", ""))
+                if key and key not in by_name:
+                    by_name[key] = [len(rows)]
+                    rows.append({c: str(record.get(c, "") or "") for c in columns[kind]})
+        elif change["op"] == "delete":
+            for name in change.get("names", []):
+                for position in by_name.pop(_casefold(name), []):
+                    rows[position] = None
+        elif change["op"] == "update":
+            for record in change.get("rows", []):
+                for position in by_name.get(_casefold(record.get("Nombre", "")), []):
+                    rows[position].update(
+                        (c, str(v or "")) for c, v in record.items()
+                        if c in columns[kind] and c != "Nombre"
+                    )
+    
+    return tuple(
+        pd.DataFrame.from_records([r for r in records[kind] if r is not None], columns=columns[kind])
+        for kind in ("products", "suppliers")
+    )
+
+def _read_excel_catalog(path: Path, progress: Optional[Callable] = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Lee el Excel y le aplica los cambios de su diario que aun no se consolidaron"""
+    products_df, suppliers_df = _read_workbook(path, progress)
+    changes = ChangeJournal(journal_path_for(path)).read()
+    if changes:
+        if progress:
+            progress("journal", rows=len(changes))
+        products_df, suppliers_df = _replay_changes(products_df, suppliers_df, changes)
+        print(f"Se aplicaron {len(changes)} cambio(s) pendientes del diario de {path.name}")
+    return _compact_catalog(products_df, suppliers_df)
+
+def _load_data() -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Carga datos del backend activo (usando el cache si el archivo no cambio)"""
+    with _lock:
+        path = _storage_path()
+        if path is None or not path.exists():
+            return pd.DataFrame(), pd.DataFrame()
         
-        # Limpiar datos
-        products_df = products_df.fillna("").astype(str)
-        suppliers_df = suppliers_df.fillna("").astype(str)
+        # Con cambios pendientes, el estado vigente es el de memoria (aun no escrito)
+        if _session["pending"]:
+            _cache_stats["hits"] += 1
+            return _cache["products"], _cache["suppliers"]
         
+        key = _cache_key()
+        if key is not None and _cache["key"] == key:
+            _cache_stats["hits"] += 1
+            return _cache["products"], _cache["suppliers"]
+        
+        _cache_stats["misses"] += 1
+        try:
+            if _MODE == "sqlite":
+                products_df, suppliers_df = _compact_catalog(*sqlite_store.read_catalog(path))
+            else:
+                products_df, suppliers_df = _read_excel_catalog(path)
+        except Exception as e:
+            print(f"Error cargando {get_current_mode()}: {e}")
+            return pd.DataFrame(), pd.DataFrame()
+        
+        _cache["key"] = key
+        _set_frames(products_df, suppliers_df)
+        if _MODE == "excel":
+            _schedule_compaction()
         return products_df, suppliers_df
-    except Exception as e:
-        print(f"Error cargando Excel: {e}")
-        return pd.DataFrame(), pd.DataFrame()
 
 def _create_empty_excel() -> None:
     """Crea un archivo Excel vacío con las hojas necesarias"""
@@ -71,29 +524,267 @@ def _create_empty_excel() -> None:
     except Exception as e:
         print(f"Error creando Excel: {e}")
 
-def _save_excel_data(products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> None:
-    """Guarda datos en Excel"""
+def _write_excel(path: Path, products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> None:
+    """Escribe ambas hojas en el archivo indicado (en un temporal que luego lo reemplaza)"""
+    tmp_path = path.with_name(f"~{path.stem}.tmp{path.suffix}")
     try:
-        with pd.ExcelWriter(EXCEL_PATH, engine='openpyxl') as writer:
+        with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
             products_df.to_excel(writer, sheet_name='Productos', index=False)
             suppliers_df.to_excel(writer, sheet_name='Proveedores', index=False)
-        print("Datos guardados en Excel exitosamente")
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+# -------------------- Transacciones (escritura diferida) --------------------
+
+# Cada operacion CRUD actualiza el catalogo en memoria y deja un cambio
+# pendiente ({"op": "add"/"delete", "kind": "products"/"suppliers", ...}).
+# Fuera de una transaccion se guarda de inmediato; dentro de transaction()
+# todos los cambios se escriben una sola vez al confirmar: en Excel con una
+# sola escritura al diario de cambios, en SQLite con una transaccion SQL.
+_session = {"depth": 0, "pending": []}
+
+def _apply_changes(products_df: pd.DataFrame, suppliers_df: pd.DataFrame, change: Dict) -> None:
+    """Publica el nuevo estado del catalogo: en transaccion queda pendiente, si no se guarda ya"""
+    with _lock:
+        _set_frames(products_df, suppliers_df, incremental=True)
+        if change["op"] == "update":
+            # Las filas modificadas conservan su etiqueta: reindexarlas para la busqueda
+            kind = change["kind"]
+            index = _cache["search"][kind]
+            if index is not None:
+                wanted = {_casefold(r["Nombre"]) for r in change["rows"]}
+                index.add_frame(_cache[kind].loc[_labels_for_names(kind, _cache[kind], wanted)])
+        _session["pending"].append(change)
+        if _session["depth"] == 0:
+            _flush_pending()
+
+def _flush_pending() -> None:
+    """Escribe los cambios pendientes en el backend activo"""
+    with _lock:
+        if not _session["pending"]:
+            return
+        
+        changes = _session["pending"]
+        _session["pending"] = []
+        try:
+            if _MODE == "sqlite":
+                sqlite_store.apply_changes(SQLITE_PATH, changes)
+            else:
+                ChangeJournal(journal_path_for(EXCEL_PATH)).append(changes)
+        except Exception as e:
+            print(f"Error guardando {get_current_mode()}: {e}")
+            clear_cache()
+            raise
+        
+        # Lo que acabamos de escribir es el nuevo estado: no hace falta releerlo
+        _cache["key"] = _cache_key()
+        print(f"{len(changes)} cambio(s) guardados en {get_current_mode()}")
+        if _MODE == "excel":
+            _schedule_compaction()
+
+@contextmanager
+def transaction():
+    """Agrupa varias operaciones CRUD y las escribe a disco una sola vez al salir.
+    
+    Si ocurre un error dentro del bloque se descartan los cambios pendientes.
+    Se puede anidar: solo la transaccion exterior escribe.
+    """
+    with _lock:
+        _session["depth"] += 1
+    try:
+        yield
+    except BaseException:
+        with _lock:
+            _session["depth"] -= 1
+            if _session["depth"] == 0 and _session["pending"]:
+                # Nada se escribio todavia: basta con olvidar el estado en memoria
+                _session["pending"] = []
+                clear_cache()
+        raise
+    with _lock:
+        _session["depth"] -= 1
+        if _session["depth"] == 0:
+            _flush_pending()
+
+def has_pending_changes() -> bool:
+    """Indica si hay cambios en memoria que aun no se escribieron a disco"""
+    return bool(_session["pending"])
+
+# -------------------- Diario de cambios (modo Excel) --------------------
+
+# Solo una consolidacion a la vez; el timer programa la siguiente
+_compaction = {"timer": None, "lock": threading.Lock()}
+
+def _schedule_compaction() -> None:
+    """Programa la consolidacion del diario en segundo plano"""
+    if _MODE != "excel" or EXCEL_PATH is None:
+        return
+    size = ChangeJournal(journal_path_for(EXCEL_PATH)).size()
+    if size == 0:
+        return
+    
+    timer = _compaction["timer"]
+    if timer is not None:
+        timer.cancel()
+    delay = 0 if size >= JOURNAL_COMPACT_BYTES else JOURNAL_IDLE_SECONDS
+    timer = threading.Timer(delay, _compact_in_background)
+    timer.daemon = True
+    _compaction["timer"] = timer
+    timer.start()
+
+def _compact_in_background() -> None:
+    try:
+        compact_journal()
     except Exception as e:
-        print(f"Error guardando Excel: {e}")
+        print(f"Error consolidando el diario de cambios: {e}")
+
+def compact_journal() -> bool:
+    """Consolida el diario de cambios en el Excel. Retorna True si habia algo que consolidar
+    
+    El libro se reescribe fuera del lock, asi las operaciones de la UI no se
+    bloquean; lo que se agregue al diario mientras tanto se conserva.
+    """
+    with _compaction["lock"]:
+        with _lock:
+            path = EXCEL_PATH
+            if _MODE != "excel" or path is None:
+                return False
+            journal = ChangeJournal(journal_path_for(path))
+            size = journal.size()
+            if size == 0:
+                return False
+            if _session["pending"]:
+                # Hay una transaccion en curso: se reintenta mas tarde
+                _schedule_compaction()
+                return False
+            products_df, suppliers_df = _load_data()
+            if products_df.empty and suppliers_df.empty:
+                return False
+        
+        _write_excel(path, products_df, suppliers_df)
+        _save_snapshot(path, products_df, suppliers_df)
+        
+        with _lock:
+            journal.drop_prefix(size)
+            if path == EXCEL_PATH and _MODE == "excel":
+                _cache["key"] = _cache_key()
+        print(f"Diario de cambios consolidado en {path.name}")
+        return True
+
+def get_journal_status() -> Dict[str, object]:
+    """Tamaño y cantidad de cambios del diario aun no consolidados"""
+    if EXCEL_PATH is None:
+        return {"path": None, "bytes": 0, "changes": 0}
+    journal = ChangeJournal(journal_path_for(EXCEL_PATH))
+    return {"path": str(journal.path), "bytes": journal.size(), "changes": len(journal.read())}
+
+# -------------------- Cambios externos del libro --------------------
+# Otras personas editan el Excel compartido mientras la app esta abierta. La UI
+# llama a has_external_changes() con un timer (solo hace stat del libro y del
+# diario) y, si hay cambios, reload_external_changes() en un hilo aparte: se
+# relee el libro, se reemplaza el catalogo y se devuelve que nombres cambiaron
+# para actualizar solo esas filas.
+
+# Ultima firma distinta vista en disco: se espera a verla dos veces seguidas
+# para no leer el libro mientras Excel todavia lo esta guardando
+_watch = {"seen": None, "failed": None}
+
+def has_external_changes() -> bool:
+    """True si el libro o su diario cambiaron en disco sin que los escribiera esta app"""
+    if _MODE != "excel" or EXCEL_PATH is None or _cache["key"] is None:
+        return False
+    if _session["pending"] or _compaction["lock"].locked():
+        # La app misma esta escribiendo: la firma cambia pero no es un cambio externo
+        return False
+    
+    key = _cache_key()
+    if key is None or key == _cache["key"] or key == _watch["failed"]:
+        _watch["seen"] = None
+        return False
+    if key != _watch["seen"]:
+        _watch["seen"] = key
+        return False
+    return True
+
+def _frame_by_name(df: Optional[pd.DataFrame], columns: List[str]) -> pd.DataFrame:
+    """DataFrame indexado por nombre normalizado (si se repite, queda la ultima fila)"""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=columns, index=pd.Index([], dtype=object), dtype=object)
+    df = df.reindex(columns=columns, fill_value="").astype(object)
+    df.index = df["Nombre"].map(_casefold)
+    return df[~df.index.duplicated(keep="last")]
+
+def _diff_frames(old_df: Optional[pd.DataFrame], new_df: Optional[pd.DataFrame],
+                 columns: List[str]) -> Dict[str, List[str]]:
+    """Nombres agregados, eliminados y modificados entre dos versiones de una hoja"""
+    old, new = _frame_by_name(old_df, columns), _frame_by_name(new_df, columns)
+    added = new.index.difference(old.index, sort=False)
+    removed = old.index.difference(new.index, sort=False)
+    common = new.index.intersection(old.index, sort=False)
+    changed = common[(old.loc[common, columns] != new.loc[common, columns]).any(axis=1).to_numpy()]
+    return {
+        "added": new.loc[added, "Nombre"].tolist(),
+        "removed": old.loc[removed, "Nombre"].tolist(),
+        "changed": new.loc[changed, "Nombre"].tolist(),
+    }
+
+def reload_external_changes(progress: Optional[Callable] = None) -> Optional[Dict[str, Dict[str, List[str]]]]:
+    """Relee el libro modificado afuera de la app y reemplaza el catalogo en memoria.
+    
+    Pensada para un hilo aparte (como load_catalog_file). Retorna, por hoja,
+    {"added": [...], "removed": [...], "changed": [...]} con los nombres
+    afectados, o None si no habia cambios o si mientras se leia la app
+    escribio o el libro volvio a cambiar (el siguiente chequeo lo reintenta).
+    """
+    with _lock:
+        path = EXCEL_PATH
+        key = _cache_key()
+        if _MODE != "excel" or path is None or key is None or key == _cache["key"] or _session["pending"]:
+            return None
+        old_products, old_suppliers = _cache["products"], _cache["suppliers"]
+    
+    try:
+        products_df, suppliers_df = _read_excel_catalog(path, progress)
+    except Exception:
+        # No reintentar con esta misma version del archivo (se reintenta si vuelve a cambiar)
+        _watch["failed"] = key
         raise
+    indexes = _build_indexes(products_df, suppliers_df, progress)
+    
+    with _lock:
+        if (path != EXCEL_PATH or _session["pending"] or _cache_key() != key
+                or _cache["products"] is not old_products or _cache["suppliers"] is not old_suppliers):
+            return None
+        _store_cache(products_df, suppliers_df, indexes)
+        _watch["seen"] = None
+        _schedule_compaction()
+    
+    diff = {
+        "products": _diff_frames(old_products, products_df, COLUMNS_PRODUCTS),
+        "suppliers": _diff_frames(old_suppliers, suppliers_df, COLUMNS_SUPPLIERS),
+    }
+    print(
+        f"Cambios externos en {path.name}: "
+        + ", ".join(
+            f"{kind} +{len(d['added'])} -{len(d['removed'])} ~{len(d['changed'])}"
+            for kind, d in diff.items()
+        )
+    )
+    return diff
 
 # -------------------- API publica: Lectura --------------------
 
 def load_products() -> pd.DataFrame:
     """Devuelve Dataframe de productos (Nombre, Descripcion)."""
-    products_df, _ = _load_excel_data()
+    products_df, _ = _load_data()
     if products_df.empty:
         return pd.DataFrame(columns=COLUMNS_PRODUCTS)
     return products_df
 
 def load_supplier() -> pd.DataFrame:
     """Devuelve el Dataframe de Proveedores (Nombre, Correo)"""
-    _, suppliers_df = _load_excel_data()
+    _, suppliers_df = _load_data()
     if suppliers_df.empty:
         return pd.DataFrame(columns=COLUMNS_SUPPLIERS)
     return suppliers_df
@@ -108,28 +799,17 @@ def add_product(nombre: str, descripcion: str = "", imagen_path: str = None) ->
     if not nombre:
         raise ValueError("El nombre del producto no puede estar vacio")
     
-    products_df, suppliers_df = _load_excel_data()
+    products_df, suppliers_df = _load_data()
     
     # Verificar si ya existe (case-insensitive)
-    existing_products = products_df[products_df['Nombre'].str.lower() == nombre.lower()]
-    if not existing_products.empty:
+    if _casefold(nombre) in _name_index("products", products_df):
         raise ValueError(f"Ya existe un producto con el nombre '{nombre}'.")
     
-    # Procesar imagen si se proporcionó
+    # Procesar imagen si se proporcionó (se guarda por contenido: Foto = referencia del almacen)
     imagen_guardada = ""
     if imagen_path:
         try:
-            # Obtener extensión del archivo original
-            ext = Path(imagen_path).suffix
-            # Crear nombre de archivo seguro basado en el nombre del producto
-            safe_name = re.sub(r'[^a-zA-Z0-9]', '_', nombre)
-            new_image_name = f"{safe_name}{ext}"
-            new_image_path = IMAGES_DIR / new_image_name
-            
-            # Copiar imagen a la carpeta del proyecto
-            import shutil
-            shutil.copy2(imagen_path, new_image_path)
-            imagen_guardada = new_image_name
+            imagen_guardada = image_store.put(imagen_path)
         except Exception as e:
             print(f"Error al procesar imagen: {e}")
             # Continuar sin imagen si hay error
@@ -139,27 +819,85 @@ def add_product(nombre: str, descripcion: str = "", imagen_path: str = None) ->
         'Nombre': [nombre],
         'Descripcion': [descripcion],
         'Foto': [imagen_guardada]
+    }, index=[_next_label(products_df)])
+    products_df = _append_rows(products_df, new_product)
+    _apply_changes(products_df, suppliers_df, {
+        "op": "add", "kind": "products", "rows": new_product.to_dict(orient="records")
     })
-    products_df = pd.concat([products_df, new_product], ignore_index=True)
-    _save_excel_data(products_df, suppliers_df)
 
 def delete_product(nombre: str) -> int:
     """Elimina productos cuyo nombre coincida (case-insensitve). Retorna cuantos elimino"""
-    nombre = _normalize_text(nombre)
+    return delete_products([nombre])
+
+def delete_products(names: Iterable[str]) -> int:
+    """Elimina en una sola operacion todos los productos con esos nombres. Retorna cuantos elimino"""
+    wanted = {_casefold(n) for n in names if _normalize_text(n)}
+    if not wanted:
+        return 0
     
-    if not nombre:
+    products_df, suppliers_df = _load_data()
+    if products_df.empty:
         return 0
     
-    products_df, suppliers_df = _load_excel_data()
-    original_count = len(products_df)
-    products_df = products_df[products_df['Nombre'].str.lower() != nombre.lower()]
-    deleted_count = original_count - len(products_df)
+    labels = _labels_for_names("products", products_df, wanted)
+    deleted_count = len(labels)
     
     if deleted_count > 0:
-        _save_excel_data(products_df, suppliers_df)
+        _apply_changes(products_df.drop(index=labels), suppliers_df, {
+            "op": "delete", "kind": "products", "names": sorted(wanted)
+        })
     
     return deleted_count
 
+def needs_image_migration() -> bool:
+    """True si alguna Foto del catalogo es una imagen guardada con el esquema anterior"""
+    products_df, _ = _load_data()
+    if products_df.empty or "Foto" not in products_df.columns:
+        return False
+    # Cada foto distinta una sola vez (la columna suele repetir valores)
+    for foto in pd.unique(products_df["Foto"].astype(str)):
+        foto = _normalize_text(foto)
+        if foto and not image_store.is_image_ref(foto) and image_store.legacy_path(foto).is_file():
+            return True
+    return False
+
+def migrate_product_images() -> int:
+    """Pasa al almacen de imagenes las fotos guardadas con el esquema anterior.
+    
+    Los productos cuya Foto es un nombre de archivo de data/product_images
+    pasan a referenciar el hash de su contenido. Los archivos antiguos no se
+    borran (otro libro podria seguir usandolos). Retorna cuantos productos
+    se actualizaron.
+    """
+    products_df, suppliers_df = _load_data()
+    if products_df.empty or "Foto" not in products_df.columns:
+        return 0
+    
+    labels, rows = [], []
+    for label, nombre, foto in zip(products_df.index.tolist(), products_df["Nombre"].tolist(),
+                                   products_df["Foto"].tolist()):
+        foto = _normalize_text(foto)
+        if not foto or image_store.is_image_ref(foto):
+            continue
+        legacy = image_store.legacy_path(foto)
+        if not legacy.is_file():
+            continue
+        try:
+            ref = image_store.put(legacy)
+        except OSError as e:
+            print(f"No se pudo migrar la imagen {foto}: {e}")
+            continue
+        labels.append(label)
+        rows.append({"Nombre": nombre, "Foto": ref})
+    
+    if rows:
+        refs = [r["Foto"] for r in rows]
+        products_df = _with_categories(products_df, "Foto", refs).copy()
+        products_df.loc[labels, "Foto"] = refs
+        _apply_changes(products_df, suppliers_df, {"op": "update", "kind": "products", "rows": rows})
+        print(f"Se migraron {len(rows)} imagen(es) de productos al almacen por contenido")
+    return len(rows)
+
 def add_supplier(nombre: str, correo: str) -> None:
     """Agrega proveedor validando correo y duplicados por nombre (case-insensitive)"""
     nombre = _normalize_text(nombre)
@@ -171,121 +909,331 @@ def add_supplier(nombre: str, correo: str) -> None:
     if not _is_valid_email(correo):
         raise ValueError(f"El correo '{correo}' no es valido.")
     
-    products_df, suppliers_df = _load_excel_data()
+    products_df, suppliers_df = _load_data()
     
     # Verificar si ya existe (case-insensitive)
-    existing_suppliers = suppliers_df[suppliers_df['Nombre'].str.lower() == nombre.lower()]
-    if not existing_suppliers.empty:
+    if _casefold(nombre) in _name_index("suppliers", suppliers_df):
         raise ValueError(f"Ya existe un proveedor con el nombre '{nombre}'.")
     
     # Agregar nuevo proveedor
     new_supplier = pd.DataFrame({
         'Nombre': [nombre],
         'Correo': [correo]
+    }, index=[_next_label(suppliers_df)])
+    suppliers_df = _append_rows(suppliers_df, new_supplier)
+    _apply_changes(products_df, suppliers_df, {
+        "op": "add", "kind": "suppliers", "rows": new_supplier.to_dict(orient="records")
     })
-    suppliers_df = pd.concat([suppliers_df, new_supplier], ignore_index=True)
-    _save_excel_data(products_df, suppliers_df)
 
 def delete_supplier(nombre: str) -> int:
     """Elimina proveedores por nombre (case-insensitive). Retorna cuantos eliminó"""
-    nombre = _normalize_text(nombre)
-    if not nombre:
+    return delete_suppliers([nombre])
+
+def delete_suppliers(names: Iterable[str]) -> int:
+    """Elimina en una sola operacion todos los proveedores con esos nombres. Retorna cuantos eliminó"""
+    wanted = {_casefold(n) for n in names if _normalize_text(n)}
+    if not wanted:
+        return 0
+    
+    products_df, suppliers_df = _load_data()
+    if suppliers_df.empty:
         return 0
     
-    products_df, suppliers_df = _load_excel_data()
-    original_count = len(suppliers_df)
-    suppliers_df = suppliers_df[suppliers_df['Nombre'].str.lower() != nombre.lower()]
-    deleted_count = original_count - len(suppliers_df)
+    labels = _labels_for_names("suppliers", suppliers_df, wanted)
+    deleted_count = len(labels)
     
     if deleted_count > 0:
-        _save_excel_data(products_df, suppliers_df)
+        _apply_changes(products_df, suppliers_df.drop(index=labels), {
+            "op": "delete", "kind": "suppliers", "names": sorted(wanted)
+        })
     
     return deleted_count
 
+# -------------------- Importacion masiva (CSV / XLSX) --------------------
+
+# Hoja y columnas de cada tipo de importacion (las mismas que el libro principal)
+_IMPORT_SPECS = {
+    "products": ("Productos", COLUMNS_PRODUCTS, ["Nombre"]),
+    "suppliers": ("Proveedores", COLUMNS_SUPPLIERS, ["Nombre", "Correo"]),
+}
+
+def _read_import_source(path: Path, kind: str) -> pd.DataFrame:
+    """Lee el archivo a importar (CSV o XLSX) con una columna "Fila" para el reporte"""
+    sheet_name, columns, required = _IMPORT_SPECS[kind]
+    suffix = path.suffix.lower()
+    
+    if suffix == ".csv":
+        import csv
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                # Excel en español suele guardar los CSV separados por ";"
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+            except csv.Error:
+                dialect = csv.excel
+            rows = csv.reader(f, dialect)
+            header = [h.strip() for h in next(rows, [])]
+            missing = [c for c in required if c not in header]
+            if missing:
+                names = " y ".join(f"'{c}'" for c in required)
+                raise ValueError(f"El archivo CSV debe tener las columnas {names} en el encabezado")
+            return _rows_to_frame([header, *rows], path.name, columns, required, row_numbers=True)
+    
+    if suffix in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            # La hoja con el nombre del tipo si existe, si no la primera
+            name = sheet_name if sheet_name in wb.sheetnames else wb.sheetnames[0]
+            rows = wb[name].iter_rows(values_only=True)
+            return _rows_to_frame(rows, name, columns, required, row_numbers=True)
+        finally:
+            wb.close()
+    
+    raise ValueError(f"Formato no soportado para importar: {path.suffix} (usa .csv o .xlsx)")
+
+def _import_photo(foto: str, base_dir: Path) -> str:
+    """Guarda en el almacen la foto de una fila importada (igual que add_product) y retorna su referencia"""
+    if not foto or image_store.is_image_ref(foto):
+        return foto
+    # Ruta absoluta o relativa a la carpeta del archivo importado; si no, nombre del esquema anterior
+    source = Path(foto)
+    if not source.is_absolute():
+        source = base_dir / source
+    if not source.is_file():
+        source = image_store.legacy_path(foto)
+    try:
+        return image_store.put(source)
+    except Exception as e:
+        print(f"Error al procesar imagen {foto}: {e}")
+        # Continuar sin imagen si hay error
+        return ""
+
+def _bulk_import(path, kind: str) -> pd.DataFrame:
+    """Importa en bloque: valida todo el archivo con operaciones vectorizadas y escribe una sola vez"""
+    path = Path(path)
+    if not path.exists():
+        raise ValueError(f"El archivo {path} no existe")
+    
+    start = time.perf_counter()
+    columns = _IMPORT_SPECS[kind][1]
+    df = _read_import_source(path, kind)
+    for column in columns:
+        df[column] = df[column].str.strip()
+    keys = df["Nombre"].str.casefold()
+    
+    # Motivo de rechazo de cada fila ("" = aceptada); se evalua en orden de prioridad
+    reason = pd.Series("", index=df.index, dtype=object)
+    def reject(mask, text):
+        reason[mask & (reason == "")] = text
+    
+    reject(df["Nombre"] == "", "Nombre vacio")
+    if kind == "suppliers":
+        reject(~df["Correo"].str.match(_EMAIL_RE), "Correo no valido")
+    
+    with _lock:
+        products_df, suppliers_df = _load_data()
+        current = products_df if kind == "products" else suppliers_df
+        # Cruce por hash contra los nombres existentes (indice de nombres del cache)
+        existing = pd.Index(list(_name_index(kind, current))) if not current.empty else pd.Index([])
+        reject(keys.isin(existing), "Ya existe en el catalogo")
+        reject(keys.where(reason == "").duplicated(), "Repetido en el archivo")
+        
+        accepted = df.loc[reason == "", columns]
+        if kind == "products" and not accepted.empty:
+            # Una vez por archivo distinto aunque varios productos compartan la foto
+            refs = {foto: _import_photo(foto, path.parent) for foto in accepted["Foto"].unique()}
+            accepted = accepted.assign(Foto=accepted["Foto"].map(refs))
+        if not accepted.empty:
+            first = _next_label(current)
+            accepted.index = pd.RangeIndex(first, first + len(accepted))
+            new_df = _append_rows(current, accepted)
+            if kind == "products":
+                products_df = new_df
+            else:
+                suppliers_df = new_df
+            # Un solo cambio para todo el archivo: una escritura al diario / SQLite
+            _apply_changes(products_df, suppliers_df, {
+                "op": "add", "kind": kind, "rows": accepted.to_dict(orient="records")
+            })
+    
+    report = pd.DataFrame({
+        "Fila": df["Fila"],
+        "Nombre": df["Nombre"],
+        "Estado": reason.eq("").map({True: "aceptado", False: "rechazado"}),
+        "Motivo": reason,
+    })
+    print(
+        f"Importacion de {path.name}: {len(accepted)} aceptado(s), "
+        f"{len(df) - len(accepted)} rechazado(s) en {time.perf_counter() - start:.2f}s"
+    )
+    return report
+
+def bulk_import_products(path) -> pd.DataFrame:
+    """Importa productos desde un CSV o XLSX (columnas Nombre, Descripcion, Foto).
+    
+    Foto es la ruta de una imagen (absoluta o relativa al archivo importado);
+    se guarda en el almacen de imagenes igual que en add_product.
+    Retorna un reporte por fila con columnas Fila, Nombre, Estado
+    ("aceptado"/"rechazado") y Motivo.
+    """
+    return _bulk_import(path, "products")
+
+def bulk_import_suppliers(path) -> pd.DataFrame:
+    """Importa proveedores desde un CSV o XLSX (columnas Nombre, Correo).
+    
+    Retorna un reporte por fila con columnas Fila, Nombre, Estado
+    ("aceptado"/"rechazado") y Motivo.
+    """
+    return _bulk_import(path, "suppliers")
+
 # -------------------- Utilidades para la UI --------------------
 
 def search_products(query: str) -> pd.DataFrame:
-    """Filtro por substring case-insensitive en Nombre o Descripcion"""
-    q = _casefold(query)
+    """Filtro por substring (sin mayusculas ni acentos) en Nombre o Descripcion"""
+    q = _normalize_text(query)
     
-    products_df, _ = _load_excel_data()
+    products_df, _ = _load_data()
     if products_df.empty:
         return pd.DataFrame(columns=COLUMNS_PRODUCTS)
     
     if not q:
         return products_df
     else:
-        mask = (products_df['Nombre'].str.lower().str.contains(q, na=False) |
-               products_df['Descripcion'].str.lower().str.contains(q, na=False))
-        return products_df[mask]
+        return products_df.loc[_search_index("products", products_df).search(q)]
 
 def search_suppliers(query: str) -> pd.DataFrame:
-    """Filtro por substring case-insensitive en Nombre o Correo"""
-    q = _casefold(query)
+    """Filtro por substring (sin mayusculas ni acentos) en Nombre o Correo"""
+    q = _normalize_text(query)
     
-    _, suppliers_df = _load_excel_data()
+    _, suppliers_df = _load_data()
     if suppliers_df.empty:
         return pd.DataFrame(columns=COLUMNS_SUPPLIERS)
     
     if not q:
         return suppliers_df
     else:
-        mask = (suppliers_df['Nombre'].str.lower().str.contains(q, na=False) |
-               suppliers_df['Correo'].str.lower().str.contains(q, na=False))
-        return suppliers_df[mask]
+        return suppliers_df.loc[_search_index("suppliers", suppliers_df).search(q)]
 
-def get_products_by_names(names: Iterable[str]) -> List[Dict[str, str]]:
-    """Devuelve lista de dicts de productos {Nombre, Descripcion} para los nombres dados"""
+def get_products_by_names(names: Iterable[str]) -> List[ProductRecord]:
+    """Devuelve los productos (registros con Nombre, Descripcion, Foto) para los nombres dados"""
     wanted = {_casefold(n) for n in names if _normalize_text(n)}
     
     if not wanted:
         return []
     
-    products_df, _ = _load_excel_data()
+    products_df, _ = _load_data()
     if products_df.empty:
         return []
     
-    # Filtrar productos por nombres
-    mask = products_df['Nombre'].str.lower().isin(wanted)
-    filtered_df = products_df[mask]
-    return filtered_df.to_dict(orient="records")
+    # Resolver nombres con el indice (sin recorrer toda la columna)
+    labels = _labels_for_names("products", products_df, wanted)
+    return product_records(products_df, labels)
 
-def get_suppliers_by_names(names: Iterable[str]) -> List[Dict[str, str]]:
-    """Devuelve lista de dicts de proveedores {Nombre, Correo} para los nombres dados"""
+def get_suppliers_by_names(names: Iterable[str]) -> List[SupplierRecord]:
+    """Devuelve los proveedores (registros con Nombre, Correo) para los nombres dados"""
     wanted = {_casefold(n) for n in names if _normalize_text(n)}
     
     if not wanted:
         return []
     
-    _, suppliers_df = _load_excel_data()
+    _, suppliers_df = _load_data()
     if suppliers_df.empty:
         return []
     
-    # Filtrar proveedores por nombres
-    mask = suppliers_df['Nombre'].str.lower().isin(wanted)
-    filtered_df = suppliers_df[mask]
-    return filtered_df.to_dict(orient="records")
+    # Resolver nombres con el indice (sin recorrer toda la columna)
+    labels = _labels_for_names("suppliers", suppliers_df, wanted)
+    return supplier_records(suppliers_df.loc[labels])
+
+def list_products() -> List[ProductRecord]:
+    """Todos los productos como registros livianos (para listas de la UI)"""
+    products_df, _ = _load_data()
+    return product_records(products_df) if not products_df.empty else []
+
+def list_suppliers() -> List[SupplierRecord]:
+    """Todos los proveedores como registros livianos (para listas de la UI)"""
+    _, suppliers_df = _load_data()
+    return supplier_records(suppliers_df) if not suppliers_df.empty else []
+
+def get_memory_usage() -> Dict[str, float]:
+    """MB que ocupan en memoria los DataFrames del catalogo cargado"""
+    with _lock:
+        return {
+            kind: round(float(_cache[kind].memory_usage(deep=True).sum()) / 1e6, 2) if _cache[kind] is not None else 0.0
+            for kind in ("products", "suppliers")
+        }
 
 def force_save():
     """Fuerza el guardado de todos los cambios pendientes"""
-    # En Excel, los datos se guardan automáticamente en cada operación
-    print("Datos guardados en Excel")
+    with _lock:
+        _flush_pending()
+    
+    # En Excel ademas se consolida el diario en el libro
+    if _MODE == "excel" and not compact_journal():
+        print("No hay cambios pendientes por guardar")
 
 def get_database_status():
     """Obtiene el estado de la base de datos"""
-    products_df, suppliers_df = _load_excel_data()
+    products_df, suppliers_df = _load_data()
     return {
         "products": len(products_df),
         "suppliers": len(suppliers_df),
-        "database_path": str(EXCEL_PATH),
-        "mode": "Excel"
+        "database_path": str(_storage_path()),
+        "mode": get_current_mode(),
+        "journal": get_journal_status(),
+        "cache": get_cache_stats()
     }
 
 # -------------------- Funciones de carga de Excel --------------------
 
+class LoadCancelled(Exception):
+    """La carga de un catalogo se cancelo antes de reemplazar al actual"""
+
+def load_catalog_file(file_path, progress: Optional[Callable] = None) -> Dict[str, object]:
+    """Lee un Excel, construye sus indices y lo deja como catalogo activo.
+    
+    Pensada para correr en un hilo aparte: mientras se lee el archivo el
+    catalogo anterior sigue disponible y solo se reemplaza al final, de una
+    vez y bajo el lock. `progress(etapa, **datos)` se llama con las etapas
+    "rows", "sheet", "journal", "index" e "install"; si lanza LoadCancelled
+    (o cualquier otra excepcion) la carga se interrumpe sin tocar el catalogo
+    actual. No muestra dialogos.
+    """
+    global EXCEL_PATH
+    file_path = Path(file_path)
+    if not file_path.exists():
+        raise ValueError(f"El archivo {file_path} no existe")
+    
+    # Leer datos del Excel (valida que existan las hojas y columnas obligatorias)
+    products_df, suppliers_df = _read_excel_catalog(file_path, progress)
+    indexes = _build_indexes(products_df, suppliers_df, progress)
+    if progress:
+        # Ultima oportunidad de cancelar: despues de esto se reemplaza el catalogo
+        progress("install")
+    
+    # Establecer la ruta global y dejar el catalogo listo en el cache
+    with _lock:
+        _flush_pending()
+        EXCEL_PATH = file_path
+        if _MODE == "sqlite":
+            # En modo SQLite el Excel elegido reemplaza el contenido de la base
+            sqlite_store.replace_catalog(SQLITE_PATH, products_df, suppliers_df)
+        _store_cache(products_df, suppliers_df, indexes)
+        # Si quedaron cambios de una sesion anterior, consolidarlos en segundo plano
+        _schedule_compaction()
+    
+    return {
+        "path": str(file_path),
+        "products": int((products_df["Nombre"].str.strip() != "").sum()),
+        "suppliers": int((suppliers_df["Nombre"].str.strip() != "").sum()),
+    }
+
 def load_excel_file(file_path: Optional[str] = None) -> bool:
     """Carga un archivo Excel y establece la ruta global"""
-    global EXCEL_PATH
+    # tkinter solo se necesita aqui (dialogos); no se importa al cargar el modulo
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     
     if file_path is None:
         # Abrir diálogo para seleccionar archivo
@@ -308,47 +1256,137 @@ def load_excel_file(file_path: Optional[str] = None) -> bool:
         return False
     
     try:
-        # Leer datos del Excel
-        products_df = pd.read_excel(file_path, sheet_name="Productos", dtype=str)
-        suppliers_df = pd.read_excel(file_path, sheet_name="Proveedores", dtype=str)
-        
-        # Limpiar datos
-        products_df = products_df.fillna("").astype(str)
-        suppliers_df = suppliers_df.fillna("").astype(str)
-        
-        # Validar estructura
-        if 'Nombre' not in products_df.columns:
-            messagebox.showerror("Error", "El archivo Excel debe tener una columna 'Nombre' en la hoja 'Productos'")
-            return False
-        
-        if 'Nombre' not in suppliers_df.columns or 'Correo' not in suppliers_df.columns:
-            messagebox.showerror("Error", "El archivo Excel debe tener columnas 'Nombre' y 'Correo' en la hoja 'Proveedores'")
-            return False
-        
-        # Establecer la ruta global
-        EXCEL_PATH = file_path
-        
-        # Mostrar resumen
-        products_count = len(products_df[products_df['Nombre'].str.strip() != ''])
-        suppliers_count = len(suppliers_df[suppliers_df['Nombre'].str.strip() != ''])
+        summary = load_catalog_file(file_path)
         
         messagebox.showinfo("Éxito", 
             f"Archivo Excel cargado exitosamente!\n\n"
-            f"Productos cargados: {products_count}\n"
-            f"Proveedores cargados: {suppliers_count}\n"
+            f"Productos cargados: {summary['products']}\n"
+            f"Proveedores cargados: {summary['suppliers']}\n"
             f"Archivo: {file_path.name}"
         )
         
         return True
         
+    except ValueError as e:
+        messagebox.showerror("Error", str(e))
+        return False
     except Exception as e:
         messagebox.showerror("Error", f"Error al cargar el archivo Excel: {str(e)}")
         return False
 
+# -------------------- Backend de almacenamiento --------------------
+
 def get_current_mode() -> str:
     """Retorna el modo actual de la base de datos"""
-    return "Excel"
+    return "SQLite" if _MODE == "sqlite" else "Excel"
+
+def _default_sqlite_path() -> Path:
+    """Base SQLite junto al Excel cargado (o en la carpeta de datos del usuario si aun no hay Excel)"""
+    if EXCEL_PATH is not None:
+        return EXCEL_PATH.with_suffix(".db")
+    return USER_DATA_DIR / "database.db"
+
+def set_mode(mode: str, db_path: Optional[str] = None) -> None:
+    """Establece el modo de la base de datos: "excel" o "sqlite".
+    
+    La primera vez que se activa SQLite con una base vacia se importa el
+    Excel cargado. Las funciones publicas funcionan igual en ambos modos.
+    """
+    global _MODE, SQLITE_PATH
+    
+    mode = _casefold(mode)
+    if mode not in ("excel", "sqlite"):
+        raise ValueError(f"Modo de base de datos no soportado: '{mode}'")
+    
+    # Los cambios pendientes pertenecen al backend anterior
+    _flush_pending()
+    
+    if mode == "sqlite":
+        SQLITE_PATH = Path(db_path) if db_path else (SQLITE_PATH or _default_sqlite_path())
+        sqlite_store.init_database(SQLITE_PATH)
+        if sqlite_store.is_empty(SQLITE_PATH) and EXCEL_PATH is not None and EXCEL_PATH.exists():
+            import_excel_to_sqlite(EXCEL_PATH)
+    
+    _MODE = mode
+    clear_cache()
+
+def import_excel_to_sqlite(excel_path: Optional[str] = None) -> Dict[str, int]:
+    """Importa (reemplazando) el contenido de un Excel a la base SQLite"""
+    global SQLITE_PATH
+    
+    excel_path = Path(excel_path) if excel_path else EXCEL_PATH
+    if excel_path is None or not excel_path.exists():
+        raise ValueError("No hay un archivo Excel para importar")
+    
+    if SQLITE_PATH is None:
+        SQLITE_PATH = _default_sqlite_path()
+    sqlite_store.init_database(SQLITE_PATH)
+    
+    products_df, suppliers_df = _read_excel_catalog(excel_path)
+    sqlite_store.replace_catalog(SQLITE_PATH, products_df, suppliers_df)
+    if _MODE == "sqlite":
+        _store_cache(products_df, suppliers_df)
+    
+    print(f"Excel importado a SQLite: {SQLITE_PATH}")
+    return {"products": len(products_df), "suppliers": len(suppliers_df)}
 
-def set_mode(mode: str) -> None:
-    """Establece el modo de la base de datos (solo Excel)"""
-    pass  # Solo soportamos Excel
\ No newline at end of file
+def _workbook_headers(path: Path) -> Dict[str, List[str]]:
+    """Titulos de la primera fila de cada hoja del catalogo (solo lee el encabezado)"""
+    from openpyxl import load_workbook
+    
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        headers = {}
+        for sheet_name, _, _ in _SHEETS:
+            if sheet_name in wb.sheetnames:
+                first = next(wb[sheet_name].iter_rows(max_row=1, values_only=True), ())
+                headers[sheet_name] = [t for t in (_cell_to_str(v).strip() for v in first) if t]
+        return headers
+    finally:
+        wb.close()
+
+def export_to_excel(file_path: Optional[str] = None) -> Path:
+    """Exporta el catalogo actual (de cualquier backend) a un archivo Excel
+    
+    Sin `file_path` se escribe sobre el Excel cargado, pero no si ese libro
+    tiene columnas que el catalogo no conoce (se perderian): en ese caso hay
+    que indicar el archivo de destino.
+    """
+    _flush_pending()
+    
+    target = Path(file_path) if file_path else EXCEL_PATH
+    if target is None:
+        raise ValueError("No se indico el archivo Excel de destino")
+    
+    if _MODE == "excel" and target == EXCEL_PATH:
+        # Exportar al mismo libro es consolidar su diario
+        force_save()
+        return target
+    
+    products_df, suppliers_df = _load_data()
+    if products_df.empty:
+        products_df = pd.DataFrame(columns=COLUMNS_PRODUCTS)
+    if suppliers_df.empty:
+        suppliers_df = pd.DataFrame(columns=COLUMNS_SUPPLIERS)
+    
+    if file_path is None and target.exists():
+        frames = {"Productos": products_df, "Proveedores": suppliers_df}
+        lost = {
+            sheet_name: [c for c in titles if c not in frames[sheet_name].columns]
+            for sheet_name, titles in _workbook_headers(target).items()
+        }
+        lost = {sheet_name: titles for sheet_name, titles in lost.items() if titles}
+        if lost:
+            detail = "; ".join(f"{sheet_name}: {', '.join(titles)}" for sheet_name, titles in lost.items())
+            raise ValueError(
+                f"El Excel {target.name} tiene columnas que no estan en la base ({detail}). "
+                "Exporta a otro archivo para no perderlas."
+            )
+    
+    _write_excel(target, products_df, suppliers_df)
+    _save_snapshot(target, products_df, suppliers_df)
+    # El libro exportado ya tiene el estado completo: un diario viejo no aplica
+    journal_path_for(target).unlink(missing_ok=True)
+    
+    print(f"Catalogo exportado a Excel: {target}")
+    return target
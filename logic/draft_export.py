@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+# --- Exportar borradores ---
+# En lugar de enviar, los correos de un lote se escriben a disco como
+# mensajes RFC 5322: un .eml por proveedor (Outlook los abre como borrador
+# gracias a X-Unsent) o un solo archivo mbox (se importa en Thunderbird y
+# otros clientes). Sirve para revisar un envio sin mandar nada.
+#
+# Los mensajes se arman en varios hilos pero se escriben en orden apenas
+# estan listos: en memoria hay a lo sumo unos pocos mensajes a la vez, sin
+# importar cuantos proveedores tenga el lote. Los adjuntos ya vienen
+# codificados una sola vez (AttachmentManifest), asi que armar un mensaje es
+# sobre todo unir bytes.
+
+_UNSAFE_NAME = re.compile(r'[<>:"/\\|?*\x00-\x1f]+')
+_MBOX_FROM = re.compile(rb"^(>*From )", re.MULTILINE)
+
+def safe_filename(name: str, limit: int = 60) -> str:
+    """Nombre de archivo valido en Windows a partir del nombre del proveedor"""
+    name = _UNSAFE_NAME.sub("_", name).strip(" .")
+    return name[:limit] or "sin_nombre"
+
+class EmlWriter:
+    """Un archivo .eml por mensaje dentro de `directory`"""
+
+    def __init__(self, directory: Path):
+        self.path = Path(directory)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.files = []
+
+    def write(self, index: int, name: str, data: bytes) -> None:
+        path = self.path / f"{index + 1:04d} - {safe_filename(name)}.eml"
+        path.write_bytes(data)
+        self.files.append(path)
+
+    def close(self) -> None:
+        pass
+
+class MboxWriter:
+    """Todos los mensajes en un solo archivo mbox (formato mboxrd)"""
+
+    def __init__(self, path: Path, sender: str = ""):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sender = sender or "MAILER-DAEMON"
+        self._file = open(self.path, "wb")
+
+    def write(self, index: int, name: str, data: bytes) -> None:
+        # mbox usa saltos de linea LF y separa mensajes con una linea "From ";
+        # las lineas del mensaje que empiezan asi se escapan con ">"
+        data = data.replace(b"\r\n", b"\n")
+        if b"From " in data:  # busqueda rapida; el regex solo si hace falta (">From " tambien la contiene)
+            data = _MBOX_FROM.sub(rb">\1", data)
+        self._file.write(f"From {self.sender} {time.asctime()}\n".encode("ascii", "replace"))
+        self._file.write(data)
+        if not data.endswith(b"\n"):
+            self._file.write(b"\n")
+        self._file.write(b"\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+def export_messages(
+    items: Iterable[tuple[str, object]],
+    render: Callable[[object], bytes],
+    writer,
+    workers: int = 4,
+    on_written: Optional[Callable[[int, str, int], None]] = None,
+) -> int:
+    """Arma cada (nombre, dato) con `render` en varios hilos y lo escribe en orden con `writer`.
+
+    Hay a lo sumo 2 * workers mensajes armados esperando a ser escritos.
+    `on_written(indice, nombre, bytes)` se llama despues de escribir cada
+    uno. Retorna la cantidad de mensajes escritos.
+    """
+    workers = max(1, workers)
+    pending = deque()
+    written = 0
+    cancel = threading.Event()
+
+    def task(item):
+        if cancel.is_set():
+            return b""
+        return render(item)
+
+    def write_next() -> None:
+        nonlocal written
+        name, future = pending.popleft()
+        data = future.result()
+        writer.write(written, name, data)
+        if on_written:
+            on_written(written, name, len(data))
+        written += 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="draft-export") as executor:
+        try:
+            for name, item in items:
+                pending.append((name, executor.submit(task, item)))
+                if len(pending) >= 2 * workers:
+                    write_next()
+            while pending:
+                write_next()
+        except BaseException:
+            # Un error al armar o escribir: no seguir con los que faltan
+            cancel.set()
+            raise
+    return written
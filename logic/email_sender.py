@@ -6,33 +6,99 @@ import time
 import subprocess
 import urllib.parse
 import os
+import threading
+import base64
+import hashlib
+import json
+import queue
+from concurrent.futures import wait as wait_futures
 
-# Windows-specific import
-if platform.system() == "Windows":
-    import win32com.client as win32
-else:
-    win32 = None
+from logic import draft_export, image_store, outbox as outbox_store, send_trace
+from logic.email_template import CompiledTemplate, PreparedMessage, compile_template
+from logic.mail_transport import (
+    AttachmentManifest, CircuitBreaker, HealthProbe, OutgoingMessage, Transport, TransportUnavailable,
+    message_bytes, smtp_from_env,
+)
+from logic.app_paths import USER_DATA_DIR, app_root
+from logic.outbox import Outbox
+from logic.send_pipeline import SendResult, new_executor, run_pipeline
+
+# win32com (solo Windows) tarda en importarse: se carga recien al usar Outlook
+win32 = None
+
+def _win32():
+    """Devuelve win32com.client, importandolo la primera vez (None fuera de Windows)"""
+    global win32
+    if win32 is None and platform.system() == "Windows":
+        import win32com.client
+        win32 = win32com.client
+    return win32
 
 def get_base_dir():
     """Obtiene la ruta base de la aplicación, funcionando tanto en desarrollo como en el exe"""
-    if 'APP_ROOT' in os.environ:
-        return Path(os.environ['APP_ROOT'])
-    return Path(__file__).resolve().parents[1]
+    return app_root()
 
 BASE_DIR = get_base_dir()
 TEMPLATE_PATH = BASE_DIR / "data" / "email_template.txt"
-IMAGES_DIR = BASE_DIR / "data" / "product_images"
+IMAGES_DIR = image_store.IMAGES_DIR
+
+# Envio masivo: hilos en paralelo, mensajes por segundo (en total y por dominio
+# del destinatario, None = sin limite) y tiempo maximo por mensaje
+SEND_WORKERS = 4
+SEND_RATE_PER_SECOND = 2.0
+SEND_RATE_PER_DOMAIN = None
+SEND_TIMEOUT_SECONDS = 120
+
+# Reintentos de un envío fallido (se esperan 2, 4, 8... segundos entre intentos)
+SEND_MAX_ATTEMPTS = 3
+SEND_BACKOFF_SECONDS = 2.0
+SEND_BACKOFF_MAX_SECONDS = 60.0
+
+# Salud del transporte: la prueba de conexión se reutiliza este tiempo (si salió
+# bien) y no puede tardar más que el máximo (Outlook se puede colgar en DispatchEx).
+# Tras varios fallos seguidos un método (COM, PowerShell, SMTP) se deja de usar
+# por un rato y después se prueba con un solo mensaje.
+HEALTH_CHECK_TTL_SECONDS = 60
+OUTLOOK_PROBE_TIMEOUT_SECONDS = 20
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN_SECONDS = 60
+
+# Medición de cada lote (ver send_trace): resumen JSON y trazas para Chrome
+# en send_reports de la carpeta de datos del usuario (la de la app se borra al
+# cerrar el exe), se guardan los últimos SEND_TRACE_KEEP lotes
+SEND_TRACE_ENABLED = True
+SEND_TRACE_DIR = USER_DATA_DIR / "send_reports"
+SEND_TRACE_KEEP = 20
+
+EMAIL_SUBJECT = "Cotización de elementos"
+
+# Tamaño máximo de los adjuntos de un mensaje ya codificados (Exchange/Outlook
+# rechaza por defecto mensajes de más de 20 MB)
+MAX_ATTACHMENT_BYTES = 20 * 1024 * 1024
+
+# Plantilla leida: se vuelve a leer solo si cambia la ruta, la fecha o el tamaño del archivo
+_template_cache = {"key": None, "text": None}
 
 def load_template() -> str:
     """ Carga el contenido de la plantilla del Email """
-    if not TEMPLATE_PATH.exists():
+    try:
+        stat = TEMPLATE_PATH.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"No se encontro la plantilla en {TEMPLATE_PATH}."
             "Crea un archivo 'email_template' en /data "
         )
     
-    with open(TEMPLATE_PATH, "r", encoding= "utf-8") as f:
-        return f.read()
+    key = (str(TEMPLATE_PATH), stat.st_mtime_ns, stat.st_size)
+    if _template_cache["key"] != key:
+        with open(TEMPLATE_PATH, "r", encoding= "utf-8") as f:
+            _template_cache.update(key=key, text=f.read())
+    return _template_cache["text"]
+
+def get_compiled_template() -> CompiledTemplate:
+    """ Plantilla del Email compilada (ver email_template) """
+    with send_trace.span("plantilla.cargar"):
+        return compile_template(load_template())
 
 def check_outlook_availability() -> bool:
     """ Verifica si Outlook está disponible y configurado """
@@ -43,9 +109,9 @@ def check_outlook_availability() -> bool:
     try:
         # Intentar diferentes métodos de conexión
         connection_methods = [
-            ("GetActiveObject", lambda: win32.GetActiveObject("Outlook.Application")),
-            ("Dispatch", lambda: win32.Dispatch("Outlook.Application")),
-            ("DispatchEx", lambda: win32.DispatchEx("Outlook.Application"))
+            ("GetActiveObject", lambda: _win32().GetActiveObject("Outlook.Application")),
+            ("Dispatch", lambda: _win32().Dispatch("Outlook.Application")),
+            ("DispatchEx", lambda: _win32().DispatchEx("Outlook.Application"))
         ]
         
         for method_name, method_func in connection_methods:
@@ -85,9 +151,9 @@ def test_outlook_connection() -> tuple[bool, str]:
     try:
         # Intentar diferentes métodos de conexión
         connection_methods = [
-            ("GetActiveObject", lambda: win32.GetActiveObject("Outlook.Application")),
-            ("Dispatch", lambda: win32.Dispatch("Outlook.Application")),
-            ("DispatchEx", lambda: win32.DispatchEx("Outlook.Application"))
+            ("GetActiveObject", lambda: _win32().GetActiveObject("Outlook.Application")),
+            ("Dispatch", lambda: _win32().Dispatch("Outlook.Application")),
+            ("DispatchEx", lambda: _win32().DispatchEx("Outlook.Application"))
         ]
         
         for method_name, method_func in connection_methods:
@@ -140,8 +206,9 @@ def diagnose_outlook_issues() -> str:
         diagnosis.append("Solo funciona en Windows")
         return "\n".join(diagnosis)
     
-    # Verificar conexión básica
-    success, message = test_outlook_connection()
+    # Verificar conexión básica (prueba nueva, con tiempo máximo; refresca la que usan los envíos)
+    transport = _share_health(("outlook",), OutlookTransport())
+    success, message = transport.probe.result(max_age=0)
     if success:
         diagnosis.append(f" {message}")
     else:
@@ -158,6 +225,11 @@ def diagnose_outlook_issues() -> str:
             diagnosis.append("   1. Verifica que Outlook esté instalado")
             diagnosis.append("   2. Intenta abrir Outlook manualmente")
             diagnosis.append("   3. Si no tienes Outlook, instala Microsoft Outlook")
+        elif "no respondió" in message.lower():
+            diagnosis.append(" RECOMENDACIÓN: Outlook está ocupado o esperando una respuesta")
+            diagnosis.append("   1. Revisa si Outlook tiene abierta una ventana o un aviso")
+            diagnosis.append("   2. Espera a que termine de iniciar y vuelve a diagnosticar")
+            diagnosis.append("   3. Si sigue igual, cierra Outlook desde el Administrador de tareas y ábrelo de nuevo")
         elif "cadena clase no válida" in message.lower():
             diagnosis.append(" RECOMENDACIÓN: Problema con la instalación de Outlook")
             diagnosis.append("   1. Repara la instalación de Office/Outlook")
@@ -174,7 +246,7 @@ def generate_email_draft(suppliers: list[dict], products: list[dict], cc_email:
     if not products:
         raise ValueError("No se proporcionaron productos")
     
-    template = load_template()
+    prepared = get_compiled_template().prepare(products)
     output_lines = []
     
     for supplier in suppliers:
@@ -184,7 +256,7 @@ def generate_email_draft(suppliers: list[dict], products: list[dict], cc_email:
         if not supplier_name or not supplier_email:
             continue
         
-        body = build_message(template, supplier_name, products)
+        body = prepared.render(supplier_name)
         
         output_lines.append("=" * 50)
         output_lines.append(f"PARA: {supplier_email}")
@@ -197,136 +269,255 @@ def generate_email_draft(suppliers: list[dict], products: list[dict], cc_email:
     
     return "\n".join(output_lines)
 
-
-def send_email_via_powershell(supplier_name: str, supplier_email: str, products: list[dict], cc_email: str = "") -> None:
-    """ Envía email usando PowerShell y Outlook (envío automático real) """
+def export_email_drafts(suppliers: list[dict], products: list[dict], destination, cc_email: str = "",
+                        mbox: bool = False, workers: int = None, sender: str = None, on_progress=None) -> dict:
+    """ Escribe los correos del lote a disco en lugar de enviarlos (prueba sin enviar nada).
     
-    # Validar que el email del proveedor no esté vacío
-    if not supplier_email or not supplier_email.strip():
-        raise ValueError(f"Email del proveedor '{supplier_name}' está vacío o es inválido")
+    `destination` es una carpeta con un .eml por proveedor o, con mbox=True,
+    un solo archivo mbox. Los mensajes son los mismos que se enviarían
+    (cuerpo y adjuntos) y se escriben a medida que se arman, así que la
+    memoria no crece con la cantidad de proveedores. Sin `sender` se usa
+    SMTP_FROM/SMTP_USER y si no hay, el borrador queda sin From (lo completa
+    el cliente de correo). `on_progress("written", done, supplier, bytes)`
+    se llama por cada mensaje escrito. Retorna {"path", "messages", "bytes", "skipped"}.
+    """
+    from email.utils import formatdate, make_msgid
     
-    # Limpiar y validar datos
-    supplier_name = str(supplier_name).strip()
-    supplier_email = str(supplier_email).strip()
+    if not suppliers:
+        raise ValueError("No se proporcionaron proveedores")
     
-    template = load_template()
-    body = build_message(template, supplier_name, products)
+    if not products:
+        raise ValueError("No se proporcionaron productos")
     
-    # Limpiar el cuerpo del mensaje de caracteres problemáticos
-    body = body.replace('\x00', '')  # Remover caracteres nulos
-    body = body.replace('"', '""')  # Escapar comillas dobles para PowerShell
-    body = body.replace('\n', '\n')  # Mantener saltos de línea normales para PowerShell
-    body = body.replace('\r', '')  # Remover retornos de carro
-    
-    # Preparar el asunto
-    subject = "Cotización de elementos"
-    subject = subject.replace('"', '""')  # Escapar comillas dobles
-    
-    # Construir el script de PowerShell con mejor manejo de errores
-    ps_script = f'''
-try {{
-    $outlook = New-Object -ComObject Outlook.Application
-    $mail = $outlook.CreateItem(0)
-    $mail.To = "{supplier_email}"
-    $mail.Subject = "{subject}"
-    $mail.Body = @"
-{body}
-"@
-    
-    # Adjuntar imágenes si existen
-    $images = @(
-'''
-    
-    # Agregar rutas de imágenes al script
-    for product in products:
-        foto = product.get('Foto', '').strip()
-        if foto:
-            image_path = IMAGES_DIR / foto
-            if image_path.exists():
-                ps_script += f'        "{str(image_path)}",\n'
+    if sender is None:
+        sender = (os.environ.get("SMTP_FROM", "") or os.environ.get("SMTP_USER", "")).strip()
+    prepared = get_compiled_template().prepare(products)
+    manifest = build_attachment_manifest(products)
+    
+    skipped = []
+    
+    def items():
+        for supplier in suppliers:
+            supplier_name = str(supplier.get("Nombre", "") or "").strip()
+            supplier_email = str(supplier.get("Correo", "") or "").strip()
+            if not supplier_name or not supplier_email:
+                skipped.append(supplier_name or supplier_email)
+                continue
+            yield supplier_name, (supplier_name, supplier_email)
+    
+    def render(item):
+        supplier_name, supplier_email = item
+        message = build_outgoing(supplier_name, supplier_email, products, cc_email, prepared, manifest)
+        return message_bytes(message, sender, [
+            ("Date", formatdate(localtime=True)),
+            ("Message-ID", make_msgid(domain="cotizacion.local")),
+            # Outlook abre el .eml como un borrador listo para enviar
+            ("X-Unsent", "1"),
+        ])
     
-    ps_script += '''    )
+    total_bytes = 0
     
-    foreach ($imagePath in $images) {
-        if (Test-Path $imagePath) {
-            $mail.Attachments.Add($imagePath)
+    def written(index, supplier_name, size):
+        nonlocal total_bytes
+        total_bytes += size
+        if on_progress:
+            on_progress("written", done=index + 1, supplier=supplier_name, bytes=size)
+    
+    writer = draft_export.MboxWriter(destination, sender) if mbox else draft_export.EmlWriter(destination)
+    try:
+        count = draft_export.export_messages(items(), render, writer,
+                                             workers=SEND_WORKERS if workers is None else workers,
+                                             on_written=written)
+    finally:
+        writer.close()
+    
+    print(f" Borradores exportados: {count} mensaje(s), {total_bytes / 1024:.0f} KB en {writer.path}")
+    return {"path": writer.path, "messages": count, "bytes": total_bytes, "skipped": skipped}
+
+
+# Script que queda corriendo y envía por Outlook cada mensaje que recibe por
+# stdin (una línea JSON por mensaje); responde una línea JSON por mensaje con
+# {id, ok, error}. Los datos nunca se pegan dentro del script, así que no hay
+# que escapar comillas del cuerpo. El JSON de entrada va en ASCII (\uXXXX).
+_POWERSHELL_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+$outlook = $null
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if ($line.Trim() -eq '') { continue }
+    $id = $null
+    $mail = $null
+    try {
+        $msg = $line | ConvertFrom-Json
+        $id = $msg.id
+        if ($outlook -eq $null) { $outlook = New-Object -ComObject Outlook.Application }
+        $mail = $outlook.CreateItem(0)
+        $mail.To = $msg.to
+        if ($msg.cc) { $mail.CC = $msg.cc }
+        $mail.Subject = $msg.subject
+        $mail.Body = $msg.body
+        foreach ($path in $msg.attachments) {
+            if (Test-Path -LiteralPath $path) { [void]$mail.Attachments.Add($path) }
         }
+        $mail.Send()
+        $reply = @{ id = $id; ok = $true; error = '' }
+    } catch {
+        # Se vuelve a abrir Outlook para el siguiente mensaje
+        $outlook = $null
+        $reply = @{ id = $id; ok = $false; error = $_.Exception.Message }
+    } finally {
+        $mail = $null
     }
-'''
-    
-    if cc_email and cc_email.strip():
-        cc_email = cc_email.strip().replace('"', '""')
-        ps_script += f'    $mail.CC = "{cc_email}"\n'
-    
-    ps_script += '''    $mail.Send()
-    Write-Host "Email enviado exitosamente a {supplier_name} ({supplier_email})"
-} catch {
-    Write-Error "Error al enviar email: $($_.Exception.Message)"
-    exit 1
-} finally {
-    if ($mail) { $mail = $null }
-    if ($outlook) { $outlook = $null }
-}'''
+    [Console]::Out.WriteLine(($reply | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+# Ejecutable de PowerShell (se puede cambiar, por ejemplo por un programa de prueba)
+POWERSHELL_EXE = os.environ.get("POWERSHELL_EXE", "powershell")
+POWERSHELL_TIMEOUT_SECONDS = 60
+
+class PowerShellBridge:
+    """ Un solo proceso de PowerShell que envía por Outlook todos los mensajes de un lote.
     
-    try:
-        # Ejecutar el script de PowerShell
-        result = subprocess.run([
-            'powershell', '-ExecutionPolicy', 'Bypass', '-Command', ps_script
-        ], capture_output=True, text=True, timeout=60)
-        
-        if result.returncode != 0:
-            error_msg = result.stderr.strip() if result.stderr else "Error desconocido en PowerShell"
-            raise Exception(f"PowerShell error: {error_msg}")
-        
-        # Verificar que el mensaje de éxito esté en la salida
-        if "Email enviado exitosamente" not in result.stdout:
-            raise Exception("El email no se envió correctamente según PowerShell")
+    Antes se abría un proceso (y una instancia COM de Outlook) por cada
+    correo. El proceso se inicia con el primer mensaje, atiende un mensaje a
+    la vez y se vuelve a iniciar solo si terminó o dejó de responder.
+    """
+    
+    def __init__(self, executable: str = None, timeout: float = POWERSHELL_TIMEOUT_SECONDS):
+        self.executable = executable or POWERSHELL_EXE
+        self.timeout = timeout
+        self.processes_started = 0
+        self._process = None
+        self._replies = None
+        self._last_output = ""
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def _start(self) -> None:
+        encoded = base64.b64encode(_POWERSHELL_SCRIPT.encode("utf-16-le")).decode("ascii")
+        send_trace.count("powershell.procesos")
+        self._process = subprocess.Popen(
+            [self.executable, "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+             "-EncodedCommand", encoded],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+        )
+        self.processes_started += 1
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self._process, self._replies), daemon=True).start()
+    
+    def _read_replies(self, process, replies) -> None:
+        for raw in process.stdout:
+            line = raw.decode("utf-8", errors="replace").strip()
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                reply = None
+            if isinstance(reply, dict) and "id" in reply:
+                replies.put(reply)
+            elif line:
+                # Mensajes de error de PowerShell (no son respuestas)
+                self._last_output = line
+        replies.put(None)
+    
+    def _stop(self) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+        try:
+            process.wait(timeout=5)
+        except Exception:
+            process.kill()
+    
+    def send(self, message: OutgoingMessage) -> None:
+        with self._lock:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            self._next_id += 1
+            request_id = self._next_id
+            request = {
+                "id": request_id,
+                "to": message.to,
+                "cc": message.cc,
+                "subject": message.subject,
+                "body": message.body,
+                "attachments": [str(path) for path in message.attachments],
+            }
+            try:
+                self._process.stdin.write(json.dumps(request).encode("ascii") + b"\n")
+                self._process.stdin.flush()
+            except OSError as e:
+                self._stop()
+                raise Exception(f"PowerShell error: no se pudo enviar el mensaje al proceso ({e})")
             
-    except subprocess.TimeoutExpired:
-        raise Exception("Timeout al enviar email via PowerShell (60 segundos)")
-    except Exception as e:
-        raise Exception(f"Error al enviar email via PowerShell: {str(e)}")
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    reply = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    # Colgado: se termina el proceso y el siguiente mensaje abre otro
+                    self._process.kill()
+                    self._stop()
+                    raise Exception(f"Timeout al enviar email via PowerShell ({self.timeout:g} segundos)")
+                if reply is None:
+                    self._stop()
+                    detail = f": {self._last_output}" if self._last_output else ""
+                    raise Exception(f"PowerShell terminó inesperadamente{detail}")
+                if reply.get("id") == request_id:
+                    break
+        
+        if not reply.get("ok"):
+            raise Exception(f"PowerShell error: {reply.get('error') or 'Error desconocido en PowerShell'}")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+def send_email_via_powershell(supplier_name: str, supplier_email: str, products: list[dict], cc_email: str = "") -> None:
+    """ Envía email usando PowerShell y Outlook (envío automático real) """
+    bridge = PowerShellBridge()
+    try:
+        bridge.send(build_outgoing(supplier_name, supplier_email, products, cc_email))
+    finally:
+        bridge.close()
 
 def build_message(template: str, supplier_name: str, products: list[dict]) -> str:
     """ Rellena la plantilla con datos del proveedor y productos """
-    
-    if not products:
-        product_lines = "No se especificaron productos."
-        has_images = False
-    else:
-        product_lines = []
-        has_images = False
-        for p in products:
-            nombre = str(p.get('Nombre', 'Sin nombre')).strip()
-            descripcion = str(p.get('Descripcion', 'Sin descripción')).strip()
-            foto = p.get('Foto', '').strip()
-            product_lines.append(f"- {nombre}: {descripcion}")
-            if foto:
-                has_images = True
-        product_lines = "\n".join(product_lines)
-    
-    message = template.format(
-        nombre_proveedor=str(supplier_name).strip(),
-        lista_productos=product_lines
-    )
-    
-    # Manejar la sección de nota de imágenes
-    if has_images:
-        message = message.replace("{nota_imagenes}", "")
-        message = message.replace("{/nota_imagenes}", "")
-    else:
-        # Si no hay imágenes, eliminar la sección completa
-        start_tag = "{nota_imagenes}"
-        end_tag = "{/nota_imagenes}"
-        start_pos = message.find(start_tag)
-        end_pos = message.find(end_tag)
-        if start_pos != -1 and end_pos != -1:
-            message = message[:start_pos] + message[end_pos + len(end_tag):]
-    
-    return message
+    return compile_template(template).render(supplier_name, products)
 
-def send_email(supplier_name: str, supplier_email: str, products: list[dict], cc_email: str = "") -> None:
-    """ Envia un solo mensaje a un proveedor via Outlook """
+def build_attachment_manifest(products: list[dict]) -> AttachmentManifest:
+    """ Imágenes a adjuntar para estos productos (cada archivo una vez) """
+    # Variante reducida del almacen de imagenes (o el archivo antiguo si no se migro)
+    paths = []
+    seen = set()
+    for product in products:
+        foto = (product.get('Foto', '') or '').strip()
+        if not foto or foto in seen:
+            continue
+        seen.add(foto)
+        image_path = image_store.email_path(foto)
+        if image_path is not None:
+            paths.append(image_path)
+    return AttachmentManifest(paths)
+
+def build_outgoing(supplier_name: str, supplier_email: str, products: list[dict], cc_email: str = "",
+                   prepared: PreparedMessage = None, manifest: AttachmentManifest = None) -> OutgoingMessage:
+    """ Arma el mensaje para un proveedor (cuerpo desde la plantilla e imágenes adjuntas).
+    
+    En un lote se pasan `prepared` (get_compiled_template().prepare(products))
+    y `manifest` (build_attachment_manifest(products)) para no volver a armar
+    la lista de productos ni revisar las imágenes en cada mensaje.
+    """
     
     # Validar que el email del proveedor no esté vacío
     if not supplier_email or not supplier_email.strip():
@@ -336,106 +527,417 @@ def send_email(supplier_name: str, supplier_email: str, products: list[dict], cc
     supplier_name = str(supplier_name).strip()
     supplier_email = str(supplier_email).strip()
     
-    template = load_template()
-    body = build_message(template, supplier_name, products)
+    if prepared is None:
+        prepared = get_compiled_template().prepare(products)
+    body = prepared.render(supplier_name)
     
     # Limpiar el cuerpo del mensaje de caracteres problemáticos
     body = body.replace('\x00', '')  # Remover caracteres nulos
     body = body.encode('utf-8', errors='ignore').decode('utf-8')  # Limpiar codificación
     
-    outlook = None
-    mail = None
+    if manifest is None:
+        manifest = build_attachment_manifest(products)
+    
+    return OutgoingMessage(
+        to=supplier_email,
+        cc=(cc_email or "").strip(),
+        subject=EMAIL_SUBJECT,
+        body=body,
+        manifest=manifest,
+    )
+
+def send_email(supplier_name: str, supplier_email: str, products: list[dict], cc_email: str = "",
+               transport: Transport = None) -> str:
+    """ Envia un solo mensaje a un proveedor; retorna el método usado (COM, PowerShell, SMTP...) """
+    message = build_outgoing(supplier_name, supplier_email, products, cc_email)
+    supplier_name = str(supplier_name).strip()
     
+    owns_transport = transport is None
+    transport = get_transport() if owns_transport else transport
     try:
-        # Intentar conectar con Outlook de manera más robusta
-        outlook = None
+        method = transport.send(message)
+        print(f" Email enviado exitosamente a {supplier_name} ({message.to})")
+        return method
+    except Exception as e:
+        error_msg = f"Error al enviar email a {supplier_name} ({message.to}): {str(e)}"
+        print(f" {error_msg}")
+        raise Exception(error_msg)
+    finally:
+        if owns_transport:
+            transport.close()
+
+# HRESULT de COM que indican que se perdio la conexion con Outlook (se cerro o se reinicio)
+_COM_DISCONNECTED = {
+    -2147417848,  # RPC_E_DISCONNECTED
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE
+    -2147023170,  # RPC_S_CALL_FAILED
+    -2147220995,  # CO_E_OBJNOTCONNECTED
+}
+
+def _is_com_disconnect(error: Exception) -> bool:
+    hresult = getattr(error, "hresult", None)
+    if hresult is None and error.args and isinstance(error.args[0], int):
+        hresult = error.args[0]
+    return hresult in _COM_DISCONNECTED
+
+class OutlookSession:
+    """ Conexión con Outlook que se reutiliza para varios mensajes.
+    
+    Se conecta y valida las cuentas una sola vez; solo vuelve a conectar si
+    un envío falla porque se perdió la conexión. `com` es el objeto que abre
+    la aplicación (win32com.client por defecto; en pruebas, uno falso con
+    GetActiveObject/Dispatch/DispatchEx).
+    """
+    
+    def __init__(self, com=None):
+        self._com = com
+        self.application = None
+        self.connections = 0
+    
+    def connect(self) -> str:
+        """ Conecta con Outlook y verifica que tenga cuentas; retorna un mensaje de estado """
+        com = self._com or _win32()
+        if com is None:
+            raise Exception("Solo funciona en Windows")
+        self.application = None
         
-        # Primero intentar con GetActiveObject (si Outlook ya está ejecutándose)
-        try:
-            outlook = win32.GetActiveObject("Outlook.Application")
-        except Exception:
-            # Si falla, intentar con Dispatch (crear nueva instancia)
+        outlook = None
+        method_used = ""
+        error = None
+        # Primero GetActiveObject (si Outlook ya está ejecutándose), luego crear una nueva instancia
+        for method_name in ("GetActiveObject", "Dispatch", "DispatchEx"):
             try:
-                outlook = win32.Dispatch("Outlook.Application")
+                outlook = getattr(com, method_name)("Outlook.Application")
+                if outlook is not None:
+                    method_used = method_name
+                    break
             except Exception as e:
-                # Si también falla Dispatch, intentar con DispatchEx
-                try:
-                    outlook = win32.DispatchEx("Outlook.Application")
-                except Exception:
-                    raise Exception(f"No se pudo conectar con Outlook. Error: {str(e)}")
+                error = error or e
         
         # Verificar que Outlook se inicializó correctamente
         if outlook is None:
-            raise Exception("No se pudo inicializar Outlook")
+            raise Exception(f"No se pudo conectar con Outlook. Error: {str(error)}")
         
         # Verificar que Outlook está configurado
         try:
-            # Intentar acceder a la configuración de cuentas
-            accounts = outlook.Session.Accounts
-            if accounts.Count == 0:
-                raise Exception("Outlook no tiene cuentas de email configuradas")
+            account_count = outlook.Session.Accounts.Count
         except Exception as e:
             raise Exception(f"Outlook no está configurado correctamente: {str(e)}")
+        if account_count == 0:
+            raise Exception("Outlook no tiene cuentas de email configuradas")
         
-        # Crear el mensaje
-        mail = outlook.CreateItem(0)  # 0 = olMailItem
-        
-        # Configurar el mensaje
-        mail.To = supplier_email
-        
-        if cc_email and cc_email.strip():
-            mail.CC = cc_email.strip()
-        
-        mail.Subject = "Cotización de elementos"
-        mail.Body = body
-        
-        # Adjuntar imágenes si existen
-        for product in products:
-            foto = product.get('Foto', '').strip()
-            if foto:
-                image_path = IMAGES_DIR / foto
-                if image_path.exists():
+        self.application = outlook
+        self.connections += 1
+        send_trace.count("outlook.conexiones")
+        return f"Outlook conectado exitosamente usando {method_used} con {account_count} cuenta(s) configurada(s)"
+    
+    def send(self, message: OutgoingMessage) -> None:
+        """ Envía un mensaje con la conexión abierta (conecta la primera vez) """
+        if self.application is None:
+            with send_trace.span("outlook.conectar"):
+                self.connect()
+        try:
+            self._send(message)
+        except Exception as e:
+            if not _is_com_disconnect(e):
+                raise
+            # Outlook se cerró o se reinició: se vuelve a conectar y se reintenta una vez
+            print("Se perdió la conexión con Outlook, reconectando...")
+            send_trace.count("outlook.reconexiones")
+            with send_trace.span("outlook.conectar"):
+                self.connect()
+            self._send(message)
+    
+    def _send(self, message: OutgoingMessage) -> None:
+        supplier_email = message.to
+        mail = None
+        try:
+            with send_trace.span("outlook.crear"):
+                # Crear el mensaje
+                mail = self.application.CreateItem(0)  # 0 = olMailItem
+                
+                # Configurar el mensaje
+                mail.To = supplier_email
+                
+                if message.cc:
+                    mail.CC = message.cc
+                
+                mail.Subject = message.subject
+                mail.Body = message.body
+            
+            # Adjuntar imágenes si existen
+            with send_trace.span("outlook.adjuntar", archivos=len(message.attachments)):
+                for image_path in message.attachments:
                     try:
                         mail.Attachments.Add(str(image_path))
                     except Exception as e:
-                        print(f"No se pudo adjuntar la imagen {foto}: {str(e)}")
-        
-        # Verificar que el mensaje se configuró correctamente
-        if not mail.To or mail.To != supplier_email:
-            raise Exception("No se pudo configurar el destinatario del email")
-        
-        # IMPORTANTE: Enviar el mensaje inmediatamente
-        mail.Send()
-        
-        # Pequeña pausa para asegurar que el envío se procese
-        time.sleep(2)
-        
-        print(f" Email enviado exitosamente a {supplier_name} ({supplier_email})")
-        
-    except Exception as e:
-        error_msg = f"Error al enviar email a {supplier_name} ({supplier_email}): {str(e)}"
-        print(f" {error_msg}")
-        raise Exception(error_msg)
+                        if _is_com_disconnect(e):
+                            raise
+                        print(f"No se pudo adjuntar la imagen {image_path.name}: {str(e)}")
+            
+            # Verificar que el mensaje se configuró correctamente
+            if not mail.To or mail.To != supplier_email:
+                raise Exception("No se pudo configurar el destinatario del email")
+            
+            # IMPORTANTE: Enviar el mensaje inmediatamente
+            with send_trace.span("outlook.enviar"):
+                mail.Send()
+        finally:
+            # Soltar la referencia COM del mensaje (la de Outlook se reutiliza)
+            mail = None
     
-    finally:
-        # Limpiar referencias COM de manera más robusta
-        try:
-            if mail:
-                mail = None
-        except:
-            pass
+    def close(self) -> None:
+        self.application = None
+
+class OutlookTransport(Transport):
+    """ Envío por Outlook: COM y, si falla, PowerShell (solo Windows).
+    
+    Cada hilo de envío abre una OutlookSession y la usa para todos sus
+    mensajes (los objetos COM no se comparten entre hilos). COM y PowerShell
+    tienen cada uno su CircuitBreaker: si COM falla varias veces seguidas los
+    mensajes van directo a PowerShell hasta que toque volver a probar COM.
+    """
+    name = "Outlook"
+    
+    def __init__(self, com=None, powershell: PowerShellBridge = None):
+        self._com = com
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        # Respaldo cuando falla COM: un solo proceso de PowerShell para todo el lote
+        self.powershell = powershell or PowerShellBridge()
+        # get_transport los comparte entre lotes (ver _share_health)
+        self.breakers = {
+            "COM": CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS),
+            "PowerShell": CircuitBreaker(BREAKER_FAILURES, BREAKER_COOLDOWN_SECONDS),
+        }
+        self.probe = HealthProbe(self._check, ttl=HEALTH_CHECK_TTL_SECONDS,
+                                 timeout=OUTLOOK_PROBE_TIMEOUT_SECONDS, name="Outlook")
+    
+    def _session(self) -> OutlookSession:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = OutlookSession(self._com)
+            with self._lock:
+                self._sessions.append(session)
+        return session
+    
+    @property
+    def connections(self) -> int:
+        """ Conexiones con Outlook abiertas en este lote (incluye reconexiones) """
+        with self._lock:
+            return sum(session.connections for session in self._sessions)
+    
+    def check(self) -> tuple[bool, str]:
+        """ Resultado cacheado de la prueba de conexión (con tiempo máximo, en otro hilo) """
+        return self.probe.result()
+    
+    def _check(self) -> tuple[bool, str]:
+        # Corre en el hilo de HealthProbe: si Outlook se cuelga, el que pregunta no espera de más
+        if self._com is not None:
+            try:
+                return True, OutlookSession(self._com).connect()
+            except Exception as e:
+                return False, str(e)
+        self.thread_init()
+        return test_outlook_connection()
+    
+    def thread_init(self) -> None:
+        # Outlook no se puede usar desde un hilo sin inicializar COM
+        if self._com is None and _win32() is not None:
+            import pythoncom
+            pythoncom.CoInitialize()
+    
+    def send(self, message: OutgoingMessage) -> str:
+        com, powershell = self.breakers["COM"], self.breakers["PowerShell"]
+        if com.allow():
+            try:
+                self._session().send(message)
+                com.record_success()
+                return "COM"
+            except Exception as e:
+                com.record_failure()
+                com_error = e
+                print(f"Error COM con {message.to}, intentando PowerShell...")
+        else:
+            com_error = com.unavailable("COM")
+            send_trace.count("com.en_pausa")
+        
+        if not powershell.allow():
+            ps_error = powershell.unavailable("PowerShell")
+            if isinstance(com_error, TransportUnavailable):
+                # Los dos en pausa: se falla sin tocar Outlook
+                raise TransportUnavailable(f"COM Error: {str(com_error)} | PowerShell Error: {str(ps_error)}",
+                                           min(com_error.retry_in, ps_error.retry_in))
+            raise Exception(f"COM Error: {str(com_error)} | PowerShell Error: {str(ps_error)}")
         try:
-            if outlook:
-                outlook = None
-        except:
-            pass
+            with send_trace.span("powershell.enviar"):
+                self.powershell.send(message)
+            powershell.record_success()
+            return "PowerShell"
+        except Exception as ps_error:
+            powershell.record_failure()
+            raise Exception(f"COM Error: {str(com_error)} | PowerShell Error: {str(ps_error)}")
+    
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+        self.powershell.close()
+
+# Breakers y prueba de salud por configuración de transporte: cada lote abre su
+# propio transporte (y lo cierra), pero lo aprendido sobre su salud se conserva
+_transport_health = {}
+_transport_health_lock = threading.Lock()
+
+def _share_health(key, transport: Transport) -> Transport:
+    """ Le da al transporte los breakers y la prueba de salud de los anteriores con la misma clave """
+    with _transport_health_lock:
+        breakers, probe = _transport_health.setdefault(key, (transport.breakers, transport.probe))
+    transport.breakers, transport.probe = breakers, probe
+    return transport
+
+def get_transport() -> Transport:
+    """ Transporte configurado: MAIL_TRANSPORT=outlook|smtp (por defecto SMTP si hay SMTP_HOST) """
+    choice = os.environ.get("MAIL_TRANSPORT", "").strip().lower()
+    if choice not in ("", "outlook", "smtp"):
+        raise ValueError(f"MAIL_TRANSPORT inválido: {choice} (usa outlook o smtp)")
+    
+    smtp = smtp_from_env(
+        breaker_failures=BREAKER_FAILURES,
+        breaker_cooldown=BREAKER_COOLDOWN_SECONDS,
+        health_ttl=HEALTH_CHECK_TTL_SECONDS,
+    ) if choice != "outlook" else None
+    if smtp is not None:
+        # Las credenciales van como hash (la clave queda en memoria mientras la app
+        # esté abierta): al corregir la contraseña se empieza con una prueba nueva
+        credentials = hashlib.sha256(f"{smtp.username}\0{smtp.password}".encode("utf-8")).hexdigest()
+        key = ("smtp", smtp.host, smtp.port, smtp.username, smtp.sender, smtp.security, credentials)
+        return _share_health(key, smtp)
+    if choice == "smtp":
+        raise ValueError("MAIL_TRANSPORT=smtp pero no se configuró SMTP_HOST")
+    return _share_health(("outlook",), OutlookTransport())
+
+def format_send_summary(results: list[SendResult]) -> str:
+    """Texto con el resultado del envio para mostrar al usuario"""
+    sent = sum(1 for r in results if r.ok)
+    lines = [f"Se enviaron {sent} de {len(results)} correos."]
+    cancelled = sum(1 for r in results if r.status == SendResult.CANCELLED)
+    if cancelled:
+        lines.append(f"{cancelled} correo(s) no se enviaron por la cancelación.")
+    failed = [r for r in results if not r.ok and r.status != SendResult.CANCELLED]
+    if failed:
+        lines.append("")
+        lines.append("Errores:")
+        for r in failed:
+            lines.append(f"{r.supplier or 'Proveedor desconocido'} ({r.status}): {r.error}")
+    return "\n".join(lines)
+
+class SendProgress:
+    """ Avance de un envío masivo: avisa cada paso con on_progress(etapa, **datos).
+    
+    Etapas: "checking" (transport), "queued" (items: [{supplier, email,
+    status}] en el orden de los proveedores), "sending" y "retry" (supplier,
+    email, attempt / error, retry_in), "sent", "failed" y "cancelled"
+    (result: SendResult) y "waiting" (seconds hasta el próximo reintento).
+    Cada aviso trae además los totales: done, total, sent, failed,
+    cancelled, rate (mensajes por segundo) y eta (segundos que faltan, None
+    si todavía no se puede estimar). Se llama desde los hilos de envío.
+    """
+    QUEUED = "en cola"
+    SENDING = "enviando"
+    
+    def __init__(self, on_progress=None):
+        self.on_progress = on_progress
+        self.total = self.done = self.sent = self.failed = self.cancelled = 0
+        self._finished = 0  # terminados en esta corrida (para calcular la velocidad)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _emit(self, stage, **info):
+        if self.on_progress is None:
+            return
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            rate = self._finished / elapsed if self._finished and elapsed > 0 else 0.0
+            pending = self.total - self.done
+            info.update(done=self.done, total=self.total, sent=self.sent, failed=self.failed,
+                        cancelled=self.cancelled, rate=rate, eta=pending / rate if rate else None)
+            # Dentro del lock: los avisos llegan en el mismo orden que los totales
+            self.on_progress(stage, **info)
+    
+    def checking(self, transport_name: str) -> None:
+        self._emit("checking", transport=transport_name)
+    
+    def queued(self, items: list[dict]) -> None:
+        with self._lock:
+            self.total = len(items)
+            self.sent = sum(1 for item in items if item["status"] == SendResult.SENT)
+            self.done = sum(1 for item in items if item["status"] != self.QUEUED)
+            self.failed = self.done - self.sent
+            self._started = time.monotonic()
+        self._emit("queued", items=items)
+    
+    def sending(self, supplier: str, email: str, attempt: int) -> None:
+        self._emit("sending", supplier=supplier, email=email, attempt=attempt)
+    
+    def retry(self, supplier: str, email: str, error: str, retry_in: float) -> None:
+        self._emit("retry", supplier=supplier, email=email, error=error, retry_in=retry_in)
+    
+    def waiting(self, seconds: float) -> None:
+        self._emit("waiting", seconds=seconds)
+    
+    def finished(self, result: SendResult) -> None:
+        with self._lock:
+            self.done += 1
+            if result.status == SendResult.CANCELLED:
+                stage = "cancelled"
+                self.cancelled += 1
+            else:
+                stage = "sent" if result.ok else "failed"
+                self._finished += 1
+                if result.ok:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+        self._emit(stage, result=result)
 
 def send_bulk_emails(
     suppliers: list[dict],
     products: list[dict],
-    cc_email: str = ""
-) -> None:
-    """ Envia correos personalizados a cada proveedor individualmente """
+    cc_email: str = "",
+    workers: int = None,
+    rate_per_second: float = None,
+    per_domain_rate: float = None,
+    timeout: float = None,
+    transport: Transport = None,
+    on_result=None,
+    outbox: Outbox = None,
+    on_progress=None,
+    cancel: threading.Event = None,
+    resume_batch: str = None,
+) -> list[SendResult]:
+    """ Envia correos personalizados a cada proveedor individualmente, varios a la vez.
+    
+    Retorna un SendResult por proveedor (en el mismo orden). Sin `transport`
+    se usa el de get_transport() y se cierra al terminar; uno recibido (por
+    ejemplo un MemoryTransport) queda abierto. Los parametros que quedan en
+    None usan los valores SEND_* del modulo.
+    
+    Cada envío queda registrado en la bandeja de salida (`outbox`, por
+    defecto outbox.db en la carpeta de datos del usuario): los fallidos se
+    reintentan con espera creciente y si el mismo envío se interrumpe, al
+    repetirlo solo se manda a quienes faltaban (ver resume_pending_sends).
+    Solo se continúa un lote con los mismos productos, CC y destinatarios;
+    `resume_batch` (el id de un lote de pending_batches) continúa ese lote
+    en particular.
+    
+    `on_progress` recibe el avance (ver SendProgress). Si se activa
+    `cancel` no se empiezan más envíos: los que faltaban quedan cancelados
+    en la bandeja (el lote se cierra) y su resultado es "cancelado".
+    """
     
     if not suppliers:
         raise ValueError("No se proporcionaron proveedores para enviar emails")
@@ -443,95 +945,322 @@ def send_bulk_emails(
     if not products:
         raise ValueError("No se proporcionaron productos para cotizar")
     
-    # Verificar que Outlook esté disponible antes de empezar
-    print("Verificando conexión con Outlook...")
-    success, message = test_outlook_connection()
+    workers = SEND_WORKERS if workers is None else workers
+    rate_per_second = SEND_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+    per_domain_rate = SEND_RATE_PER_DOMAIN if per_domain_rate is None else per_domain_rate
+    timeout = SEND_TIMEOUT_SECONDS if timeout is None else timeout
+    
+    owns_transport = transport is None
+    transport = get_transport() if owns_transport else transport
+    owns_outbox = outbox is None
+    outbox = Outbox() if owns_outbox else outbox
+    trace = send_trace.start(transport.name or "envio") if SEND_TRACE_ENABLED else None
+    stragglers = []
+    
+    def close():
+        if owns_transport:
+            transport.close()
+        if owns_outbox:
+            outbox.close()
+    
+    try:
+        return _send_bulk(transport, outbox, suppliers, products, cc_email, workers,
+                          rate_per_second, per_domain_rate, timeout, on_result,
+                          SendProgress(on_progress), cancel, resume_batch, stragglers)
+    finally:
+        running = [future for future in stragglers if not future.done()]
+        if running:
+            # Envíos con tiempo agotado que siguen en curso: cerrar cuando terminen
+            threading.Thread(target=_close_when_done, args=(running, close),
+                             name="email-close", daemon=True).start()
+        else:
+            close()
+        if trace is not None:
+            _write_send_trace()
+
+def _close_when_done(futures, close) -> None:
+    wait_futures(futures)
+    close()
+
+def _write_send_trace() -> None:
+    """ Cierra la medición del lote y la guarda (un error acá no afecta el envío) """
+    trace = send_trace.finish()
+    if trace is None:
+        return
+    try:
+        data = trace.report()
+        print(send_trace.format_report(data))
+        path = send_trace.write_reports(trace, SEND_TRACE_DIR, SEND_TRACE_KEEP, data)
+        print(f" Medición del envío guardada en {path}")
+    except Exception as e:
+        print(f"No se pudo guardar la medición del envío: {e}")
+
+def check_attachment_size(manifest: AttachmentManifest) -> None:
+    """ Lanza ValueError si los adjuntos de cada mensaje superan MAX_ATTACHMENT_BYTES """
+    if manifest.encoded_bytes > MAX_ATTACHMENT_BYTES:
+        raise ValueError(
+            f"Las imágenes adjuntas ocupan {manifest.encoded_bytes / 1024 / 1024:.1f} MB por correo "
+            f"({len(manifest)} archivo(s)) y el máximo es {MAX_ATTACHMENT_BYTES / 1024 / 1024:.0f} MB.\n"
+            "Selecciona menos productos con imagen o envíalos en varios correos."
+        )
+
+def _retry_delay(attempts: int) -> float:
+    return min(SEND_BACKOFF_SECONDS * 2 ** (attempts - 1), SEND_BACKOFF_MAX_SECONDS)
+
+def _send_bulk(transport, outbox, suppliers, products, cc_email, workers,
+               rate_per_second, per_domain_rate, timeout, on_result, progress, cancel,
+               resume_batch=None, stragglers=None) -> list[SendResult]:
+    # La lista de productos y los adjuntos son los mismos para todos: se arman una sola vez
+    with send_trace.span("plantilla.preparar"):
+        prepared = get_compiled_template().prepare(products)
+    with send_trace.span("adjuntos.revisar"):
+        manifest = build_attachment_manifest(products)
+    check_attachment_size(manifest)
+    send_trace.count("adjuntos.archivos", len(manifest))
+    
+    # Verificar que el transporte esté disponible antes de empezar
+    print(f"Verificando conexión ({transport.name})...")
+    progress.checking(transport.name)
+    with send_trace.span("transporte.verificar"):
+        success, message = transport.check()
     if not success:
-        raise Exception(f"No se puede conectar con Outlook: {message}")
+        raise Exception(f"No se puede conectar con {transport.name}: {message}")
     print(f"{message}")
     
     print(f" Iniciando envío de emails a {len(suppliers)} proveedor(es)...")
     print(f" Productos a cotizar: {len(products)}")
+    print(f" Adjuntos por correo: {len(manifest)} archivo(s), {manifest.total_bytes / 1024:.0f} KB")
+    
+    # Validar los proveedores: los incompletos no se envian
+    results = [None] * len(suppliers)
+    jobs, positions = [], []
+    for i, supplier in enumerate(suppliers):
+        try:
+            supplier_name = str(supplier.get("Nombre", "") or "").strip()
+            supplier_email = str(supplier.get("Correo", "") or "").strip()
+        except AttributeError:
+            results[i] = SendResult("", "", SendResult.SKIPPED, error=f"Proveedor inválido: {supplier}")
+            continue
+        if not supplier_name:
+            results[i] = SendResult("", supplier_email, SendResult.SKIPPED, error="Nombre del proveedor está vacío")
+        elif not supplier_email:
+            results[i] = SendResult(supplier_name, "", SendResult.SKIPPED,
+                                    error=f"Email del proveedor '{supplier_name}' está vacío")
+        else:
+            jobs.append({"Nombre": supplier_name, "Correo": supplier_email})
+            positions.append(i)
+    
+    # Registrar el lote en la bandeja de salida (o continuar uno interrumpido)
+    with send_trace.span("bandeja.abrir"):
+        if resume_batch is None:
+            fingerprint = outbox_store.batch_fingerprint(products, cc_email, EMAIL_SUBJECT,
+                                                         [job["Correo"] for job in jobs])
+            batch_id, resumed = outbox.start_batch(fingerprint, cc_email, products, jobs)
+        else:
+            batch_id, resumed = resume_batch, True
+            outbox.reopen_batch(batch_id)
+    # Solo se envían los trabajos de estos proveedores, aunque el lote tenga otros
+    own_keys = {outbox_store.job_key(batch_id, job["Correo"]) for job in jobs}
+    rows = {row["clave"]: row for row in outbox.jobs(batch_id) if row["clave"] in own_keys}
+    attempts = {key: row["intentos"] for key, row in rows.items()}
+    if resumed:
+        done = sum(1 for row in rows.values() if row["estado"] != outbox_store.PENDING)
+        print(f" Continuando un envío interrumpido: {done} de {len(rows)} ya procesados")
+    
+    # Estado inicial de cada proveedor (en un envío reanudado, algunos ya salieron)
+    items = []
+    jobs_at = dict(zip(positions, jobs))
+    for i, skipped in enumerate(results):
+        if skipped is not None:
+            items.append({"supplier": skipped.supplier, "email": skipped.email, "status": skipped.status})
+            continue
+        job = jobs_at[i]
+        state = rows[outbox_store.job_key(batch_id, job["Correo"])]["estado"]
+        items.append({"supplier": job["Nombre"], "email": job["Correo"],
+                      "status": SendProgress.QUEUED if state == outbox_store.PENDING else state})
+    progress.queued(items)
     
-    successful_sends = 0
-    failed_sends = []
+    last_results = {}
+    retrying = set()
+    # Un fallo tardío (en un hilo) y el aviso de tiempo agotado (en otro) pueden llegar
+    # juntos: el que toma el candado primero decide y el otro no cambia nada
+    state_lock = threading.Lock()
     
-    # Enviar individualmente a cada proveedor
-    for i, supplier in enumerate(suppliers, 1):
+    def send(supplier_name, supplier_email, products, cc_email):
+        with send_trace.message(supplier_email), send_trace.span("mensaje"):
+            return deliver(supplier_name, supplier_email, products, cc_email)
+    
+    def deliver(supplier_name, supplier_email, products, cc_email):
+        key = outbox_store.job_key(batch_id, supplier_email)
+        with send_trace.span("bandeja.escribir"):
+            outbox.mark_sending(key)
+        attempts[key] = attempts.get(key, 0) + 1
+        progress.sending(supplier_name, supplier_email, attempts[key])
         try:
-            # Validar que el proveedor tenga los campos necesarios
-            if not isinstance(supplier, dict):
-                raise ValueError(f"Proveedor inválido: {supplier}")
-            
-            supplier_name = supplier.get("Nombre", "").strip()
-            supplier_email = supplier.get("Correo", "").strip()
-            
-            if not supplier_name:
-                raise ValueError("Nombre del proveedor está vacío")
-            
-            if not supplier_email:
-                raise ValueError(f"Email del proveedor '{supplier_name}' está vacío")
-            
-            print(f"Enviando email {i}/{len(suppliers)} a: {supplier_name} ({supplier_email})")
-            
-            # Intentar primero con COM, si falla usar PowerShell
-            try:
-                send_email(
-                    supplier_email=supplier_email,
-                    supplier_name=supplier_name,
-                    products=products,
-                    cc_email=cc_email
-                )
-                successful_sends += 1
-                print(f" Email {i}/{len(suppliers)} enviado exitosamente a {supplier_name}")
-                
-            except Exception as com_error:
-                print(f"Error COM con {supplier_name}, intentando PowerShell...")
-                # Si falla COM, intentar con PowerShell
-                try:
-                    send_email_via_powershell(
-                        supplier_email=supplier_email,
-                        supplier_name=supplier_name,
-                        products=products,
-                        cc_email=cc_email
-                    )
-                    successful_sends += 1
-                    print(f" Email {i}/{len(suppliers)} enviado exitosamente a {supplier_name} (via PowerShell)")
-                    
-                except Exception as ps_error:
-                    # Si ambos fallan, agregar a la lista de errores
-                    error_msg = f"{supplier_name}: COM Error: {str(com_error)} | PowerShell Error: {str(ps_error)}"
-                    failed_sends.append(error_msg)
-                    print(f" Error en email {i}/{len(suppliers)} a {supplier_name}: {error_msg}")
-                    continue
-            
-            # Pequeño retraso entre envíos para evitar problemas de concurrencia
-            time.sleep(1)
-            
+            with send_trace.span("mensaje.armar"):
+                message = build_outgoing(supplier_name, supplier_email, products, cc_email, prepared, manifest)
+            with send_trace.span("transporte.enviar", intento=attempts[key]):
+                method = transport.send(message)
         except Exception as e:
-            error_msg = f"{supplier.get('nombre', 'Proveedor desconocido')}: {str(e)}"
-            failed_sends.append(error_msg)
-            print(f" Error general en email {i}/{len(suppliers)}: {error_msg}")
+            retry_at = delay = None
+            if attempts[key] < SEND_MAX_ATTEMPTS:
+                delay = _retry_delay(attempts[key])
+                if isinstance(e, TransportUnavailable):
+                    # En pausa: no tiene sentido reintentar antes de que se vuelva a probar
+                    delay = max(delay, e.retry_in)
+                retry_at = time.time() + delay
+            if isinstance(e, TransportUnavailable):
+                send_trace.count("transporte.en_pausa")
+            with state_lock:
+                # Si ya se informó como tiempo agotado quedó "sin confirmar": no se reintenta
+                with send_trace.span("bandeja.escribir"):
+                    updated = outbox.mark_failed(key, str(e), retry_at)
+                if updated and retry_at is not None:
+                    retrying.add(key)
+            if not updated:
+                send_trace.count("mensajes.fallos_tardios")
+            elif retry_at is not None:
+                progress.retry(supplier_name, supplier_email, str(e), delay)
+                send_trace.count("mensajes.reintentos")
+            else:
+                send_trace.count("mensajes.fallidos")
+            raise
+        with send_trace.span("bandeja.escribir"):
+            outbox.mark_sent(key, method)
+        send_trace.count("mensajes.enviados")
+        send_trace.count(f"metodo.{method or 'desconocido'}")
+        return method
+    
+    def report(result: SendResult) -> None:
+        key = outbox_store.job_key(batch_id, result.email)
+        result.attempts = attempts.get(key, 1)
+        last_results[key] = result
+        with state_lock:
+            if result.status == SendResult.TIMEOUT and key not in retrying:
+                # Desde ahora no se sabe si llegó: un fallo tardío ya no lo reprograma
+                outbox.mark_uncertain(key, result.error)
+            rescheduled = key in retrying
+            retrying.discard(key)
+        if rescheduled:
+            print(f" Error en email a {result.supplier} (intento {result.attempts}), se reintentará: {result.error}")
+            return
+        if result.ok:
+            print(f" Email enviado exitosamente a {result.supplier} (via {result.method}, {result.seconds:.1f}s)")
+        elif result.status != SendResult.CANCELLED:
+            print(f" Error en email a {result.supplier}: {result.error}")
+        progress.finished(result)
+        if on_result:
+            on_result(result)
+    
+    # Un solo grupo de hilos para todo el lote: cada hilo abre su sesión (Outlook/COM)
+    # una vez y los reintentos la reutilizan. Solo se arma otro si quedaron hilos
+    # trabados en envíos vencidos, para que los reintentos no esperen detrás de ellos.
+    if stragglers is None:
+        stragglers = []
+    executor = None
+    pool_start = 0
+    try:
+        # Vaciar la bandeja: primero los pendientes y luego los reintentos a medida que vencen
+        while True:
+            due = outbox.due_jobs(batch_id, keys=own_keys)
+            if due:
+                if executor is None or any(not f.done() for f in stragglers[pool_start:]):
+                    if executor is not None:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    executor = new_executor(workers, transport.thread_init)
+                    pool_start = len(stragglers)
+                run_pipeline(
+                    [{"Nombre": row["nombre"], "Correo": row["correo"]} for row in due],
+                    send, products, cc_email,
+                    rate_per_second=rate_per_second,
+                    per_domain_rate=per_domain_rate,
+                    timeout=timeout,
+                    on_result=report,
+                    cancel=cancel,
+                    stragglers=stragglers,
+                    executor=executor,
+                )
+                if cancel is not None and cancel.is_set():
+                    break
+                continue
+            retry_at = outbox.next_retry(batch_id, keys=own_keys)
+            if retry_at is None:
+                break
+            delay = max(0.0, retry_at - time.time())
+            progress.waiting(delay)
+            with send_trace.span("reintento.espera"):
+                if cancel is None:
+                    time.sleep(delay)
+                elif cancel.wait(delay):
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    cancelled = cancel is not None and cancel.is_set()
+    if cancelled:
+        # Los que faltaban quedan cancelados: el lote se cierra y no se retoma después
+        outbox.cancel_jobs(batch_id, own_keys)
+        print(" Envío cancelado: los correos que faltaban no se enviaron")
+    outbox.finish_batch(batch_id)
+    
+    # Resultado final de cada proveedor según la bandeja
+    final_rows = {row["clave"]: row for row in outbox.jobs(batch_id)}
+    for i, job in zip(positions, jobs):
+        key = outbox_store.job_key(batch_id, job["Correo"])
+        row = final_rows[key]
+        last = last_results.get(key)
+        seconds = last.seconds if last else 0.0
+        if row["estado"] in (outbox_store.SENDING, outbox_store.UNCERTAIN) and last is not None \
+                and last.status == SendResult.TIMEOUT:
+            results[i] = last
+        elif row["estado"] == outbox_store.SENT:
+            results[i] = SendResult(job["Nombre"], job["Correo"], SendResult.SENT, method=row["metodo"],
+                                    seconds=seconds, attempts=row["intentos"])
+        elif row["estado"] == outbox_store.UNCERTAIN:
+            results[i] = SendResult(job["Nombre"], job["Correo"], SendResult.UNCERTAIN, attempts=row["intentos"],
+                                    error="El envío se interrumpió mientras se entregaba; revisa en Enviados si el correo salió")
+        elif row["estado"] == outbox_store.CANCELLED:
+            results[i] = SendResult(job["Nombre"], job["Correo"], SendResult.CANCELLED, attempts=row["intentos"],
+                                    error=row["ultimo_error"] or "Envío cancelado")
+            if last is None or last.status != SendResult.CANCELLED:
+                # Esperaba un reintento: todavía no se había informado como terminado
+                progress.finished(results[i])
+        else:
+            results[i] = SendResult(job["Nombre"], job["Correo"], SendResult.FAILED, error=row["ultimo_error"],
+                                    seconds=seconds, attempts=row["intentos"])
     
     # Reportar resultados finales
+    successful_sends = sum(1 for r in results if r.ok)
     print(f"\n RESUMEN DE ENVÍO:")
     print(f" Emails enviados exitosamente: {successful_sends}")
-    print(f" Emails fallidos: {len(failed_sends)}")
-    
-    # Si todos fallaron, reportar error
-    if successful_sends == 0 and failed_sends:
-        error_msg = (
-            f"No se pudo enviar ningún email automáticamente.\n\n"
-            f"Se intentaron ambos métodos (COM y PowerShell) pero fallaron.\n\n"
-            f"Errores encontrados:\n" + "\n".join(failed_sends)
-        )
-        raise Exception(error_msg)
-    
-    # Si algunos fallaron, reportar resultados
-    elif failed_sends:
-        error_msg = f"Se enviaron {successful_sends} emails exitosamente de {len(suppliers)} proveedores.\n\nErrores:\n" + "\n".join(failed_sends)
-        raise Exception(error_msg)
-    
-    # Si todo fue exitoso
-    else:
-        print(f"¡Todos los emails fueron enviados exitosamente!")
\ No newline at end of file
+    print(f" Emails fallidos: {len(results) - successful_sends}")
+    return results
+
+def pending_batches(outbox: Outbox = None) -> list[dict]:
+    """ Envíos que quedaron a medias (por ejemplo porque se cerró la app) """
+    if outbox is not None:
+        return outbox.open_batches()
+    outbox = Outbox()
+    try:
+        return outbox.open_batches()
+    finally:
+        outbox.close()
+
+def resume_pending_sends(transport: Transport = None, outbox: Outbox = None, on_result=None,
+                         on_progress=None, cancel: threading.Event = None) -> list[SendResult]:
+    """ Continúa los envíos interrumpidos sin repetir los correos que ya salieron """
+    owns_outbox = outbox is None
+    outbox = Outbox() if owns_outbox else outbox
+    results = []
+    try:
+        for batch in outbox.open_batches():
+            if cancel is not None and cancel.is_set():
+                break
+            suppliers = [{"Nombre": row["nombre"], "Correo": row["correo"]} for row in outbox.jobs(batch["id"])]
+            results += send_bulk_emails(suppliers, batch["productos"], batch["cc"],
+                                        transport=transport, on_result=on_result, outbox=outbox,
+                                        on_progress=on_progress, cancel=cancel, resume_batch=batch["id"])
+    finally:
+        if owns_outbox:
+            outbox.close()
+    return results
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from string import Formatter
+from typing import List, Tuple
+
+# --- Plantilla del correo compilada ---
+# En un envio masivo la lista de productos y la nota de imagenes son iguales
+# para todos los proveedores; solo cambia {nombre_proveedor}. La plantilla se
+# analiza una vez (compile_template) y por lote se arma el texto completo con
+# un marcador en lugar del nombre (prepare), que queda partido en trozos
+# fijos. Para cada proveedor solo se unen esos trozos con su nombre.
+# El resultado es el mismo que el de antes con str.format + find/slice.
+
+NOTE_START = "{nota_imagenes}"
+NOTE_END = "{/nota_imagenes}"
+
+# Caracter de uso privado: no aparece en plantillas ni datos normales
+_NAME_MARK = "\ue000"
+
+def render_product_block(products) -> Tuple[str, bool]:
+    """Lineas "- Nombre: Descripcion" de los productos y si alguno tiene foto"""
+    if not products:
+        return "No se especificaron productos.", False
+
+    product_lines = []
+    has_images = False
+    for p in products:
+        nombre = str(p.get('Nombre', 'Sin nombre')).strip()
+        descripcion = str(p.get('Descripcion', 'Sin descripción')).strip()
+        foto = p.get('Foto', '').strip()
+        product_lines.append(f"- {nombre}: {descripcion}")
+        if foto:
+            has_images = True
+    return "\n".join(product_lines), has_images
+
+def apply_image_note(message: str, has_images: bool) -> str:
+    """Deja el texto entre {nota_imagenes} y {/nota_imagenes} solo si hay imagenes"""
+    if has_images:
+        return message.replace(NOTE_START, "").replace(NOTE_END, "")
+    # Si no hay imágenes, eliminar la sección completa
+    start_pos = message.find(NOTE_START)
+    end_pos = message.find(NOTE_END)
+    if start_pos != -1 and end_pos != -1:
+        message = message[:start_pos] + message[end_pos + len(NOTE_END):]
+    return message
+
+class PreparedMessage:
+    """Cuerpo del correo de un lote: solo falta el nombre del proveedor"""
+    __slots__ = ("_chunks", "_fallback")
+
+    def __init__(self, chunks: List[str], fallback=None):
+        self._chunks = chunks
+        self._fallback = fallback
+
+    def render(self, supplier_name: str) -> str:
+        supplier_name = str(supplier_name).strip()
+        if self._fallback is not None:
+            return self._fallback(supplier_name)
+        return supplier_name.join(self._chunks)
+
+class CompiledTemplate:
+    """Plantilla analizada una vez: trozos de texto fijo y campos"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.segments = list(Formatter().parse(text))
+        # Con formato o conversion ({nombre_proveedor!r}, {nombre_proveedor:>20}) no se
+        # puede usar el marcador: esas plantillas se rellenan completas por proveedor
+        self._simple_name = all(
+            not spec and not conversion
+            for _, field, spec, conversion in self.segments
+            if field == "nombre_proveedor"
+        )
+
+    def _format(self, supplier_name: str, product_lines: str, has_images: bool) -> str:
+        message = self.text.format(nombre_proveedor=supplier_name, lista_productos=product_lines)
+        return apply_image_note(message, has_images)
+
+    def prepare(self, products) -> PreparedMessage:
+        """Arma la parte comun a todos los proveedores de un lote"""
+        product_lines, has_images = render_product_block(products)
+        if self._simple_name and _NAME_MARK not in self.text + product_lines:
+            message = self._format(_NAME_MARK, product_lines, has_images)
+            return PreparedMessage(message.split(_NAME_MARK))
+        return PreparedMessage([], lambda name: self._format(name, product_lines, has_images))
+
+    def render(self, supplier_name: str, products) -> str:
+        return self.prepare(products).render(supplier_name)
+
+@lru_cache(maxsize=8)
+def compile_template(text: str) -> CompiledTemplate:
+    """Plantilla compilada (se reutiliza mientras el texto no cambie)"""
+    return CompiledTemplate(text)
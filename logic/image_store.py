@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from logic.app_paths import USER_DATA_DIR, app_root
+
+# --- Almacen de imagenes por contenido ---
+# Cada imagen se guarda una sola vez con el nombre de su hash (sha256), asi
+# dos productos con la misma foto comparten el archivo y dos productos con el
+# mismo nombre ya no se pisan la imagen. La columna Foto guarda la referencia
+# "<hash><extension>". En segundo plano se generan dos variantes: una reducida
+# para adjuntar en los correos y una miniatura para la interfaz. Las variantes
+# necesitan Pillow; sin Pillow se usa siempre el original.
+#
+#   product_images/store/ab/ab12...ef.jpg         original
+#   product_images/store/ab/ab12...ef.email.jpg   variante para correo
+#   product_images/store/ab/ab12...ef.thumb.png   miniatura
+#
+# (product_images/store esta en la carpeta de datos del usuario, ver app_paths)
+
+# Imagenes del esquema anterior (vienen con la app) y almacen en la carpeta de
+# datos del usuario (en el exe la carpeta de la app se borra al cerrar)
+IMAGES_DIR = app_root() / "data" / "product_images"
+STORE_DIR = USER_DATA_DIR / "product_images" / "store"
+
+# Lado mayor (px) y peso a partir del cual conviene reducir la imagen del correo
+EMAIL_MAX_PX = 1600
+EMAIL_MAX_BYTES = 300 * 1024
+EMAIL_JPEG_QUALITY = 85
+THUMB_PX = 96
+
+_REF = re.compile(r"^([0-9a-f]{64})(\.[A-Za-z0-9]{1,8})?$")
+_SUFFIX = re.compile(r"^\.[a-z0-9]{1,8}$")
+
+# Firmas para elegir la extension cuando la del archivo no sirve (".jpeg~", ".backup-img")
+_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF8", ".gif"),
+    (b"BM", ".bmp"),
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_jobs: Dict[str, Future] = {}
+
+def is_image_ref(foto: str) -> bool:
+    """True si el valor de Foto es una referencia del almacen (y no un nombre de archivo antiguo)"""
+    return bool(_REF.match(foto or ""))
+
+def _has_pillow() -> bool:
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _ref_suffix(source: Path) -> str:
+    """Extension de la referencia: la del archivo si es valida, si no segun su contenido (o ninguna)"""
+    suffix = source.suffix.lower()
+    if _SUFFIX.match(suffix):
+        return suffix
+    with open(source, "rb") as f:
+        head = f.read(12)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    for signature, guessed in _SIGNATURES:
+        if head.startswith(signature):
+            return guessed
+    return ""
+
+def _stem(ref: str) -> Path:
+    match = _REF.match(ref)
+    if match is None:
+        raise ValueError(f"Referencia de imagen invalida: {ref}")
+    digest = match.group(1)
+    return STORE_DIR / digest[:2] / digest
+
+def original_path(ref: str) -> Path:
+    """Archivo original de una referencia"""
+    return _stem(ref).with_name(ref)
+
+def _email_variant(ref: str) -> Path:
+    stem = _stem(ref)
+    return stem.with_name(stem.name + ".email.jpg")
+
+def _thumb_variant(ref: str) -> Path:
+    stem = _stem(ref)
+    return stem.with_name(stem.name + ".thumb.png")
+
+def put(source: Path) -> str:
+    """Guarda la imagen en el almacen (si no estaba) y devuelve su referencia.
+
+    Las variantes se generan en segundo plano.
+    """
+    source = Path(source)
+    ref = _file_hash(source) + _ref_suffix(source)
+    target = original_path(ref)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    schedule_variants(ref)
+    return ref
+
+def legacy_path(foto: str) -> Path:
+    """Ruta de una imagen guardada con el esquema anterior (nombre del producto)"""
+    return IMAGES_DIR / foto
+
+def email_path(foto: str) -> Optional[Path]:
+    """Archivo a adjuntar en los correos: la variante reducida si ya existe, si no el original"""
+    foto = (foto or "").strip()
+    if not foto:
+        return None
+    if not is_image_ref(foto):
+        path = legacy_path(foto)
+        return path if path.exists() else None
+    for path in (_email_variant(foto), original_path(foto)):
+        if path.exists():
+            return path
+    return None
+
+def thumbnail_path(foto: str) -> Optional[Path]:
+    """Miniatura PNG para la interfaz (None si aun no se genero o no hay Pillow)"""
+    foto = (foto or "").strip()
+    if not is_image_ref(foto):
+        return None
+    path = _thumb_variant(foto)
+    return path if path.exists() else None
+
+# -------------------- Variantes --------------------
+
+def schedule_variants(ref: str) -> Optional[Future]:
+    """Encola la generacion de las variantes de una referencia (una sola vez por referencia)"""
+    global _executor
+    if not _has_pillow():
+        return None
+    with _executor_lock:
+        job = _jobs.get(ref)
+        if job is not None and (not job.done() or job.exception() is None):
+            return job
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+        job = _jobs[ref] = _executor.submit(_make_variants, ref)
+        return job
+
+def _save_atomically(image, path: Path, **options) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        image.save(tmp_path, **options)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def _make_variants(ref: str) -> None:
+    from PIL import Image, ImageOps
+
+    source = original_path(ref)
+    email_file, thumb_file = _email_variant(ref), _thumb_variant(ref)
+    if email_file.exists() and thumb_file.exists():
+        return
+
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+
+            if not thumb_file.exists():
+                thumb = image.copy()
+                thumb.thumbnail((THUMB_PX, THUMB_PX))
+                _save_atomically(thumb, thumb_file, format="PNG", optimize=True)
+
+            # Solo vale la pena si la imagen es grande; si no se adjunta el original
+            large = max(image.size) > EMAIL_MAX_PX or source.stat().st_size > EMAIL_MAX_BYTES
+            if large and not email_file.exists():
+                email = image.copy()
+                email.thumbnail((EMAIL_MAX_PX, EMAIL_MAX_PX))
+                if email.mode != "RGB":
+                    # JPEG no tiene transparencia: se pone fondo blanco
+                    background = Image.new("RGB", email.size, "white")
+                    rgba = email.convert("RGBA")
+                    background.paste(rgba, mask=rgba.getchannel("A"))
+                    email = background
+                _save_atomically(email, email_file, format="JPEG", quality=EMAIL_JPEG_QUALITY, optimize=True)
+                if email_file.stat().st_size >= source.stat().st_size:
+                    email_file.unlink(missing_ok=True)
+    except Exception as e:
+        print(f"No se pudieron generar las variantes de la imagen {ref}: {e}")
+        raise
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from logic import send_trace
+
+# --- Transportes de correo ---
+# email_sender arma el mensaje (OutgoingMessage) y un transporte lo entrega.
+# Outlook (COM con respaldo PowerShell) vive en email_sender porque solo
+# funciona en Windows; aqui estan los que funcionan en cualquier sistema:
+#  - SmtpTransport: una conexion autenticada por hilo de envio, reutilizada
+#    entre mensajes y reabierta si el servidor la cierra.
+#  - MemoryTransport: guarda los mensajes en una lista (pruebas y mediciones).
+#
+# Los adjuntos de un lote son los mismos para todos los proveedores: un
+# AttachmentManifest revisa las rutas una vez y codifica cada imagen en
+# base64 una sola vez; todos los mensajes del lote comparten esos bytes (el
+# mensaje SMTP se arma pegando las partes ya codificadas).
+#
+# Salud de los transportes:
+#  - CircuitBreaker: tras varios fallos seguidos deja de usar un transporte
+#    durante un tiempo y despues deja pasar un solo intento de prueba; asi un
+#    transporte caido cuesta un fallo y no uno por mensaje.
+#  - HealthProbe: guarda el resultado de la prueba de conexion por un tiempo
+#    y la corre en otro hilo con tiempo maximo (Outlook puede colgarse).
+#
+# Configuracion por variables de entorno (ver email_sender.get_transport):
+#   MAIL_TRANSPORT   outlook | smtp (por defecto smtp si hay SMTP_HOST, si no outlook)
+#   SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_FROM
+#   SMTP_SECURITY    starttls (por defecto) | ssl | none
+
+class AttachmentManifest:
+    """Adjuntos de un lote: rutas revisadas una vez y partes MIME codificadas una vez"""
+
+    def __init__(self, paths: Iterable[Path] = ()):
+        self.paths: List[Path] = []
+        self.sizes: Dict[Path, int] = {}
+        self.missing: List[Path] = []
+        for path in map(Path, paths):
+            if path in self.sizes or path in self.missing:
+                continue
+            try:
+                self.sizes[path] = path.stat().st_size
+                self.paths.append(path)
+            except OSError:
+                self.missing.append(path)
+        self.boundary = f"=_cotizacion_{uuid.uuid4().hex}"
+        self._parts = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes de los archivos adjuntos en cada mensaje"""
+        return sum(self.sizes.values())
+
+    @property
+    def encoded_bytes(self) -> int:
+        """Bytes aproximados de los adjuntos ya codificados en base64 (lineas de 76 + CRLF)"""
+        encoded = sum(4 * ((size + 2) // 3) for size in self.sizes.values())
+        return encoded + 2 * (encoded // 76 + len(self.sizes))
+
+    def encoded_parts(self) -> List[bytes]:
+        """Partes MIME de los adjuntos en bytes (se leen y codifican la primera vez, luego se comparten)"""
+        with self._lock:
+            if self._parts is None:
+                from email.message import MIMEPart
+                from email.policy import SMTP
+
+                parts = []
+                for path in self.paths:
+                    ctype, encoding = mimetypes.guess_type(path.name)
+                    if ctype is None or encoding is not None:
+                        ctype = "application/octet-stream"
+                    maintype, subtype = ctype.split("/", 1)
+                    part = MIMEPart(policy=SMTP)
+                    part.set_content(path.read_bytes(), maintype=maintype, subtype=subtype, filename=path.name)
+                    parts.append(part.as_bytes())
+                self._parts = parts
+            return self._parts
+
+class OutgoingMessage:
+    """Mensaje listo para enviar. Con `manifest` los adjuntos son los del manifiesto del lote"""
+    __slots__ = ("to", "cc", "subject", "body", "attachments", "manifest")
+
+    def __init__(self, to: str, subject: str, body: str, cc: str = "",
+                 attachments: Sequence[Path] = (), manifest: Optional[AttachmentManifest] = None):
+        self.to = to
+        self.cc = cc
+        self.subject = subject
+        self.body = body
+        if manifest is None:
+            manifest = AttachmentManifest(attachments)
+        self.manifest = manifest
+        self.attachments: List[Path] = manifest.paths
+
+    def __repr__(self) -> str:
+        return f"OutgoingMessage(to={self.to!r}, subject={self.subject!r}, adjuntos={len(self.attachments)})"
+
+class Transport:
+    """Interfaz de un transporte. send() retorna el metodo usado y lanza excepcion si falla"""
+    name = ""
+
+    def check(self) -> Tuple[bool, str]:
+        """Prueba previa al envio masivo: (exito, mensaje)"""
+        return True, f"Transporte {self.name} listo"
+
+    def thread_init(self) -> None:
+        """Se llama al iniciar cada hilo de envio"""
+
+    def send(self, message: OutgoingMessage) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Libera las conexiones abiertas"""
+
+# -------------------- Salud --------------------
+
+class TransportUnavailable(Exception):
+    """El transporte esta en pausa por fallos seguidos; `retry_in` segundos hasta volver a probarlo"""
+
+    def __init__(self, message: str, retry_in: float = 0.0):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Corta el uso de un transporte tras `failures` fallos seguidos, por `cooldown` segundos"""
+    CLOSED = "cerrado"
+    OPEN = "abierto"
+    HALF_OPEN = "probando"
+
+    def __init__(self, failures: int = 3, cooldown: float = 60.0):
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._count = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True si se puede intentar ahora (pasado el tiempo de espera, solo un intento de prueba)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._count = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._count += 1
+            if self.state == self.HALF_OPEN or self._count >= self.failures:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Segundos hasta el proximo intento de prueba (0 si no esta abierto)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def unavailable(self, name: str) -> TransportUnavailable:
+        """Error para cuando allow() dice que no"""
+        retry_in = self.retry_in()
+        return TransportUnavailable(
+            f"{name} en pausa tras {self.failures} fallo(s) seguidos; se vuelve a probar en {retry_in:.0f} s",
+            retry_in,
+        )
+
+class HealthProbe:
+    """Resultado cacheado de `check()` -> (exito, mensaje), corrido en otro hilo con tiempo maximo.
+
+    Un resultado bueno se reutiliza `ttl` segundos y uno malo `failure_ttl`
+    (para notar pronto cuando se arregla). Si la prueba no termina en
+    `timeout` segundos se informa como fallida; el hilo sigue y su resultado
+    queda guardado para la proxima consulta.
+    """
+
+    def __init__(self, check, ttl: float = 60.0, timeout: float = 10.0,
+                 failure_ttl: float = 5.0, name: str = "El transporte"):
+        self._check = check
+        self.ttl = ttl
+        self.timeout = timeout
+        self.failure_ttl = failure_ttl
+        self.name = name
+        self._result: Optional[Tuple[bool, str]] = None
+        self._checked = 0.0
+        self._running: Optional[threading.Event] = None
+        self._lock = threading.Lock()
+
+    def _run(self, done: threading.Event) -> None:
+        try:
+            result = tuple(self._check())
+        except Exception as e:
+            result = (False, f"Error inesperado: {str(e)}")
+        with self._lock:
+            self._result = result
+            self._checked = time.monotonic()
+            self._running = None
+        done.set()
+
+    def cached(self) -> Optional[Tuple[bool, str]]:
+        """Ultimo resultado si sigue vigente"""
+        with self._lock:
+            if self._result is None:
+                return None
+            ttl = self.ttl if self._result[0] else self.failure_ttl
+            return self._result if time.monotonic() - self._checked <= ttl else None
+
+    def result(self, max_age: Optional[float] = None) -> Tuple[bool, str]:
+        """Resultado vigente o una prueba nueva (max_age=0 obliga a probar de nuevo)"""
+        if max_age is None:
+            cached = self.cached()
+            if cached is not None:
+                return cached
+        with self._lock:
+            if (max_age is not None and self._result is not None
+                    and time.monotonic() - self._checked <= max_age):
+                return self._result
+            done = self._running
+            if done is None:
+                done = self._running = threading.Event()
+                threading.Thread(target=self._run, args=(done,), daemon=True, name="health-probe").start()
+        if not done.wait(self.timeout):
+            return False, f"{self.name} no respondió en {self.timeout:g} segundos"
+        with self._lock:
+            return self._result
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._result = None
+
+# -------------------- Memoria --------------------
+
+class MemoryTransport(Transport):
+    """Guarda los mensajes en `outbox`; `latency` simula lo que tarda cada envio"""
+    name = "memoria"
+
+    def __init__(self, latency: float = 0.0, fail_for: Sequence[str] = ()):
+        self.latency = latency
+        self.fail_for = {e.lower() for e in fail_for}
+        self.outbox: List[OutgoingMessage] = []
+        self._lock = threading.Lock()
+
+    def send(self, message: OutgoingMessage) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        if message.to.lower() in self.fail_for:
+            raise RuntimeError(f"Fallo simulado para {message.to}")
+        with self._lock:
+            self.outbox.append(message)
+        return self.name
+
+# -------------------- SMTP --------------------
+
+class SmtpTransport(Transport):
+    """Envio por SMTP con una conexion abierta por hilo"""
+    name = "SMTP"
+
+    def __init__(self, host: str, port: int = 587, username: str = "", password: str = "",
+                 sender: str = "", security: str = "starttls", timeout: float = 30,
+                 breaker_failures: int = 3, breaker_cooldown: float = 60.0, health_ttl: float = 60.0):
+        if security not in ("starttls", "ssl", "none"):
+            raise ValueError(f"SMTP_SECURITY invalido: {security} (usa starttls, ssl o none)")
+        if not (sender or username):
+            raise ValueError("Falta el remitente: configura SMTP_FROM o SMTP_USER")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.security = security
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        # email_sender.get_transport los comparte entre lotes con la misma configuracion
+        self.breakers = {self.name: CircuitBreaker(breaker_failures, breaker_cooldown)}
+        self.probe = HealthProbe(self._check, ttl=health_ttl, name=f"El servidor SMTP {host}:{port}")
+
+    def _connect(self):
+        import smtplib
+        import ssl
+
+        if self.security == "ssl":
+            conn = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                conn.starttls(context=ssl.create_default_context())
+        try:
+            if self.username:
+                conn.login(self.username, self.password)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            with send_trace.span("smtp.conectar"):
+                conn = self._local.conn = self._connect()
+            send_trace.count("smtp.conexiones")
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is None:
+            return
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _payload(self, message: OutgoingMessage) -> bytes:
+        return message_bytes(message, self.sender)
+
+    def _recipients(self, message: OutgoingMessage) -> List[str]:
+        from email.utils import getaddresses
+
+        return [address for _, address in getaddresses([message.to, message.cc]) if address]
+
+    @staticmethod
+    def _is_disconnect(error: Exception) -> bool:
+        import smtplib
+
+        if isinstance(error, smtplib.SMTPServerDisconnected):
+            return True
+        # 421: el servidor cierra la conexion (por ejemplo por inactividad)
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code == 421
+        return isinstance(error, (ConnectionError, TimeoutError))
+
+    @staticmethod
+    def _is_message_error(error: Exception) -> bool:
+        """Rechazos de un mensaje puntual: el servidor respondio, no cuentan como falla del transporte"""
+        import smtplib
+
+        return isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError))
+
+    def check(self) -> Tuple[bool, str]:
+        return self.probe.result()
+
+    def _check(self) -> Tuple[bool, str]:
+        try:
+            conn = self._connect()
+            conn.noop()
+            conn.quit()
+            return True, f"Servidor SMTP {self.host}:{self.port} disponible"
+        except Exception as e:
+            return False, f"No se pudo conectar con el servidor SMTP {self.host}:{self.port}: {str(e)}"
+
+    def send(self, message: OutgoingMessage) -> str:
+        with send_trace.span("smtp.armar"):
+            payload = self._payload(message)
+        recipients = self._recipients(message)
+        breaker = self.breakers[self.name]
+        if not breaker.allow():
+            raise breaker.unavailable(f"El servidor SMTP {self.host}:{self.port}")
+        try:
+            try:
+                conn = self._connection()
+                with send_trace.span("smtp.enviar", bytes=len(payload)):
+                    conn.sendmail(self.sender, recipients, payload)
+            except Exception as e:
+                if not self._is_disconnect(e):
+                    raise
+                # La conexion se cayo entre mensajes: se abre otra y se reintenta una vez
+                self._drop_connection()
+                send_trace.count("smtp.reconexiones")
+                conn = self._connection()
+                with send_trace.span("smtp.enviar", bytes=len(payload)):
+                    conn.sendmail(self.sender, recipients, payload)
+        except Exception as e:
+            if self._is_message_error(e):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return self.name
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.quit()
+            except Exception:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+def message_bytes(message: OutgoingMessage, sender: str = "", headers: Sequence[Tuple[str, str]] = ()) -> bytes:
+    """Mensaje RFC 5322 completo en bytes (CRLF); los adjuntos son las partes ya codificadas del manifiesto.
+
+    `headers` son encabezados extra (Date, Message-ID...). Sin `sender` no
+    se pone From (lo completa el cliente de correo al abrir un borrador).
+    """
+    from email.message import EmailMessage, MIMEPart
+    from email.policy import SMTP
+
+    head = EmailMessage(policy=SMTP)
+    if sender:
+        head["From"] = sender
+    head["To"] = message.to
+    if message.cc:
+        head["Cc"] = message.cc
+    head["Subject"] = message.subject
+    for name, value in headers:
+        head[name] = value
+
+    parts = message.manifest.encoded_parts()
+    if not parts:
+        head.set_content(message.body)
+        return head.as_bytes()
+
+    body = MIMEPart(policy=SMTP)
+    body.set_content(message.body)
+    head["MIME-Version"] = "1.0"
+    head["Content-Type"] = f'multipart/mixed; boundary="{message.manifest.boundary}"'
+    delimiter = f"\r\n--{message.manifest.boundary}".encode("ascii")
+    header_bytes = b"".join(SMTP.fold_binary(name, value) for name, value in head.items())
+    chunks = [header_bytes, b"\r\n", delimiter[2:], b"\r\n", body.as_bytes()]
+    for part in parts:
+        chunks += [delimiter, b"\r\n", part]
+    chunks += [delimiter, b"--\r\n"]
+    return b"".join(chunks)
+
+def smtp_from_env(**options) -> Optional[SmtpTransport]:
+    """SmtpTransport con la configuracion de las variables SMTP_* (None si no hay SMTP_HOST)
+
+    `options` se pasan al constructor (por ejemplo breaker_failures o health_ttl).
+    """
+    host = os.environ.get("SMTP_HOST", "").strip()
+    if not host:
+        return None
+    try:
+        port = int(os.environ.get("SMTP_PORT", "587"))
+    except ValueError:
+        raise ValueError(f"SMTP_PORT invalido: {os.environ.get('SMTP_PORT')}")
+    return SmtpTransport(
+        host,
+        port,
+        username=os.environ.get("SMTP_USER", "").strip(),
+        password=os.environ.get("SMTP_PASSWORD", ""),
+        sender=os.environ.get("SMTP_FROM", "").strip(),
+        security=os.environ.get("SMTP_SECURITY", "starttls").strip().lower(),
+        **options,
+    )
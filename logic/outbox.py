@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from logic.app_paths import USER_DATA_DIR
+
+# --- Bandeja de salida persistente ---
+# Cada envio masivo es un lote con un trabajo por proveedor, guardados en
+# outbox.db (carpeta de datos del usuario, ver app_paths). El estado de cada
+# trabajo se escribe antes y despues de entregarlo, asi si la app se cierra
+# (o Outlook se cuelga) a mitad de un lote, al repetir el mismo envio se
+# continua donde quedo sin volver a escribirle a quien ya recibio el correo.
+#
+# Estados de un trabajo:
+#   pendiente      falta enviarlo (o reintentarlo a partir de proximo_intento)
+#   enviando       se esta entregando ahora
+#   enviado        entregado
+#   fallido        se agotaron los intentos
+#   sin confirmar  la app se cerro mientras se entregaba (o el envio supero el
+#                  tiempo maximo): no se sabe si llego, por eso no se reenvia
+#                  solo (hay que revisarlo a mano)
+#   cancelado      el usuario cancelo el lote antes de enviarlo
+#
+# La huella de un lote incluye los destinatarios: solo se continua un lote
+# si se repite el mismo envio a los mismos proveedores.
+
+# En la carpeta de datos del usuario: tiene que sobrevivir a que se cierre la app
+OUTBOX_PATH = USER_DATA_DIR / "outbox.db"
+
+PENDING = "pendiente"
+SENDING = "enviando"
+SENT = "enviado"
+FAILED = "fallido"
+UNCERTAIN = "sin confirmar"
+CANCELLED = "cancelado"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lotes (
+    id TEXT PRIMARY KEY,
+    huella TEXT NOT NULL,
+    cc TEXT NOT NULL DEFAULT '',
+    productos TEXT NOT NULL,
+    creado REAL NOT NULL,
+    terminado REAL
+);
+CREATE INDEX IF NOT EXISTS idx_lotes_huella ON lotes (huella, terminado);
+
+CREATE TABLE IF NOT EXISTS trabajos (
+    clave TEXT PRIMARY KEY,
+    lote TEXT NOT NULL REFERENCES lotes (id),
+    posicion INTEGER NOT NULL,
+    nombre TEXT NOT NULL,
+    correo TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendiente',
+    intentos INTEGER NOT NULL DEFAULT 0,
+    ultimo_error TEXT NOT NULL DEFAULT '',
+    metodo TEXT NOT NULL DEFAULT '',
+    proximo_intento REAL NOT NULL DEFAULT 0,
+    actualizado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_lote ON trabajos (lote, estado, proximo_intento);
+"""
+
+_PRODUCT_FIELDS = ("Nombre", "Descripcion", "Foto")
+
+def batch_fingerprint(products, cc_email: str, subject: str, recipients=()) -> str:
+    """Huella de un envio (contenido y destinatarios): el mismo envio repetido da la misma huella"""
+    data = {
+        "productos": [{k: str(p.get(k, "") or "") for k in _PRODUCT_FIELDS} for p in products],
+        "cc": (cc_email or "").strip().casefold(),
+        "asunto": subject,
+        "destinatarios": sorted({email.strip().casefold() for email in recipients}),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def job_key(batch_id: str, email: str) -> str:
+    """Clave de idempotencia de un trabajo: un correo por destinatario y lote"""
+    return hashlib.sha256(f"{batch_id}\n{email.strip().casefold()}".encode("utf-8")).hexdigest()
+
+class Outbox:
+    """Bandeja de salida en un archivo SQLite (segura para usar desde varios hilos)"""
+
+    def __init__(self, path: Path = OUTBOX_PATH):
+        self.path = Path(path)
+        # Una sola conexion compartida entre hilos (protegida por el lock): abrir y
+        # cerrar una por escritura obliga a SQLite a volcar el WAL cada vez
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Con WAL, NORMAL no pierde nada si se cierra la app (solo ante un corte de luz)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                yield conn
+
+    def _write(self, sql: str, params=()) -> int:
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def _read(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -------------------- Lotes --------------------
+
+    def start_batch(self, fingerprint: str, cc_email: str, products, jobs: List[Dict[str, str]]) -> tuple[str, bool]:
+        """Abre un lote para estos trabajos {"Nombre", "Correo"}; retorna (id, reanudado).
+
+        Si hay un lote sin terminar con la misma huella se continua ese: los
+        trabajos que quedaron "enviando" pasan a "sin confirmar" y los
+        proveedores nuevos se agregan como pendientes.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM lotes WHERE huella = ? AND terminado IS NULL ORDER BY creado DESC LIMIT 1",
+                (fingerprint,),
+            ).fetchone()
+            resumed = row is not None
+            if resumed:
+                batch_id = row["id"]
+                conn.execute(
+                    "UPDATE trabajos SET estado = ?, actualizado = ? WHERE lote = ? AND estado = ?",
+                    (UNCERTAIN, now, batch_id, SENDING),
+                )
+            else:
+                batch_id = uuid.uuid4().hex
+                products_json = json.dumps(
+                    [{k: str(p.get(k, "") or "") for k in _PRODUCT_FIELDS} for p in products],
+                    ensure_ascii=False,
+                )
+                conn.execute(
+                    "INSERT INTO lotes (id, huella, cc, productos, creado) VALUES (?, ?, ?, ?, ?)",
+                    (batch_id, fingerprint, (cc_email or "").strip(), products_json, now),
+                )
+            conn.executemany(
+                "INSERT OR IGNORE INTO trabajos (clave, lote, posicion, nombre, correo, actualizado)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (job_key(batch_id, job["Correo"]), batch_id, position, job["Nombre"], job["Correo"], now)
+                    for position, job in enumerate(jobs)
+                ],
+            )
+        return batch_id, resumed
+
+    def reopen_batch(self, batch_id: str) -> None:
+        """Continua un lote interrumpido: los trabajos que quedaron "enviando" pasan a "sin confirmar" """
+        self._write(
+            "UPDATE trabajos SET estado = ?, actualizado = ? WHERE lote = ? AND estado = ?",
+            (UNCERTAIN, time.time(), batch_id, SENDING),
+        )
+
+    def finish_batch(self, batch_id: str) -> bool:
+        """Cierra el lote si ya no le quedan trabajos pendientes ni en curso"""
+        with self._transaction() as conn:
+            open_jobs = conn.execute(
+                "SELECT COUNT(*) FROM trabajos WHERE lote = ? AND estado IN (?, ?)",
+                (batch_id, PENDING, SENDING),
+            ).fetchone()[0]
+            if open_jobs:
+                return False
+            conn.execute("UPDATE lotes SET terminado = ? WHERE id = ?", (time.time(), batch_id))
+            return True
+
+    def open_batches(self) -> List[Dict[str, object]]:
+        """Lotes que no terminaron: {"id", "cc", "productos", "pendientes", "creado"}"""
+        if self._conn is None and not self.path.exists():
+            return []
+        rows = self._read(
+            "SELECT l.id, l.cc, l.productos, l.creado,"
+            " (SELECT COUNT(*) FROM trabajos t WHERE t.lote = l.id AND t.estado IN (?, ?)) AS pendientes"
+            " FROM lotes l WHERE l.terminado IS NULL ORDER BY l.creado",
+            (PENDING, SENDING),
+        )
+        return [
+            {"id": r["id"], "cc": r["cc"], "productos": json.loads(r["productos"]),
+             "pendientes": r["pendientes"], "creado": r["creado"]}
+            for r in rows
+        ]
+
+    # -------------------- Trabajos --------------------
+
+    def jobs(self, batch_id: str) -> List[Dict[str, object]]:
+        """Todos los trabajos del lote en orden"""
+        rows = self._read("SELECT * FROM trabajos WHERE lote = ? ORDER BY posicion", (batch_id,))
+        return [dict(r) for r in rows]
+
+    def due_jobs(self, batch_id: str, now: Optional[float] = None, keys=None) -> List[Dict[str, object]]:
+        """Trabajos pendientes que ya se pueden intentar (solo los de `keys` si se indica)"""
+        now = time.time() if now is None else now
+        rows = self._read(
+            "SELECT * FROM trabajos WHERE lote = ? AND estado = ? AND proximo_intento <= ? ORDER BY posicion",
+            (batch_id, PENDING, now),
+        )
+        return [dict(r) for r in rows if keys is None or r["clave"] in keys]
+
+    def next_retry(self, batch_id: str, keys=None) -> Optional[float]:
+        """Momento (time.time()) del proximo reintento pendiente, o None si no queda ninguno"""
+        rows = self._read(
+            "SELECT clave, proximo_intento FROM trabajos WHERE lote = ? AND estado = ?",
+            (batch_id, PENDING),
+        )
+        times = [r["proximo_intento"] for r in rows if keys is None or r["clave"] in keys]
+        return min(times) if times else None
+
+    def mark_sending(self, key: str) -> None:
+        self._write(
+            "UPDATE trabajos SET estado = ?, intentos = intentos + 1, actualizado = ? WHERE clave = ?",
+            (SENDING, time.time(), key),
+        )
+
+    def mark_sent(self, key: str, method: str) -> None:
+        self._write(
+            "UPDATE trabajos SET estado = ?, metodo = ?, ultimo_error = '', actualizado = ? WHERE clave = ?",
+            (SENT, method or "", time.time(), key),
+        )
+
+    def mark_uncertain(self, key: str, error: str) -> bool:
+        """Un envio que supero el tiempo maximo: no se sabe si llego (solo si sigue "enviando")"""
+        return self._write(
+            "UPDATE trabajos SET estado = ?, ultimo_error = ?, actualizado = ? WHERE clave = ? AND estado = ?",
+            (UNCERTAIN, error, time.time(), key, SENDING),
+        )
+
+    def cancel_jobs(self, batch_id: str, keys) -> None:
+        """Los trabajos pendientes de `keys` quedan cancelados (no se retoman despues)"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE trabajos SET estado = ?, actualizado = ? WHERE lote = ? AND clave = ? AND estado = ?",
+                [(CANCELLED, now, batch_id, key, PENDING) for key in keys],
+            )
+
+    def mark_failed(self, key: str, error: str, retry_at: Optional[float] = None) -> bool:
+        """Registra un intento fallido: vuelve a pendiente para `retry_at` o queda fallido si es None
+
+        Solo si sigue "enviando": un envio vencido que falla tarde queda "sin confirmar".
+        Retorna False si el trabajo ya no estaba "enviando" (no se cambio nada).
+        """
+        state = FAILED if retry_at is None else PENDING
+        return self._write(
+            "UPDATE trabajos SET estado = ?, ultimo_error = ?, proximo_intento = ?, actualizado = ?"
+            " WHERE clave = ? AND estado = ?",
+            (state, error, retry_at or 0, time.time(), key, SENDING),
+        )
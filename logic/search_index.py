@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Sequence, Set
+
+import numpy as np
+
+# --- Indice de trigramas para la busqueda por substring ---
+# Cada fila se guarda como un solo texto normalizado (sin acentos, casefold)
+# con sus campos separados por "\0". Cada trigrama se codifica como un int64
+# (tres puntos de codigo de 21 bits) y el indice guarda, ordenados, los
+# trigramas y la lista de filas de cada uno. Una consulta junta las listas de
+# sus trigramas, se queda con las filas que aparecen en todas y solo en esas
+# verifica el substring.
+
+GRAM = 3
+_SEPARATOR = "\0"
+_BOUNDARY = "\1"
+_COMBINING = re.compile("[\u0300-\u036f]")
+
+def fold(text: str) -> str:
+    """Normaliza para buscar sin distinguir mayusculas ni acentos ("Cámara" -> "camara")"""
+    text = str(text or "")
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return text.casefold().strip()
+
+def _codes(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+def _gram_ids(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Trigramas codificados y mascara de los validos (sin separadores de campo/fila)"""
+    grams = (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+    sep = codes <= 1
+    return grams, ~(sep[:-2] | sep[1:-1] | sep[2:])
+
+class NGramIndex:
+    """Indice invertido trigrama -> filas, con altas y bajas incrementales.
+
+    Los ids de fila son las etiquetas enteras del DataFrame. Las altas van a
+    un indice auxiliar pequeño y las bajas solo marcan la fila como eliminada;
+    cuando cualquiera de los dos crece demasiado se reconstruye todo de una vez.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = list(fields)
+        self._docs: Dict[int, str] = {}
+        self._keys = np.empty(0, dtype=np.int64)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._postings = np.empty(0, dtype=np.int32)
+        self._delta: Dict[int, array] = {}
+        self._delta_docs = 0
+        self._dead = 0
+
+    @classmethod
+    def from_frame(cls, df, fields: Sequence[str]) -> "NGramIndex":
+        """Construye el indice de un DataFrame usando su index como id de fila"""
+        index = cls(fields)
+        index.add_frame(df)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _text(self, values: Iterable[str]) -> str:
+        return _SEPARATOR.join(fold(v) for v in values)
+
+    def _rows(self, df):
+        columns = [df[f].tolist() if f in df.columns else [""] * len(df) for f in self.fields]
+        return zip(df.index.tolist(), *columns)
+
+    def add_frame(self, df) -> None:
+        """Indexa las filas de un DataFrame (en bloque si son muchas)"""
+        if len(df) <= self._delta_limit():
+            for doc_id, *values in self._rows(df):
+                self.add(doc_id, values)
+            return
+        for doc_id, *values in self._rows(df):
+            self._docs[doc_id] = self._text(values)
+        self._build()
+
+    def add(self, doc_id: int, values: Iterable[str]) -> None:
+        """Indexa (o reindexa) una fila"""
+        if doc_id in self._docs:
+            self.remove(doc_id)
+        text = self._text(values)
+        self._docs[doc_id] = text
+        if len(text) >= GRAM:
+            grams, valid = _gram_ids(_codes(text))
+            for gram in set(grams[valid].tolist()):
+                self._delta.setdefault(gram, array("i")).append(doc_id)
+        self._delta_docs += 1
+        if self._delta_docs > self._delta_limit():
+            self._build()
+
+    def remove(self, doc_id: int) -> None:
+        """Quita una fila del indice"""
+        if self._docs.pop(doc_id, None) is None:
+            return
+        self._dead += 1
+        if self._dead > len(self._docs):
+            self._build()
+
+    def _delta_limit(self) -> int:
+        return max(256, len(self._docs) // 8)
+
+    def _build(self) -> None:
+        """Reconstruye el indice completo a partir de los textos de las filas vivas"""
+        self._delta, self._delta_docs, self._dead = {}, 0, 0
+        ids = sorted(self._docs)
+        if not ids:
+            self.__init__(self.fields)
+            return
+
+        texts = [self._docs[d] for d in ids]
+        codes = _codes(_BOUNDARY.join(texts) + _BOUNDARY)
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+        owners = np.repeat(np.asarray(ids, dtype=np.int32), lengths)
+        if len(codes) < GRAM:
+            grams, owners = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        else:
+            grams, valid = _gram_ids(codes)
+            grams, owners = grams[valid], owners[:len(valid)][valid]
+
+        # Ordenar por (trigrama, fila) y quitar repetidos dentro de una misma fila
+        order = np.lexsort((owners, grams))
+        grams, owners = grams[order], owners[order]
+        keep = np.ones(len(grams), dtype=bool)
+        keep[1:] = (grams[1:] != grams[:-1]) | (owners[1:] != owners[:-1])
+        grams, owners = grams[keep], owners[keep]
+
+        self._keys, first = np.unique(grams, return_index=True)
+        self._offsets = np.append(first, len(grams)).astype(np.int64)
+        self._postings = owners
+
+    def _posting(self, gram: int) -> np.ndarray:
+        parts = []
+        i = int(np.searchsorted(self._keys, gram))
+        if i < len(self._keys) and self._keys[i] == gram:
+            parts.append(self._postings[self._offsets[i]:self._offsets[i + 1]])
+        extra = self._delta.get(gram)
+        if extra:
+            parts.append(np.frombuffer(extra, dtype=np.int32))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts) if parts else self._postings[:0]
+
+    def search(self, query: str) -> List[int]:
+        """Ids (en orden) de las filas que contienen la consulta en alguno de sus campos"""
+        q = fold(query)
+        docs = self._docs
+        if not q:
+            return sorted(docs)
+
+        wanted: Set[int] = set()
+        if len(q) >= GRAM:
+            grams, valid = _gram_ids(_codes(q))
+            wanted = set(grams[valid].tolist())
+        if not wanted:
+            # Demasiado corta para usar trigramas: se recorre el texto normalizado
+            return sorted(d for d, text in docs.items() if q in text)
+
+        postings = []
+        for gram in wanted:
+            posting = self._posting(gram)
+            if not len(posting):
+                return []
+            postings.append(posting)
+
+        # Filas presentes en la lista de cada trigrama de la consulta
+        counts = np.bincount(np.concatenate(postings))
+        candidates = np.flatnonzero(counts >= len(postings))
+
+        # Los trigramas pueden aparecer en otro orden (o ser de filas eliminadas)
+        return [d for d in candidates.tolist() if q in docs.get(d, "")]
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+from logic import send_trace
+
+# --- Envio concurrente de correos ---
+# Reemplaza las pausas fijas entre envios por:
+#  - un grupo de hilos (workers) que envian en paralelo,
+#  - un limite global de mensajes por segundo y, opcional, uno por dominio
+#    del destinatario (para no saturar a un mismo servidor de correo),
+#  - un tiempo maximo por mensaje,
+#  - la opcion de cancelar lo que falta (los envios en curso terminan).
+# Cada proveedor termina con un SendResult en lugar de un texto de error.
+
+class RateLimiter:
+    """Limite de `rate` operaciones por segundo (token bucket, seguro entre hilos)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("El limite por segundo debe ser mayor que 0")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Espera hasta poder hacer una operacion; retorna los segundos esperados"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class SendResult:
+    """Resultado del envio a un proveedor"""
+    __slots__ = ("supplier", "email", "status", "method", "error", "seconds", "attempts")
+
+    SENT = "enviado"
+    FAILED = "fallido"
+    TIMEOUT = "tiempo agotado"
+    SKIPPED = "omitido"
+    UNCERTAIN = "sin confirmar"
+    CANCELLED = "cancelado"
+
+    def __init__(self, supplier: str, email: str, status: str, method: str = "",
+                 error: str = "", seconds: float = 0.0, attempts: int = 1):
+        self.supplier = supplier
+        self.email = email
+        self.status = status
+        self.method = method
+        self.error = error
+        self.seconds = seconds
+        self.attempts = attempts
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.SENT
+
+    def to_dict(self) -> Dict[str, object]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"SendResult({self.to_dict()!r})"
+
+def _domain(email: str) -> str:
+    return email.rsplit("@", 1)[-1].strip().lower()
+
+def new_executor(workers: int = 4, initializer: Optional[Callable[[], None]] = None) -> ThreadPoolExecutor:
+    """Grupo de hilos para run_pipeline (`initializer` corre una vez en cada hilo nuevo)"""
+    return ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="email-send",
+                              initializer=initializer)
+
+def run_pipeline(
+    jobs: Sequence[Dict[str, str]],
+    send: Callable[..., str],
+    products,
+    cc_email: str = "",
+    workers: int = 4,
+    rate_per_second: Optional[float] = None,
+    per_domain_rate: Optional[float] = None,
+    timeout: Optional[float] = None,
+    on_result: Optional[Callable[[SendResult], None]] = None,
+    initializer: Optional[Callable[[], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    stragglers: Optional[List[Future]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> List[SendResult]:
+    """Envia un mensaje por cada job {"Nombre", "Correo"} y retorna un SendResult por job (en orden).
+
+    `send(nombre, correo, products, cc_email)` hace el envio real y retorna
+    el metodo usado (por ejemplo "COM"); si lanza una excepcion el envio
+    queda como fallido. Si un envio supera `timeout` segundos se marca como
+    "tiempo agotado" y se sigue con los demas (el hilo no se puede
+    interrumpir: queda ocupado hasta que `send` termine; si se pasa la
+    lista `stragglers` se agregan ahi esos envios en curso, para esperarlos
+    antes de cerrar lo que usa `send`). `on_result` se
+    llama (desde otro hilo) con cada resultado apenas se conoce. Si se
+    activa `cancel`, los envios que todavia no empezaron quedan "cancelado"
+    sin llamar a `send`.
+
+    Con `executor` (ver new_executor) se usan esos hilos y no se cierran al
+    terminar: varias llamadas comparten lo que cada hilo preparo en
+    `initializer` (la conexion con Outlook, por ejemplo). Sin `executor` se
+    crea uno de `workers` hilos solo para esta llamada.
+    """
+    results: List[Optional[SendResult]] = [None] * len(jobs)
+    global_limit = RateLimiter(rate_per_second) if rate_per_second else None
+    domain_limits: Dict[str, RateLimiter] = {}
+    limits_lock = threading.Lock()
+    started: Dict[int, float] = {}
+
+    def finish(index: int, result: SendResult) -> None:
+        if results[index] is None:
+            results[index] = result
+            if on_result:
+                on_result(result)
+
+    def task(index: int) -> SendResult:
+        job = jobs[index]
+        name, email = job["Nombre"], job["Correo"]
+        if cancel is not None and cancel.is_set():
+            return SendResult(name, email, SendResult.CANCELLED, error="Envio cancelado", attempts=0)
+        if global_limit:
+            with send_trace.span("envio.limite"):
+                global_limit.acquire()
+        if per_domain_rate:
+            with limits_lock:
+                limiter = domain_limits.setdefault(_domain(email), RateLimiter(per_domain_rate))
+            with send_trace.span("envio.limite_dominio"):
+                limiter.acquire()
+        # Se pudo cancelar mientras esperaba su turno
+        if cancel is not None and cancel.is_set():
+            return SendResult(name, email, SendResult.CANCELLED, error="Envio cancelado", attempts=0)
+
+        start = started[index] = time.monotonic()
+        try:
+            method = send(name, email, products, cc_email)
+            return SendResult(name, email, SendResult.SENT, method=method or "",
+                              seconds=time.monotonic() - start)
+        except Exception as e:
+            return SendResult(name, email, SendResult.FAILED, error=str(e),
+                              seconds=time.monotonic() - start)
+
+    # Cada envio terminado avisa por la cola: no hay que revisar todos los pendientes en cada vuelta
+    completed: "queue.Queue[tuple[int, Future]]" = queue.Queue()
+    own_executor = executor is None
+    if own_executor:
+        executor = new_executor(workers, initializer)
+    futures: List[Future] = []
+    try:
+        for i in range(len(jobs)):
+            future = executor.submit(task, i)
+            futures.append(future)
+            future.add_done_callback(lambda f, i=i: completed.put((i, f)))
+
+        unresolved = len(jobs)
+        while unresolved:
+            try:
+                index, future = completed.get(timeout=0.1 if timeout else None)
+            except queue.Empty:
+                pass
+            else:
+                started.pop(index, None)
+                if results[index] is None:
+                    finish(index, future.result())
+                    unresolved -= 1
+
+            if timeout:
+                # Solo los envios en curso (a lo sumo uno por hilo)
+                now = time.monotonic()
+                for index, start in list(started.items()):
+                    if results[index] is None and now - start > timeout:
+                        job = jobs[index]
+                        finish(index, SendResult(
+                            job["Nombre"], job["Correo"], SendResult.TIMEOUT,
+                            error=f"El envio supero {timeout:g} segundos", seconds=now - start,
+                        ))
+                        unresolved -= 1
+                        if stragglers is not None:
+                            stragglers.append(futures[index])
+    finally:
+        # No esperar a los hilos que quedaron trabados en un envio vencido
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in futures:
+                future.cancel()
+
+    return results
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# --- Medicion del envio masivo ---
+# Registra cuanto tarda cada etapa de cada mensaje (armar el mensaje,
+# conectar con Outlook, adjuntar, enviar, escribir en la bandeja...) y
+# algunos contadores. Al terminar el lote se guarda un resumen en JSON y un
+# archivo de trazas en formato Chrome (se abre en chrome://tracing o en
+# https://ui.perfetto.dev para ver la linea de tiempo por hilo).
+#
+# Esta pensado para dejarlo siempre activo: cada etapa es una tupla agregada
+# a una lista (sin locks ni E/S mientras se envia) y si no hay una medicion
+# en curso span() no hace nada.
+
+# Etapas guardadas como maximo por lote (el resto solo se cuenta)
+MAX_SPANS = 200_000
+
+_state = {"run": None}
+_local = threading.local()
+
+class SendTrace:
+    """Etapas y contadores de un lote de envio"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        # (etapa, hilo, inicio, fin, mensaje, datos)
+        self.spans: List[tuple] = []
+        self.counters: Dict[str, int] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self) -> Dict[str, object]:
+        """Resumen: totales por etapa (veces, total, promedio, p50, p95, maximo) y etapas de cada mensaje"""
+        end = self.end if self.end is not None else time.perf_counter()
+        by_stage: Dict[str, List[float]] = {}
+        by_message: Dict[str, Dict[str, float]] = {}
+        for stage, _, start, stop, message, _ in list(self.spans):
+            seconds = stop - start
+            by_stage.setdefault(stage, []).append(seconds)
+            if message is not None:
+                stages = by_message.setdefault(message, {})
+                stages[stage] = round(stages.get(stage, 0.0) + seconds, 6)
+
+        stages = []
+        for stage, durations in by_stage.items():
+            durations.sort()
+            total = sum(durations)
+            stages.append({
+                "etapa": stage,
+                "veces": len(durations),
+                "total": round(total, 6),
+                "promedio": round(total / len(durations), 6),
+                "p50": round(durations[len(durations) // 2], 6),
+                "p95": round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 6),
+                "maximo": round(durations[-1], 6),
+            })
+        stages.sort(key=lambda item: item["total"], reverse=True)
+
+        return {
+            "lote": self.name,
+            "inicio": self.started_at.isoformat(timespec="seconds"),
+            "segundos": round(end - self.start, 6),
+            "etapas": stages,
+            "contadores": dict(sorted(self.counters.items())),
+            "etapas_descartadas": self.dropped,
+            "por_mensaje": [{"mensaje": message, "etapas": data} for message, data in by_message.items()],
+        }
+
+    def chrome_trace(self) -> Dict[str, object]:
+        """Trazas en formato Chrome trace-event (eventos "X" con tiempos en microsegundos)"""
+        threads: Dict[int, int] = {}
+        events = []
+        for stage, thread, start, stop, message, data in list(self.spans):
+            tid = threads.setdefault(thread, len(threads) + 1)
+            args = dict(data) if data else {}
+            if message is not None:
+                args["mensaje"] = message
+            events.append({
+                "name": stage,
+                "cat": stage.split(".", 1)[0],
+                "ph": "X",
+                "ts": round((start - self.start) * 1e6, 1),
+                "dur": round((stop - start) * 1e6, 1),
+                "pid": 1,
+                "tid": tid,
+                "args": args,
+            })
+        events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": f"Envio {self.name}"}})
+        for tid in threads.values():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"hilo {tid}"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+class _Span:
+    __slots__ = ("run", "stage", "data", "start")
+
+    def __init__(self, run: SendTrace, stage: str, data):
+        self.run = run
+        self.stage = stage
+        self.data = data
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        run = self.run
+        if len(run.spans) < MAX_SPANS:
+            run.spans.append((self.stage, threading.get_ident(), self.start, time.perf_counter(),
+                              getattr(_local, "message", None), self.data))
+        else:
+            run.dropped += 1
+        return False
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def start(name: str) -> SendTrace:
+    """Empieza a medir un lote (reemplaza la medicion anterior si quedo abierta)"""
+    run = _state["run"] = SendTrace(name)
+    return run
+
+def finish() -> Optional[SendTrace]:
+    """Termina la medicion en curso y la retorna"""
+    run, _state["run"] = _state["run"], None
+    if run is not None:
+        run.end = time.perf_counter()
+    return run
+
+def current() -> Optional[SendTrace]:
+    return _state["run"]
+
+def span(stage: str, **data):
+    """with span("outlook.enviar"): ... mide esa etapa (no hace nada si no se esta midiendo)"""
+    run = _state["run"]
+    if run is None:
+        return _NO_SPAN
+    return _Span(run, stage, data or None)
+
+def count(name: str, amount: int = 1) -> None:
+    """Suma a un contador del lote en curso"""
+    run = _state["run"]
+    if run is not None:
+        run.count(name, amount)
+
+class message:
+    """with message(correo): las etapas medidas en este hilo se asignan a ese mensaje"""
+    __slots__ = ("key", "previous")
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __enter__(self):
+        self.previous = getattr(_local, "message", None)
+        _local.message = self.key
+        return self
+
+    def __exit__(self, *exc):
+        _local.message = self.previous
+        return False
+
+def format_report(data: Dict[str, object], top: int = 8) -> str:
+    """Texto corto del resumen para imprimir en consola"""
+    lines = [f"Tiempo por etapa (lote de {data['segundos']:.2f}s, las {top} que mas suman):"]
+    for item in data["etapas"][:top]:
+        lines.append(f"  {item['etapa']:<24} {item['total']:>9.3f}s  {item['veces']:>6} veces  "
+                     f"p50 {item['p50'] * 1000:.1f} ms  p95 {item['p95'] * 1000:.1f} ms")
+    if data["contadores"]:
+        lines.append("  " + ", ".join(f"{name}: {value}" for name, value in data["contadores"].items()))
+    return "\n".join(lines)
+
+def write_reports(run: SendTrace, directory: Path, keep: int = 20,
+                  data: Optional[Dict[str, object]] = None) -> Path:
+    """Guarda <fecha>_<lote>.json y <fecha>_<lote>.trace.json; deja solo los `keep` lotes mas nuevos
+
+    `data` es run.report() si ya se calculo.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{run.started_at:%Y%m%d-%H%M%S}-{run.started_at.microsecond // 1000:03d}_{run.name}"
+    path = directory / f"{stem}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data if data is not None else run.report(), f, ensure_ascii=False, indent=2)
+    with open(directory / f"{stem}.trace.json", "w", encoding="utf-8") as f:
+        # dumps sin indentar usa el codificador en C (json.dump escribe por partes en Python)
+        f.write(json.dumps(run.chrome_trace(), ensure_ascii=False))
+
+    reports = sorted(p for p in directory.glob("*.json") if not p.name.endswith(".trace.json"))
+    for old in reports[:-keep] if keep else ():
+        old.unlink(missing_ok=True)
+        old.with_name(old.stem + ".trace.json").unlink(missing_ok=True)
+    return path
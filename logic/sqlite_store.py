@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+# --- Esquema ---
+# Cada tabla guarda ademas la columna "nombre_key" (nombre normalizado con
+# casefold) indexada, para que busquedas y borrados por nombre no recorran
+# toda la tabla. Las columnas propias del libro (Precio, Telefono...) van
+# en "extra" como un objeto JSON {columna: valor}, para que al exportar a
+# Excel vuelvan a aparecer.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_key TEXT NOT NULL,
+    descripcion TEXT NOT NULL DEFAULT '',
+    foto TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_productos_nombre_key ON productos (nombre_key);
+
+CREATE TABLE IF NOT EXISTS proveedores (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_key TEXT NOT NULL,
+    correo TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_proveedores_nombre_key ON proveedores (nombre_key);
+"""
+
+# Tabla SQL y correspondencia columna del DataFrame -> columna SQL
+TABLES: Dict[str, tuple[str, Dict[str, str]]] = {
+    "products": ("productos", {"Nombre": "nombre", "Descripcion": "descripcion", "Foto": "foto"}),
+    "suppliers": ("proveedores", {"Nombre": "nombre", "Correo": "correo"}),
+}
+
+def name_key(nombre: str) -> str:
+    """Clave de comparacion de nombres (la misma que usa data_manager)"""
+    return (nombre or "").strip().casefold()
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path))
+    conn.executescript(_SCHEMA)
+    # Bases creadas antes de la columna "extra"
+    for table, _ in TABLES.values():
+        if "extra" not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN extra TEXT NOT NULL DEFAULT ''")
+    return conn
+
+def init_database(path: Path) -> None:
+    """Crea el archivo y las tablas si no existen"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with closing(_connect(path)):
+        pass
+
+def is_empty(path: Path) -> bool:
+    """True si la base no tiene productos ni proveedores"""
+    with closing(_connect(path)) as conn:
+        for table, _ in TABLES.values():
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+    return True
+
+def _read_table(conn: sqlite3.Connection, kind: str) -> pd.DataFrame:
+    table, columns = TABLES[kind]
+    sql_columns = ", ".join(columns.values())
+    rows = conn.execute(f"SELECT {sql_columns}, extra FROM {table} ORDER BY id").fetchall()
+    extras = [json.loads(row[-1]) if row[-1] else {} for row in rows]
+    # Columnas extra en el orden en que aparecen (despues de las del esquema, como en el Excel)
+    extra_columns = list(dict.fromkeys(c for extra in extras for c in extra if c not in columns))
+    records = [
+        row[:-1] + tuple(extra.get(c, "") for c in extra_columns)
+        for row, extra in zip(rows, extras)
+    ]
+    return pd.DataFrame.from_records(records, columns=list(columns) + extra_columns)
+
+def read_catalog(path: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Lee productos y proveedores como DataFrames con las columnas del Excel"""
+    with closing(_connect(path)) as conn:
+        return _read_table(conn, "products"), _read_table(conn, "suppliers")
+
+def _insert_sql(kind: str) -> str:
+    table, columns = TABLES[kind]
+    names = ", ".join(["nombre_key", *columns.values(), "extra"])
+    marks = ", ".join("?" * (len(columns) + 2))
+    return f"INSERT INTO {table} ({names}) VALUES ({marks})"
+
+def _extra_json(record: Dict[str, str], columns: Dict[str, str]) -> str:
+    extra = {c: str(v or "") for c, v in record.items() if c not in columns}
+    return json.dumps(extra, ensure_ascii=False) if extra else ""
+
+def _insert_params(kind: str, records: Iterable[Dict[str, str]]) -> List[tuple]:
+    columns = TABLES[kind][1]
+    return [
+        (name_key(r.get("Nombre", "")), *(str(r.get(c, "") or "") for c in columns), _extra_json(r, columns))
+        for r in records
+    ]
+
+def replace_catalog(path: Path, products_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> None:
+    """Reemplaza todo el contenido de la base (importacion desde Excel)"""
+    with closing(_connect(path)) as conn, conn:
+        for kind, df in (("products", products_df), ("suppliers", suppliers_df)):
+            table = TABLES[kind][0]
+            conn.execute(f"DELETE FROM {table}")
+            records = df.to_dict(orient="records") if not df.empty else []
+            conn.executemany(_insert_sql(kind), _insert_params(kind, records))
+
+def apply_changes(path: Path, changes: List[Dict]) -> None:
+    """Aplica una lista de cambios de data_manager en una sola transaccion SQL.
+
+    Cada cambio es {"op": "add", "kind": ..., "rows": [...]},
+    {"op": "delete", "kind": ..., "names": [...]} o
+    {"op": "update", "kind": ..., "rows": [...]} (filas buscadas por Nombre,
+    solo se cambian las columnas presentes).
+    """
+    with closing(_connect(path)) as conn, conn:
+        for change in changes:
+            kind = change["kind"]
+            if change["op"] == "add":
+                conn.executemany(_insert_sql(kind), _insert_params(kind, change["rows"]))
+            elif change["op"] == "delete":
+                table = TABLES[kind][0]
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE nombre_key = ?",
+                    [(name_key(n),) for n in change["names"]]
+                )
+            elif change["op"] == "update":
+                table, columns = TABLES[kind]
+                for row in change["rows"]:
+                    fields = [c for c in row if c in columns and c != "Nombre"]
+                    if not fields:
+                        continue
+                    assignments = ", ".join(f"{columns[c]} = ?" for c in fields)
+                    conn.execute(
+                        f"UPDATE {table} SET {assignments} WHERE nombre_key = ?",
+                        [str(row[c] or "") for c in fields] + [name_key(row["Nombre"])]
+                    )
+            else:
+                raise ValueError(f"Operacion desconocida: {change['op']}")
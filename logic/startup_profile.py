@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import builtins
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# --- Medicion del arranque (app.py --profile-startup [libro.xlsx]) ---
+# Registra cuanto tarda cada modulo en importarse (la primera vez, incluyendo
+# los modulos que importa a su vez) y cada fase del arranque (crear la ventana,
+# primer pintado y, si se indico un libro, la carga del catalogo). Solo usa la
+# libreria estandar para poder activarse antes de importar cualquier otra
+# cosa. Si no se llamo a enable(), mark() no hace nada.
+
+# Tiempo objetivo hasta ver la ventana (segundos) en el exe empaquetado
+STARTUP_BUDGET_SECONDS = 1.5
+
+_state = {
+    "enabled": False,
+    "start": 0.0,
+    "phases": [],   # [(fase, segundos desde el inicio)]
+    "imports": {},  # modulo -> (segundos incluyendo sus imports, profundidad)
+}
+_import_stack: List[str] = []
+_original_import = builtins.__import__
+
+def _pending_module(name: str, fromlist) -> Optional[str]:
+    """Modulo que este import va a cargar por primera vez (None si ya estan todos)"""
+    if name not in sys.modules:
+        return name
+    # "from paquete import modulo" con el paquete ya importado
+    for item in fromlist or ():
+        if f"{name}.{item}" not in sys.modules and not hasattr(sys.modules[name], item):
+            return f"{name}.{item}"
+    return None
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Solo se mide la primera vez que se importa cada modulo
+    module = None if level else _pending_module(name, fromlist)
+    if module is None:
+        return _original_import(name, globals, locals, fromlist, level)
+    _import_stack.append(module)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _import_stack.pop()
+        _state["imports"].setdefault(module, (time.perf_counter() - start, len(_import_stack)))
+
+def enable() -> None:
+    """Empieza a medir: tiempos de import y fases a partir de este momento"""
+    if _state["enabled"]:
+        return
+    _state.update(enabled=True, start=time.perf_counter(), phases=[], imports={})
+    builtins.__import__ = _timed_import
+
+def is_enabled() -> bool:
+    return _state["enabled"]
+
+def mark(phase: str) -> None:
+    """Registra que termino una fase del arranque (no hace nada si no se esta midiendo)"""
+    if _state["enabled"]:
+        _state["phases"].append((phase, time.perf_counter() - _state["start"]))
+
+def _elapsed_at(phase: str) -> Optional[float]:
+    for name, elapsed in _state["phases"]:
+        if name == phase:
+            return elapsed
+    return None
+
+def report(window_phase: str = "ventana visible") -> Dict[str, object]:
+    """Resumen de la medicion: fases, imports mas lentos y si se cumplio el presupuesto"""
+    phases = []
+    previous = 0.0
+    for name, elapsed in _state["phases"]:
+        phases.append({"fase": name, "segundos": round(elapsed - previous, 4), "acumulado": round(elapsed, 4)})
+        previous = elapsed
+
+    imports = sorted(_state["imports"].items(), key=lambda item: item[1][0], reverse=True)
+    time_to_window = _elapsed_at(window_phase)
+    return {
+        "fases": phases,
+        "imports": [
+            {"modulo": name, "segundos": round(seconds, 4), "profundidad": depth}
+            for name, (seconds, depth) in imports
+        ],
+        "tiempo_hasta_ventana": None if time_to_window is None else round(time_to_window, 4),
+        "presupuesto": STARTUP_BUDGET_SECONDS,
+        "dentro_del_presupuesto": time_to_window is not None and time_to_window <= STARTUP_BUDGET_SECONDS,
+    }
+
+def format_report(data: Dict[str, object], top_imports: int = 15) -> str:
+    """Texto legible del resumen para imprimir en consola"""
+    lines = ["Fases del arranque:"]
+    for phase in data["fases"]:
+        lines.append(f"  {phase['fase']:<28} {phase['segundos']:>8.3f}s  (acumulado {phase['acumulado']:.3f}s)")
+    lines.append(f"Imports (los {top_imports} mas lentos):")
+    for item in data["imports"][:top_imports]:
+        lines.append(f"  {'  ' * item['profundidad'] + item['modulo']:<28} {item['segundos']:>8.3f}s")
+    to_window = data["tiempo_hasta_ventana"]
+    if to_window is None:
+        lines.append("La ventana no llego a mostrarse")
+    else:
+        verdict = "OK" if data["dentro_del_presupuesto"] else "EXCEDIDO"
+        lines.append(f"Tiempo hasta la ventana: {to_window:.3f}s (presupuesto {data['presupuesto']:.2f}s) {verdict}")
+    return "\n".join(lines)
+
+def write_report(path: Path, data: Dict[str, object]) -> None:
+    """Guarda el resumen en JSON (el exe no tiene consola para imprimirlo)"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
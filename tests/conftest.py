@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# logic.app_paths resuelve la carpeta de datos al importarse: las pruebas usan
+# una temporal para no tocar la bandeja ni los reportes del usuario
+os.environ["COTIZACIONES_DATA_DIR"] = tempfile.mkdtemp(prefix="cotizaciones-tests-")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+def write_workbook(path: Path, products: dict, suppliers: dict) -> Path:
+    """Libro con las hojas Productos y Proveedores ({columna: [valores]})"""
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame(products).to_excel(writer, sheet_name="Productos", index=False)
+        pd.DataFrame(suppliers).to_excel(writer, sheet_name="Proveedores", index=False)
+    return path
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """data_manager sin catalogo cargado, en modo Excel y sin consolidar en segundo plano"""
+    from logic import data_manager
+
+    def reset():
+        timer = data_manager._compaction["timer"]
+        if timer is not None:
+            timer.cancel()
+        data_manager._session["pending"] = []
+        data_manager._session["depth"] = 0
+        data_manager.clear_cache()
+
+    monkeypatch.setattr(data_manager, "EXCEL_PATH", None)
+    monkeypatch.setattr(data_manager, "SQLITE_PATH", None)
+    monkeypatch.setattr(data_manager, "_MODE", "excel")
+    monkeypatch.setattr(data_manager, "JOURNAL_IDLE_SECONDS", 3600.0)
+    reset()
+    yield data_manager
+    reset()
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Libro de ejemplo con una columna propia en cada hoja (Precio, Tel)"""
+    return write_workbook(
+        tmp_path / "catalogo.xlsx",
+        {"Nombre": ["Tornillo", "Tuerca"], "Descripcion": ["M6", "M8"], "Foto": ["", ""], "Precio": ["10", "20"]},
+        {"Nombre": ["Ferreteria"], "Correo": ["ventas@ferreteria.com"], "Tel": ["555-1234"]},
+    )
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from logic import catalog_snapshot
+
+PRODUCTS = pd.DataFrame({"Nombre": ["Tornillo", "Tuerca"], "Descripcion": ["M6", ""], "Foto": ["", ""], "Precio": ["10", ""]})
+SUPPLIERS = pd.DataFrame({"Nombre": ["Ferreteria"], "Correo": ["ventas@ferreteria.com"]})
+
+@pytest.fixture(params=["feather", "json"])
+def book(request, tmp_path, monkeypatch):
+    """Archivo que hace de libro (el snapshot solo mira su firma y contenido)"""
+    if request.param == "json":
+        monkeypatch.setattr(catalog_snapshot, "_has_pyarrow", lambda: False)
+    path = tmp_path / "catalogo.xlsx"
+    path.write_bytes(b"contenido original")
+    catalog_snapshot.save_snapshot(path, PRODUCTS, SUPPLIERS)
+    return path
+
+def _assert_same(frames):
+    assert frames is not None
+    assert frames[0].to_dict("list") == PRODUCTS.to_dict("list")
+    assert frames[1].to_dict("list") == SUPPLIERS.to_dict("list")
+
+def test_unchanged_workbook_loads_snapshot(book):
+    _assert_same(catalog_snapshot.load_snapshot(book))
+
+def test_changed_workbook_invalidates_snapshot(book):
+    book.write_bytes(b"contenido modificado y mas largo")
+    assert catalog_snapshot.load_snapshot(book) is None
+
+def test_same_size_other_content_invalidates_snapshot(book):
+    book.write_bytes(b"contenido ORIGINAL")
+    assert catalog_snapshot.load_snapshot(book) is None
+
+def test_touched_workbook_with_same_content_keeps_snapshot(book):
+    st = book.stat()
+    os.utime(book, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    _assert_same(catalog_snapshot.load_snapshot(book))
+    # La firma nueva queda guardada: la proxima vez no hace falta el hash
+    meta = json.loads(catalog_snapshot._meta_path(book).read_text(encoding="utf-8"))
+    assert meta["mtime_ns"] == book.stat().st_mtime_ns
+
+def test_other_version_or_damaged_data_is_ignored(book):
+    meta_path = catalog_snapshot._meta_path(book)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+
+    meta_path.write_text(json.dumps({**meta, "version": catalog_snapshot.SNAPSHOT_VERSION - 1}), encoding="utf-8")
+    assert catalog_snapshot.load_snapshot(book) is None
+
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    catalog_snapshot._data_path(book, "products", meta["format"]).write_bytes(b"basura")
+    assert catalog_snapshot.load_snapshot(book) is None
+
+def test_catalog_is_read_from_snapshot_until_the_workbook_changes(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    assert catalog.get_load_stats()["engine"] != "snapshot"
+
+    catalog.clear_cache()
+    catalog.load_products()
+    assert catalog.get_load_stats()["engine"] == "snapshot"
+
+    products = pd.read_excel(workbook, sheet_name="Productos", dtype=str, keep_default_na=False)
+    suppliers = pd.read_excel(workbook, sheet_name="Proveedores", dtype=str, keep_default_na=False)
+    products.loc[len(products)] = ["Clavo", "", "", "5"]
+    with pd.ExcelWriter(workbook, engine="openpyxl") as writer:
+        products.to_excel(writer, sheet_name="Productos", index=False)
+        suppliers.to_excel(writer, sheet_name="Proveedores", index=False)
+
+    catalog.clear_cache()
+    assert catalog.load_products()["Nombre"].tolist() == ["Tornillo", "Tuerca", "Clavo"]
+    assert catalog.get_load_stats()["engine"] != "snapshot"
@@ -0,0 +1,80 @@
+import pandas as pd
+
+from logic.change_journal import ChangeJournal, journal_path_for
+
+def _add(kind, **row):
+    return {"op": "add", "kind": kind, "rows": [row]}
+
+def test_append_and_read(tmp_path):
+    journal = ChangeJournal(tmp_path / "libro.xlsx.journal")
+    journal.append([_add("products", Nombre="A")])
+    journal.append([{"op": "delete", "kind": "products", "names": ["a"]}])
+
+    changes = journal.read()
+    assert [c["op"] for c in changes] == ["add", "delete"]
+    assert all("ts" in c for c in changes)
+
+def test_torn_line_is_skipped_and_next_append_starts_a_new_line(tmp_path):
+    journal = ChangeJournal(tmp_path / "libro.xlsx.journal")
+    journal.append([_add("products", Nombre="A")])
+    with open(journal.path, "ab") as f:
+        f.write(b'{"op": "add", "kind": "prod')  # escritura interrumpida
+
+    assert [c["rows"][0]["Nombre"] for c in journal.read()] == ["A"]
+    journal.append([_add("products", Nombre="B")])
+    assert [c["rows"][0]["Nombre"] for c in journal.read()] == ["A", "B"]
+
+def test_drop_prefix_keeps_later_changes(tmp_path):
+    journal = ChangeJournal(tmp_path / "libro.xlsx.journal")
+    journal.append([_add("products", Nombre="A")])
+    consolidated = journal.size()
+    journal.append([_add("products", Nombre="B")])
+
+    journal.drop_prefix(consolidated)
+    assert [c["rows"][0]["Nombre"] for c in journal.read()] == ["B"]
+
+    journal.drop_prefix(journal.size())
+    assert not journal.path.exists()
+
+def test_replay_is_idempotent_and_keeps_extra_columns(catalog):
+    products = pd.DataFrame({"Nombre": ["A", "B"], "Descripcion": ["", ""], "Foto": ["", ""], "Precio": ["1", "2"]})
+    suppliers = pd.DataFrame({"Nombre": ["S"], "Correo": ["s@x.com"]})
+    changes = [
+        _add("products", Nombre="C", Descripcion="nuevo", Foto=""),
+        {"op": "delete", "kind": "products", "names": ["a"]},
+        {"op": "update", "kind": "products", "rows": [{"Nombre": "b", "Descripcion": "cambiado"}]},
+    ]
+
+    once = catalog._replay_changes(products, suppliers, changes)
+    twice = catalog._replay_changes(*once, changes)
+
+    assert once[0].to_dict("records") == [
+        {"Nombre": "B", "Descripcion": "cambiado", "Foto": "", "Precio": "2"},
+        {"Nombre": "C", "Descripcion": "nuevo", "Foto": "", "Precio": ""},
+    ]
+    assert twice[0].to_dict("records") == once[0].to_dict("records")
+    assert twice[1].to_dict("records") == suppliers.to_dict("records")
+
+def test_changes_are_journaled_then_compacted_into_the_workbook(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    before = workbook.stat().st_mtime_ns
+
+    catalog.add_product("Arandela", "6mm")
+    catalog.delete_products(["Tuerca"])
+    journal = ChangeJournal(journal_path_for(workbook))
+    assert workbook.stat().st_mtime_ns == before
+    assert [c["op"] for c in journal.read()] == ["add", "delete"]
+
+    # Al releer del disco se aplica el diario sobre el libro
+    catalog.clear_cache()
+    assert catalog.load_products()["Nombre"].tolist() == ["Tornillo", "Arandela"]
+
+    assert catalog.compact_journal() is True
+    assert not journal.path.exists()
+    sheet = pd.read_excel(workbook, sheet_name="Productos", dtype=str, keep_default_na=False)
+    assert sheet.to_dict("list") == {
+        "Nombre": ["Tornillo", "Arandela"],
+        "Descripcion": ["M6", "6mm"],
+        "Foto": ["", ""],
+        "Precio": ["10", ""],
+    }
@@ -0,0 +1,153 @@
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from logic import email_sender
+from logic.mail_transport import MemoryTransport, OutgoingMessage
+from logic.outbox import SENT, UNCERTAIN, Outbox
+from logic.send_pipeline import SendResult
+
+PRODUCTS = [{"Nombre": "Tornillo", "Descripcion": "M6", "Foto": ""}]
+RPC_E_DISCONNECTED = -2147417848
+
+def _suppliers(*emails):
+    return [{"Nombre": email.split("@")[0], "Correo": email} for email in emails]
+
+# -------------------- Outlook falso --------------------
+
+class FakeMail:
+    def __init__(self, outlook):
+        self.outlook = outlook
+        self.To = self.CC = self.Subject = self.Body = ""
+        self.Attachments = self
+
+    def Add(self, path):
+        pass
+
+    def Send(self):
+        self.outlook.send(self.To)
+
+class FakeOutlook:
+    def __init__(self, com):
+        self.com = com
+        self.Session = self
+        self.Accounts = self
+        self.Count = 1
+
+    def CreateItem(self, kind):
+        return FakeMail(self)
+
+    def send(self, to):
+        self.com.deliver(self, to)
+
+class FakeCom:
+    """Hace de win32com.client: cuenta las conexiones y puede fallar envios a pedido"""
+
+    def __init__(self, fail_once=(), disconnect_once=()):
+        self.dispatches = 0
+        self.sent = []
+        self.fail_once = set(fail_once)
+        self.disconnect_once = set(disconnect_once)
+        self.lock = threading.Lock()
+
+    def GetActiveObject(self, name):
+        with self.lock:
+            self.dispatches += 1
+        return FakeOutlook(self)
+
+    def deliver(self, outlook, to):
+        with self.lock:
+            if to in self.disconnect_once:
+                self.disconnect_once.discard(to)
+                raise OSError(RPC_E_DISCONNECTED, "Outlook se cerro")
+            if to in self.fail_once:
+                self.fail_once.discard(to)
+                raise RuntimeError("rechazado por el servidor")
+            self.sent.append(to)
+
+class NoPowerShell:
+    def send(self, message):
+        raise RuntimeError("sin PowerShell en las pruebas")
+
+    def close(self):
+        pass
+
+def _outlook(com):
+    return email_sender.OutlookTransport(com=com, powershell=NoPowerShell())
+
+# -------------------- Pruebas --------------------
+
+def test_one_outlook_session_per_thread_across_retries(tmp_path, monkeypatch):
+    monkeypatch.setattr(email_sender, "SEND_BACKOFF_SECONDS", 0.01)
+    emails = [f"p{i}@x.com" for i in range(8)]
+    com = FakeCom(fail_once=["p3@x.com"])
+    transport = _outlook(com)
+    outbox = Outbox(tmp_path / "outbox.db")
+
+    results = email_sender.send_bulk_emails(_suppliers(*emails), PRODUCTS, transport=transport,
+                                            outbox=outbox, workers=2, rate_per_second=1000)
+    outbox.close()
+
+    assert [r.status for r in results] == [SendResult.SENT] * 8
+    assert sorted(com.sent) == sorted(emails)
+    # Una conexion por hilo de envio (mas la de la verificacion inicial), aun con el reintento
+    assert transport.connections <= 2
+    assert com.dispatches <= 3
+
+def test_session_reconnects_once_when_outlook_restarts():
+    com = FakeCom(disconnect_once=["p0@x.com"])
+    session = email_sender.OutlookSession(com)
+    message = OutgoingMessage(to="p0@x.com", subject="s", body="b")
+
+    session.send(message)
+    session.send(OutgoingMessage(to="p1@x.com", subject="s", body="b"))
+
+    assert com.sent == ["p0@x.com", "p1@x.com"]
+    assert session.connections == 2
+
+class LateFailureTransport(MemoryTransport):
+    """El primer envio a slow@ tarda mas que el tiempo maximo y despues falla"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = Counter()
+        self._calls_lock = threading.Lock()
+
+    def send(self, message):
+        with self._calls_lock:
+            self.calls[message.to] += 1
+            call = self.calls[message.to]
+        if call == 1 and message.to == "slow@x.com":
+            time.sleep(0.5)
+            raise RuntimeError("fallo tardio")
+        if call == 1 and message.to == "retry@x.com":
+            # Su reintento mantiene el lote abierto mientras llega el fallo tardio
+            raise RuntimeError("fallo temporal")
+        return super().send(message)
+
+def test_timed_out_send_that_fails_late_is_reported_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(email_sender, "SEND_BACKOFF_SECONDS", 1.0)
+    transport = LateFailureTransport()
+    outbox = Outbox(tmp_path / "outbox.db")
+    stages = []
+
+    def on_progress(stage, **info):
+        stages.append((stage, info))
+
+    results = email_sender.send_bulk_emails(_suppliers("slow@x.com", "retry@x.com"), PRODUCTS,
+                                            transport=transport, outbox=outbox, workers=2,
+                                            rate_per_second=1000, timeout=0.2, on_progress=on_progress)
+
+    assert [r.status for r in results] == [SendResult.TIMEOUT, SendResult.SENT]
+    assert transport.calls["slow@x.com"] == 1  # no se reprogramo
+    terminal = Counter(info["result"].email for stage, info in stages if "result" in info)
+    assert terminal == {"slow@x.com": 1, "retry@x.com": 1}
+    assert all(info["done"] <= info["total"] for _, info in stages)
+    retries = [info["email"] for stage, info in stages if stage == "retry"]
+    assert retries == ["retry@x.com"]
+
+    outbox.close()
+    with sqlite3.connect(str(tmp_path / "outbox.db")) as conn:
+        states = dict(conn.execute("SELECT correo, estado FROM trabajos"))
+    assert states == {"slow@x.com": UNCERTAIN, "retry@x.com": SENT}
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from logic.email_template import compile_template
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def _legacy_render(text, supplier_name, products):
+    """Armado anterior: str.format de todo el texto y luego find/slice de la nota de imagenes"""
+    lines = [f"- {str(p.get('Nombre', 'Sin nombre')).strip()}: {str(p.get('Descripcion', 'Sin descripción')).strip()}"
+             for p in products]
+    has_images = any(p.get("Foto", "").strip() for p in products)
+    message = text.format(nombre_proveedor=str(supplier_name).strip(),
+                          lista_productos="\n".join(lines) if products else "No se especificaron productos.")
+    if has_images:
+        return message.replace("{nota_imagenes}", "").replace("{/nota_imagenes}", "")
+    start, end = message.find("{nota_imagenes}"), message.find("{/nota_imagenes}")
+    if start != -1 and end != -1:
+        message = message[:start] + message[end + len("{/nota_imagenes}"):]
+    return message
+
+TEMPLATES = [
+    (ROOT / "data" / "email_template.txt").read_text(encoding="utf-8"),
+    "Hola {nombre_proveedor},\n\n{lista_productos}\n\n{{nota_imagenes}}Adjuntamos imagenes.{{/nota_imagenes}}\nGracias, {nombre_proveedor}",
+    "Estimado {nombre_proveedor!r}:\n{lista_productos}",
+    "[{nombre_proveedor:>20}]\n{lista_productos}",
+    "Sin nombre del proveedor\n{lista_productos}\n{{literal}}",
+    "{nombre_proveedor}{lista_productos}{nombre_proveedor}",
+]
+
+PRODUCT_SETS = [
+    [{"Nombre": "Tornillo", "Descripcion": "M6", "Foto": ""}],
+    [{"Nombre": "Cámara", "Descripcion": "con {llaves}", "Foto": "abc.png"},
+     {"Nombre": " Tuerca ", "Descripcion": "", "Foto": ""}],
+    [],
+]
+
+SUPPLIERS = ["Ferretería López", "  Con espacios  ", "{no es un campo}", ""]
+
+@pytest.mark.parametrize("text", TEMPLATES)
+@pytest.mark.parametrize("products", PRODUCT_SETS)
+def test_prepared_message_matches_legacy_render(text, products):
+    prepared = compile_template(text).prepare(products)
+    for supplier in SUPPLIERS:
+        assert prepared.render(supplier) == _legacy_render(text, supplier, products)
+
+def test_compiled_template_is_cached_by_text():
+    text = TEMPLATES[1]
+    assert compile_template(text) is compile_template(text)
+    assert compile_template(text) is not compile_template(text + " ")
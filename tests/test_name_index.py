@@ -0,0 +1,33 @@
+import pytest
+
+def test_duplicate_names_are_rejected_case_insensitively(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+
+    with pytest.raises(ValueError, match="Ya existe"):
+        catalog.add_product("  TORNILLO ", "otro")
+    with pytest.raises(ValueError, match="Ya existe"):
+        catalog.add_supplier("ferreteria", "otra@ferreteria.com")
+
+def test_lookup_by_name_follows_adds_and_deletes(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+
+    catalog.add_product("Arandela", "6mm")
+    assert [p["Nombre"] for p in catalog.get_products_by_names(["arandela", "TUERCA", "no existe"])] == ["Tuerca", "Arandela"]
+
+    assert catalog.delete_products(["tornillo", "ARANDELA"]) == 2
+    assert [p["Nombre"] for p in catalog.get_products_by_names(["Tornillo", "Arandela", "Tuerca"])] == ["Tuerca"]
+    # El nombre borrado se puede volver a usar
+    catalog.add_product("Tornillo", "M10")
+    assert [p["Descripcion"] for p in catalog.get_products_by_names(["tornillo"])] == ["M10"]
+
+def test_index_matches_catalog_after_reload(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    catalog.add_supplier("Aceros del Sur", "ventas@aceros.com")
+    catalog.clear_cache()
+
+    # Vuelve a leer libro + diario y reconstruye el indice
+    suppliers = catalog.get_suppliers_by_names(["ACEROS DEL SUR", "ferreteria"])
+    assert [(s["Nombre"], s["Correo"]) for s in suppliers] == [
+        ("Ferreteria", "ventas@ferreteria.com"),
+        ("Aceros del Sur", "ventas@aceros.com"),
+    ]
@@ -0,0 +1,129 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from logic import email_sender, outbox as outbox_store
+from logic.mail_transport import MemoryTransport
+from logic.outbox import CANCELLED, FAILED, PENDING, SENDING, SENT, UNCERTAIN, Outbox, job_key
+from logic.send_pipeline import SendResult
+
+PRODUCTS = [{"Nombre": "Tornillo", "Descripcion": "M6", "Foto": ""}]
+JOBS = [{"Nombre": "A", "Correo": "a@x.com"}, {"Nombre": "B", "Correo": "b@x.com"}]
+
+@pytest.fixture
+def outbox(tmp_path):
+    box = Outbox(tmp_path / "outbox.db")
+    yield box
+    box.close()
+
+def _states(box, batch_id):
+    return {row["correo"]: row["estado"] for row in box.jobs(batch_id)}
+
+def test_outbox_lives_in_the_user_data_folder():
+    assert outbox_store.OUTBOX_PATH.parent == Path(os.environ["COTIZACIONES_DATA_DIR"])
+
+def test_same_fingerprint_resumes_the_open_batch(outbox):
+    batch_id, resumed = outbox.start_batch("huella", "", PRODUCTS, JOBS)
+    assert not resumed
+    outbox.mark_sending(job_key(batch_id, "a@x.com"))
+
+    # La app se cerro mientras entregaba a@: al repetir el envio no se sabe si llego
+    again, resumed = outbox.start_batch("huella", "", PRODUCTS, JOBS + [{"Nombre": "C", "Correo": "C@X.com"}])
+    assert (again, resumed) == (batch_id, True)
+    assert _states(outbox, batch_id) == {"a@x.com": UNCERTAIN, "b@x.com": PENDING, "C@X.com": PENDING}
+
+    # La clave no distingue mayusculas: el mismo destinatario no se agrega dos veces
+    outbox.start_batch("huella", "", PRODUCTS, [{"Nombre": "C", "Correo": "c@x.com"}])
+    assert len(outbox.jobs(batch_id)) == 3
+
+def test_finished_batch_is_not_resumed(outbox):
+    batch_id, _ = outbox.start_batch("huella", "", PRODUCTS, JOBS)
+    for job in JOBS:
+        key = job_key(batch_id, job["Correo"])
+        outbox.mark_sending(key)
+        outbox.mark_sent(key, "COM")
+    assert outbox.finish_batch(batch_id)
+
+    other, resumed = outbox.start_batch("huella", "", PRODUCTS, JOBS)
+    assert other != batch_id and not resumed
+
+def test_failed_attempts_retry_later_then_fail(outbox):
+    batch_id, _ = outbox.start_batch("huella", "", PRODUCTS, JOBS[:1])
+    key = job_key(batch_id, "a@x.com")
+    now = time.time()
+
+    outbox.mark_sending(key)
+    assert outbox.mark_failed(key, "sin conexion", retry_at=now + 60)
+    assert outbox.due_jobs(batch_id, now=now) == []
+    assert [row["clave"] for row in outbox.due_jobs(batch_id, now=now + 61)] == [key]
+    assert outbox.next_retry(batch_id) == pytest.approx(now + 60)
+    assert not outbox.finish_batch(batch_id)
+
+    outbox.mark_sending(key)
+    assert outbox.mark_failed(key, "sin conexion")
+    row = outbox.jobs(batch_id)[0]
+    assert (row["estado"], row["intentos"], row["ultimo_error"]) == (FAILED, 2, "sin conexion")
+    assert outbox.next_retry(batch_id) is None
+    assert outbox.finish_batch(batch_id)
+
+def test_only_jobs_in_progress_change_on_failure_or_timeout(outbox):
+    batch_id, _ = outbox.start_batch("huella", "", PRODUCTS, JOBS)
+    a, b = job_key(batch_id, "a@x.com"), job_key(batch_id, "b@x.com")
+
+    # Pendiente: ni el fallo ni el tiempo agotado lo tocan
+    assert not outbox.mark_failed(a, "tarde", retry_at=time.time())
+    assert not outbox.mark_uncertain(a, "tarde")
+
+    # Vencido y despues falla: queda sin confirmar, no vuelve a pendiente
+    outbox.mark_sending(b)
+    assert outbox.mark_uncertain(b, "supero el tiempo")
+    assert not outbox.mark_failed(b, "fallo tardio", retry_at=time.time())
+    assert _states(outbox, batch_id) == {"a@x.com": PENDING, "b@x.com": UNCERTAIN}
+
+def test_cancel_only_affects_pending_jobs(outbox):
+    batch_id, _ = outbox.start_batch("huella", "", PRODUCTS, JOBS)
+    a, b = job_key(batch_id, "a@x.com"), job_key(batch_id, "b@x.com")
+    outbox.mark_sending(a)
+    outbox.mark_sent(a, "COM")
+
+    outbox.cancel_jobs(batch_id, [a, b])
+
+    assert _states(outbox, batch_id) == {"a@x.com": SENT, "b@x.com": CANCELLED}
+    assert outbox.finish_batch(batch_id)
+    assert outbox.open_batches() == []
+
+def test_open_batches_survive_reopening_the_file(tmp_path):
+    first = Outbox(tmp_path / "outbox.db")
+    batch_id, _ = first.start_batch("huella", "copia@x.com", PRODUCTS, JOBS)
+    first.mark_sending(job_key(batch_id, "a@x.com"))
+    first.close()
+
+    second = Outbox(tmp_path / "outbox.db")
+    try:
+        batches = second.open_batches()
+        assert [(b["id"], b["cc"], b["pendientes"], b["productos"]) for b in batches] == [
+            (batch_id, "copia@x.com", 2, PRODUCTS)
+        ]
+        assert _states(second, batch_id)["a@x.com"] == SENDING
+    finally:
+        second.close()
+
+def test_resumed_send_skips_delivered_and_uncertain_jobs(outbox):
+    suppliers = [{"Nombre": n, "Correo": f"{n.lower()}@x.com"} for n in ("A", "B", "C")]
+    fingerprint = outbox_store.batch_fingerprint(PRODUCTS, "", email_sender.EMAIL_SUBJECT,
+                                                 [s["Correo"] for s in suppliers])
+    batch_id, _ = outbox.start_batch(fingerprint, "", PRODUCTS, suppliers)
+    # Corrida anterior interrumpida: a@ salio, b@ se estaba entregando
+    outbox.mark_sending(job_key(batch_id, "a@x.com"))
+    outbox.mark_sent(job_key(batch_id, "a@x.com"), "COM")
+    outbox.mark_sending(job_key(batch_id, "b@x.com"))
+
+    transport = MemoryTransport()
+    results = email_sender.send_bulk_emails(suppliers, PRODUCTS, transport=transport, outbox=outbox,
+                                            workers=2, rate_per_second=1000)
+
+    assert [m.to for m in transport.outbox] == ["c@x.com"]
+    assert [r.status for r in results] == [SendResult.SENT, SendResult.UNCERTAIN, SendResult.SENT]
+    assert outbox.open_batches() == []
@@ -0,0 +1,57 @@
+import random
+
+import pandas as pd
+import pytest
+
+from logic.search_index import NGramIndex, fold
+
+WORDS = ["cámara", "Cable", "tornillo", "TUERCA", "acero", "niño", "pingüino", "m6", "llave", "ángulo"]
+
+def _frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Nombre": [" ".join(rng.sample(WORDS, 2)) + f" {i}" for i in range(rows)],
+        "Descripcion": [rng.choice(WORDS) for _ in range(rows)],
+    })
+
+def _brute_force(df: pd.DataFrame, query: str) -> list:
+    q = fold(query)
+    return [
+        label for label, nombre, descripcion in zip(df.index, df["Nombre"], df["Descripcion"])
+        if q in fold(nombre) or q in fold(descripcion)
+    ]
+
+@pytest.mark.parametrize("rows", [50, 2000])  # altas incrementales / construccion en bloque
+@pytest.mark.parametrize("query", ["camara", "CÁMARA", "nino", "ca", "e", "llave 1", "acero", "xyz", "gu"])
+def test_matches_brute_force(rows, query):
+    df = _frame(rows)
+    index = NGramIndex.from_frame(df, ["Nombre", "Descripcion"])
+
+    assert index.search(query) == _brute_force(df, query)
+
+def test_does_not_match_across_fields():
+    df = pd.DataFrame({"Nombre": ["abc"], "Descripcion": ["def"]})
+    index = NGramIndex.from_frame(df, ["Nombre", "Descripcion"])
+
+    assert index.search("cde") == []
+    assert index.search("bc") == [0]
+
+def test_incremental_add_and_remove():
+    df = _frame(300)
+    index = NGramIndex.from_frame(df, ["Nombre", "Descripcion"])
+
+    index.add(1000, ["Cámara réflex", ""])
+    index.remove(0)
+    index.add(1, ["otro nombre", ""])
+
+    expected = _brute_force(df.drop(index=[0, 1]), "camara") + [1000]
+    assert index.search("camara") == sorted(expected)
+    assert 1 in index.search("otro")
+    assert 0 not in index.search(fold(df.at[0, "Nombre"]))
+
+def test_search_products_ignores_accents(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    catalog.add_product("Cámara térmica", "Infrarroja")
+
+    assert catalog.search_products("camara termica")["Nombre"].tolist() == ["Cámara térmica"]
+    assert catalog.search_products("TUER")["Nombre"].tolist() == ["Tuerca"]
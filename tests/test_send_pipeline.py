@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+from logic import email_sender
+from logic.mail_transport import MemoryTransport
+from logic.outbox import Outbox
+from logic.send_pipeline import RateLimiter, SendResult, new_executor, run_pipeline
+
+PRODUCTS = [{"Nombre": "Tornillo", "Descripcion": "M6", "Foto": ""}]
+
+def _jobs(count):
+    return [{"Nombre": f"Proveedor {i}", "Correo": f"p{i}@x.com"} for i in range(count)]
+
+def test_rate_limiter_spaces_operations():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    # La primera sale de inmediato, las otras cinco a 1/50 s cada una
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+def test_rate_limiter_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+def test_results_keep_job_order_and_failures():
+    def send(name, email, products, cc):
+        if email == "p2@x.com":
+            raise RuntimeError("rechazado")
+        time.sleep(0.01 * (5 - int(email[1])))
+        return "memoria"
+
+    results = run_pipeline(_jobs(5), send, PRODUCTS, workers=3, rate_per_second=1000)
+
+    assert [r.email for r in results] == [j["Correo"] for j in _jobs(5)]
+    assert [r.status for r in results] == [SendResult.SENT] * 2 + [SendResult.FAILED] + [SendResult.SENT] * 2
+    assert results[2].error == "rechazado"
+
+def test_timeout_reports_and_keeps_the_straggler():
+    release = threading.Event()
+
+    def send(name, email, products, cc):
+        if email == "p0@x.com":
+            release.wait(5)
+        return "memoria"
+
+    stragglers = []
+    start = time.monotonic()
+    results = run_pipeline(_jobs(3), send, PRODUCTS, workers=2, rate_per_second=1000,
+                           timeout=0.2, stragglers=stragglers)
+    try:
+        assert time.monotonic() - start < 2
+        assert [r.status for r in results] == [SendResult.TIMEOUT, SendResult.SENT, SendResult.SENT]
+        assert len(stragglers) == 1 and not stragglers[0].done()
+    finally:
+        release.set()
+
+def test_cancel_skips_jobs_that_did_not_start():
+    cancel = threading.Event()
+    sent = []
+
+    def send(name, email, products, cc):
+        sent.append(email)
+        cancel.set()
+        return "memoria"
+
+    results = run_pipeline(_jobs(4), send, PRODUCTS, workers=1, rate_per_second=1000, cancel=cancel)
+
+    assert sent == ["p0@x.com"]
+    assert [r.status for r in results] == [SendResult.SENT] + [SendResult.CANCELLED] * 3
+    assert all(r.attempts == 0 for r in results[1:])
+
+def test_shared_executor_keeps_its_threads_between_calls():
+    inits = []
+    executor = new_executor(2, lambda: inits.append(threading.get_ident()))
+    try:
+        for _ in range(3):
+            results = run_pipeline(_jobs(4), lambda *args: "memoria", PRODUCTS,
+                                   rate_per_second=1000, executor=executor)
+            assert all(r.ok for r in results)
+        # Sigue abierto y cada hilo se inicializo una sola vez
+        assert executor.submit(lambda: 1).result() == 1
+        assert len(inits) == len(set(inits)) <= 2
+    finally:
+        executor.shutdown()
+
+class FlakyTransport(MemoryTransport):
+    """Falla el primer intento de cada destinatario y cuenta los hilos inicializados"""
+
+    def __init__(self):
+        super().__init__()
+        self.thread_inits = 0
+        self.attempts = {}
+        self._count_lock = threading.Lock()
+
+    def thread_init(self):
+        with self._count_lock:
+            self.thread_inits += 1
+
+    def send(self, message):
+        with self._count_lock:
+            self.attempts[message.to] = self.attempts.get(message.to, 0) + 1
+            first = self.attempts[message.to] == 1
+        if first:
+            raise RuntimeError("fallo temporal")
+        return super().send(message)
+
+def test_retry_rounds_reuse_the_send_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(email_sender, "SEND_BACKOFF_SECONDS", 0.01)
+    transport = FlakyTransport()
+    outbox = Outbox(tmp_path / "outbox.db")
+
+    results = email_sender.send_bulk_emails(_jobs(6), PRODUCTS, transport=transport, outbox=outbox,
+                                            workers=2, rate_per_second=1000)
+    outbox.close()
+
+    assert [r.status for r in results] == [SendResult.SENT] * 6
+    assert all(count == 2 for count in transport.attempts.values())
+    assert transport.thread_inits <= 2
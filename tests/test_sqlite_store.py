@@ -0,0 +1,84 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from logic import sqlite_store
+
+def test_round_trip_keeps_extra_columns(tmp_path):
+    path = tmp_path / "catalogo.db"
+    products = pd.DataFrame({
+        "Nombre": ["Tornillo", "Tuerca"], "Descripcion": ["M6", ""], "Foto": ["", ""],
+        "Precio": ["10", "20"], "Stock": ["", "5"],
+    })
+    suppliers = pd.DataFrame({"Nombre": ["Ferreteria"], "Correo": ["ventas@ferreteria.com"]})
+
+    sqlite_store.replace_catalog(path, products, suppliers)
+    read_products, read_suppliers = sqlite_store.read_catalog(path)
+
+    assert read_products.to_dict("list") == products.to_dict("list")
+    assert list(read_products.columns) == list(products.columns)
+    assert list(read_suppliers.columns) == ["Nombre", "Correo"]
+
+def test_apply_changes_keeps_extras_of_other_rows(tmp_path):
+    path = tmp_path / "catalogo.db"
+    products = pd.DataFrame({"Nombre": ["Tornillo"], "Descripcion": ["M6"], "Foto": [""], "Precio": ["10"]})
+    sqlite_store.replace_catalog(path, products, pd.DataFrame(columns=["Nombre", "Correo"]))
+
+    sqlite_store.apply_changes(path, [
+        {"op": "add", "kind": "products", "rows": [{"Nombre": "Tuerca", "Descripcion": "M8", "Foto": ""}]},
+        {"op": "update", "kind": "products", "rows": [{"Nombre": "TORNILLO", "Descripcion": "M6x20"}]},
+    ])
+    read_products, _ = sqlite_store.read_catalog(path)
+
+    assert read_products.to_dict("records") == [
+        {"Nombre": "Tornillo", "Descripcion": "M6x20", "Foto": "", "Precio": "10"},
+        {"Nombre": "Tuerca", "Descripcion": "M8", "Foto": "", "Precio": ""},
+    ]
+
+def test_database_without_extra_column_is_migrated(tmp_path):
+    path = tmp_path / "antigua.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE productos (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, nombre_key TEXT NOT NULL,
+                                descripcion TEXT NOT NULL DEFAULT '', foto TEXT NOT NULL DEFAULT '');
+        CREATE TABLE proveedores (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL, nombre_key TEXT NOT NULL,
+                                  correo TEXT NOT NULL DEFAULT '');
+        INSERT INTO productos (nombre, nombre_key, descripcion) VALUES ('Tornillo', 'tornillo', 'M6');
+    """)
+    conn.close()
+
+    read_products, _ = sqlite_store.read_catalog(path)
+
+    assert read_products.to_dict("records") == [{"Nombre": "Tornillo", "Descripcion": "M6", "Foto": ""}]
+
+def test_export_from_sqlite_writes_workbook_columns_back(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    catalog.set_mode("sqlite", str(workbook.with_suffix(".db")))
+    catalog.add_product("Arandela", "6mm")
+
+    catalog.export_to_excel()
+    sheets = pd.read_excel(workbook, sheet_name=None, dtype=str, keep_default_na=False)
+
+    assert sheets["Productos"].to_dict("list") == {
+        "Nombre": ["Tornillo", "Tuerca", "Arandela"],
+        "Descripcion": ["M6", "M8", "6mm"],
+        "Foto": ["", "", ""],
+        "Precio": ["10", "20", ""],
+    }
+    assert sheets["Proveedores"]["Tel"].tolist() == ["555-1234"]
+
+def test_export_refuses_to_drop_workbook_columns(catalog, workbook):
+    catalog.load_catalog_file(workbook)
+    catalog.set_mode("sqlite", str(workbook.with_suffix(".db")))
+    # Base importada antes de que se guardaran las columnas propias
+    conn = sqlite3.connect(str(catalog.SQLITE_PATH))
+    conn.execute("UPDATE productos SET extra = ''")
+    conn.commit()
+    conn.close()
+    catalog.clear_cache()
+
+    with pytest.raises(ValueError, match="Precio"):
+        catalog.export_to_excel()
+    target = catalog.export_to_excel(str(workbook.with_name("copia.xlsx")))
+    assert target.exists()
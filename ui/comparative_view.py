@@ -12,8 +12,8 @@ class ComparativeView(tk.Toplevel):
         
         
         #Cargar los datos desde la base principal (no se recarga el excel)
-        self.productos = data_manager.load_products().to_dict(orient="records")
-        self.suppliers = data_manager.load_supplier().to_dict(orient="records")
+        self.productos = data_manager.list_products()
+        self.suppliers = data_manager.list_suppliers()
         
         # Seleccion de proveedores y productos
         self.selected_products = []
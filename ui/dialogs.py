@@ -1,6 +1,6 @@
 from colorsys import ONE_SIXTH
 import tkinter as tk
-from tkinter import messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 from logic import data_manager
 
@@ -112,3 +112,126 @@ class CreateSupplierDialog(tk.Toplevel):
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+def _format_seconds(seconds):
+    """ "45 s" o "3 min" para mostrar cuanto falta """
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    return f"{seconds / 60:.0f} min"
+
+class SendProgressDialog(tk.Toplevel):
+    """ Avance de un envio masivo: un renglon por proveedor y totales.
+    
+    No envia nada: MainApp le pasa los avisos de email_sender.SendProgress
+    (update_progress) y al final los resultados (finish).
+    """
+    
+    def __init__(self, parent, on_cancel):
+        super().__init__(parent)
+        self.title("Enviando cotizaciones")
+        self.geometry("640x420")
+        self.on_cancel = on_cancel
+        self.running = True
+        self.rows = {}  # correo -> renglones de la tabla
+        
+        self.summary_label = tk.Label(self, text="Preparando envío...", anchor="w", font=("Arial", 10, "bold"))
+        self.summary_label.pack(fill="x", padx=10, pady=(10, 2))
+        
+        self.bar = ttk.Progressbar(self, mode="determinate", maximum=1)
+        self.bar.pack(fill="x", padx=10, pady=2)
+        
+        self.stats_label = tk.Label(self, text="", anchor="w")
+        self.stats_label.pack(fill="x", padx=10, pady=2)
+        
+        # Tabla de proveedores
+        table_frame = tk.Frame(self)
+        table_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        columns = ("proveedor", "correo", "estado", "detalle")
+        self.table = ttk.Treeview(table_frame, columns=columns, show="headings")
+        for column, title, width in zip(columns, ("Proveedor", "Correo", "Estado", "Detalle"), (140, 170, 110, 180)):
+            self.table.heading(column, text=title)
+            self.table.column(column, width=width)
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        self.table.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        
+        # Botones
+        btn_frame = tk.Frame(self)
+        btn_frame.pack(pady=5)
+        self.cancel_btn = tk.Button(btn_frame, text="Cancelar envío", command=self.cancel)
+        self.cancel_btn.pack(side="left", padx=5)
+        self.close_btn = tk.Button(btn_frame, text="Cerrar", command=self.destroy, state="disabled")
+        self.close_btn.pack(side="left", padx=5)
+        
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+    
+    def cancel(self):
+        """ Deja de empezar envios; los que estan en curso terminan """
+        self.on_cancel()
+        self.cancel_btn.config(state="disabled")
+        self.summary_label.config(text="Cancelando: se esperan los envíos en curso...")
+    
+    def on_close(self):
+        if not self.running:
+            self.destroy()
+        elif messagebox.askyesno("Envío en curso", "¿Cancelar el resto del envío?", parent=self):
+            self.cancel()
+    
+    def _set_row(self, email, status, detail=""):
+        for iid in self.rows.get(email.casefold(), ()):
+            self.table.set(iid, "estado", status)
+            self.table.set(iid, "detalle", detail)
+    
+    def update_progress(self, stage, info):
+        """ Aplica un aviso de SendProgress (etapa y datos) """
+        if stage == "checking":
+            self.summary_label.config(text=f"Verificando conexión con {info['transport']}...")
+            return
+        
+        if stage == "queued":
+            # Un envio reanudado puede traer varios lotes: la tabla muestra el actual
+            self.table.delete(*self.table.get_children())
+            self.rows = {}
+            for item in info["items"]:
+                iid = self.table.insert("", "end", values=(item["supplier"], item["email"], item["status"], ""))
+                self.rows.setdefault(item["email"].casefold(), []).append(iid)
+        elif stage == "sending":
+            attempt = f"intento {info['attempt']}" if info["attempt"] > 1 else ""
+            self._set_row(info["email"], "enviando", attempt)
+        elif stage == "retry":
+            self._set_row(info["email"], "reintento", f"en {_format_seconds(info['retry_in'])}: {info['error']}")
+        elif stage in ("sent", "failed", "cancelled"):
+            result = info["result"]
+            self._set_row(result.email, result.status, result.method if result.ok else result.error)
+        
+        total = info["total"]
+        self.bar.config(maximum=max(total, 1), value=info["done"])
+        if self.cancel_btn["state"] == "normal":
+            summary = f"{info['done']} de {total} procesados: {info['sent']} enviados, {info['failed']} con error"
+            if stage == "waiting":
+                summary += f" (reintentando los fallidos en {_format_seconds(info['seconds'])})"
+            self.summary_label.config(text=summary)
+        stats = []
+        if info["rate"]:
+            stats.append(f"{info['rate']:.1f} correos/s")
+        if info["eta"] is not None and info["done"] < total:
+            stats.append(f"faltan ~{_format_seconds(info['eta'])}")
+        self.stats_label.config(text=" · ".join(stats))
+    
+    def finish(self, results):
+        """ Envio terminado (o cancelado): se puede cerrar la ventana """
+        self.running = False
+        sent = sum(1 for r in results if r.ok)
+        self.summary_label.config(text=f"Terminado: {sent} de {len(results)} correos enviados")
+        self.bar.config(maximum=max(len(results), 1), value=len(results))
+        self.stats_label.config(text="")
+        self.cancel_btn.config(state="disabled")
+        self.close_btn.config(state="normal")
+    
+    def fail(self, message):
+        """ El envio no pudo empezar o se corto por un error """
+        self.running = False
+        self.summary_label.config(text="El envío se detuvo por un error")
+        self.stats_label.config(text=message)
+        self.cancel_btn.config(state="disabled")
+        self.close_btn.config(state="normal")
@@ -1,17 +1,28 @@
+import queue
+import threading
+from pathlib import Path
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 
-from logic import data_manager
-from ui.dialogs import (
-    CreateProductDialog, CreateSupplierDialog
-)
+from logic import startup_profile
 
-from ui.comparative_view import ComparativeView
+# data_manager (pandas), email_sender (win32com), los dialogos y la comparativa
+# se importan dentro de los metodos que los usan: asi la ventana se muestra sin
+# esperar a que carguen y el catalogo se lee despues del primer pintado.
 
-from logic import data_manager, email_sender
+# Checkboxes que se crean por tanda al llenar una lista (entre tandas la UI responde)
+RENDER_CHUNK = 200
+# Cada cuanto se revisa el avance de una carga en segundo plano (ms)
+LOAD_POLL_MS = 100
+# Cada cuanto se revisa si el Excel cambio fuera de la app (ms)
+WATCH_INTERVAL_MS = 2000
+# Espera antes de ofrecer continuar envíos interrumpidos (que la ventana ya esté lista)
+RESUME_SENDS_DELAY_MS = 500
+# Miniaturas de productos que se guardan ya cargadas para la vista previa
+THUMBNAIL_CACHE = 256
 
 class MainApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, catalog_path = None):
         super().__init__()
         
         self.title("Cotizaciones Automaticas")
@@ -22,6 +33,15 @@ class MainApp(tk.Tk):
         self.selected_products = set()
         self.selected_suppliers = set()
         
+        # Excel a cargar al abrir (app.py --profile-startup libro.xlsx)
+        self.catalog_path = catalog_path
+        # Carga de catalogo en curso (ver load_database)
+        self._load_job = None
+        # Diagnostico de Outlook en curso (ver diagnose_outlook)
+        self._diagnose_job = None
+        # Envio masivo en curso (ver start_send)
+        self._send_job = None
+        
         # ------ Titulo ------
         tittle = tk.Label(self, text = "Cotizaciones Automaticas", font = ("Arial", 16, "bold")) #Titulo de la ventana
         tittle.pack(pady = 10) #Posicion del titulo
@@ -36,7 +56,8 @@ class MainApp(tk.Tk):
         tk.Button(crud_frame, text = "Agregar Proveedor", command = self.create_supplier).pack(side = tk.LEFT, padx = 5)
         tk.Button(crud_frame, text = "Eliminar Proveedor", command = self.delete_supplier).pack(side = tk.LEFT, padx = 5)
         tk.Button(crud_frame, text = "Cargar DB", command = self.load_database).pack(side = tk.LEFT, padx = 5)
-        tk.Button(crud_frame, text = "Diagnosticar Outlook", command = self.diagnose_outlook).pack(side = tk.LEFT, padx = 5)
+        self.diagnose_btn = tk.Button(crud_frame, text = "Diagnosticar Outlook", command = self.diagnose_outlook)
+        self.diagnose_btn.pack(side = tk.LEFT, padx = 5)
         tk.Button(crud_frame, text = "Comparativa", command= self.open_comparative_view).pack(side = tk.LEFT, padx = 5)
         
         # ------ Frame Central ------
@@ -47,6 +68,12 @@ class MainApp(tk.Tk):
         self.product_frame = self.create_list_panel(central_frame, "Buscador de Productos")
         self.product_frame.pack(side = "left",expand = True, fill = "both", padx = 10)
         
+        # Vista previa del producto bajo el cursor (miniatura del almacen de imagenes)
+        self.product_preview = tk.Label(self.product_frame, text = "", compound = "left", anchor = "w", justify = "left")
+        self.product_preview.pack(side = "bottom", fill = "x", pady = 5, before = self.product_frame.list_frame.master)
+        self._preview_name = None
+        self._thumbnails = {} # ruta -> PhotoImage (Tk la descarta si nadie la referencia)
+        
         self.supplier_frame = self.create_list_panel(central_frame, "Buscador de Proveedores")
         self.supplier_frame.pack(side = "left",expand = True, fill = "both", padx = 10)
         
@@ -69,12 +96,50 @@ class MainApp(tk.Tk):
         send_btn = tk.Button(button_frame, text = "Enviar Cotizaciones", command = self.send_action, bg = "#2196F3", fg = "white", font = ("Arial", 10, "bold"))
         send_btn.pack(side = tk.LEFT, padx = 5)
         
-        # ------ Inicializacion de listas ------
+        # ------ Avance de carga (visible solo mientras se carga un Excel) ------
+        self.load_frame = tk.Frame(self)
+        self.load_label = tk.Label(self.load_frame, text = "", anchor = "w")
+        self.load_label.pack(side = tk.LEFT, padx = 5)
+        self.load_bar = ttk.Progressbar(self.load_frame, mode = "indeterminate", length = 200)
+        self.load_bar.pack(side = tk.LEFT, padx = 5)
+        self.cancel_load_btn = tk.Button(self.load_frame, text = "Cancelar", command = self.cancel_load)
+        self.cancel_load_btn.pack(side = tk.LEFT, padx = 5)
+        
+        startup_profile.mark("ventana creada")
+        
+        # ------ Inicializacion de listas (despues de mostrar la ventana) ------
+        self.after(0, self.load_initial_catalog)
+    
+    def load_initial_catalog(self):
+        """ Pinta la ventana y recien entonces carga el catalogo y llena las listas """
+        self.update_idletasks()
+        startup_profile.mark("ventana visible")
+        
+        from logic import data_manager
+        startup_profile.mark("import data_manager")
+        
+        if self.catalog_path is not None:
+            data_manager.load_catalog_file(self.catalog_path)
+            startup_profile.mark("carga del catalogo")
+        else:
+            # Sin libro el catalogo esta vacio: no hay carga que medir
+            data_manager.load_products()
+            data_manager.load_supplier()
+        
         self.refresh_products()
         self.refresh_suppliers()
+        startup_profile.mark("listas llenas")
+        self.event_generate("<<CatalogLoaded>>")
+        
+        # Vigilar cambios hechos al Excel compartido desde fuera de la app
+        self.after(WATCH_INTERVAL_MS, self.watch_external_changes)
+        
+        # Envíos masivos que se interrumpieron la última vez
+        self.after(RESUME_SENDS_DELAY_MS, self.resume_pending_sends)
     
     # ========= Cargar Pestaña Comparativa (REUTILIZABLE) =========
     def open_comparative_view(self):
+        from ui.comparative_view import ComparativeView
         ComparativeView(self)
     
     # ========= PANEL LISTAS (REUTILIZABLE) =========
@@ -114,50 +179,136 @@ class MainApp(tk.Tk):
         frame.search_var = search_var
         frame.list_frame = list_frame
         frame.title = title
+        frame.render_job = None
+        frame.rows = {} # nombre -> checkbox visible
         
         return frame
     
     # ========= RENDER DE LISTAS =========
     
     def refresh_products(self, query = ""):
+        from logic import data_manager
         
-        for widget in self.product_frame.list_frame.winfo_children(): # Elimna widgets anteriores
-            widget.destroy()
-            
         df = data_manager.search_products(query) #df es el dataframe de productos y busqueda
-        
-        for _, row in df.iterrows():
-            name = row["Nombre"]
-            var = tk.BooleanVar(value = (name in self.selected_products))
-            cb = tk.Checkbutton(
-                self.product_frame.list_frame,
-                text = name,
-                variable = var,
-                command = lambda n = name, v = var: self.toggle_selection(n, v, "products"),
-                anchor = "w"
-            )
-            cb.pack(fill = "x", padx = 5, pady = 2)
+        self.render_list(self.product_frame, df["Nombre"].tolist(), self.selected_products, "products")
         
     def refresh_suppliers(self, query = ""):
+        from logic import data_manager
         
-        for widget in self.supplier_frame.list_frame.winfo_children():
-            widget.destroy()
-            
         df = data_manager.search_suppliers(query)
+        self.render_list(self.supplier_frame, df["Nombre"].tolist(), self.selected_suppliers, "suppliers")
+    
+    def render_list(self, panel, names, selected, kind):
+        """ Reemplaza los checkboxes del panel; los crea por tandas para no congelar la ventana """
+        if panel.render_job is not None: # Descartar un llenado anterior que no termino
+            self.after_cancel(panel.render_job)
+            panel.render_job = None
         
-        for _, row in df.iterrows():
-            name = row["Nombre"]
-            var = tk.BooleanVar(value = (name in self.selected_suppliers))
-            cb = tk.Checkbutton(
-                self.supplier_frame.list_frame,
-                text = name,
-                variable = var,
-                command = lambda n = name, v = var: self.toggle_selection(n, v, "suppliers"),
-                anchor = "w"
-            )
-            cb.pack(fill = "x", padx = 5, pady = 2)
+        for widget in panel.list_frame.winfo_children(): # Elimna widgets anteriores
+            widget.destroy()
+        panel.rows = {}
+        
+        self._render_chunk(panel, names, 0, selected, kind)
+    
+    def _make_checkbox(self, panel, name, selected, kind):
+        var = tk.BooleanVar(value = (name in selected))
+        cb = tk.Checkbutton(
+            panel.list_frame,
+            text = name,
+            variable = var,
+            command = lambda n = name, v = var: self.toggle_selection(n, v, kind),
+            anchor = "w"
+        )
+        if kind == "products":
+            cb.bind("<Enter>", lambda e, n = name: self.show_product_preview(n))
+        panel.rows[name] = cb
+        return cb
+    
+    def _render_chunk(self, panel, names, start, selected, kind):
+        for name in names[start:start + RENDER_CHUNK]:
+            self._make_checkbox(panel, name, selected, kind).pack(fill = "x", padx = 5, pady = 2)
+        
+        if start + RENDER_CHUNK < len(names):
+            panel.render_job = self.after(1, self._render_chunk, panel, names, start + RENDER_CHUNK, selected, kind)
+        else:
+            panel.render_job = None
+    
+    def update_list(self, panel, names, selected, kind):
+        """ Deja en el panel los checkboxes de `names` tocando solo los que cambiaron """
+        rows = panel.rows
+        wanted = set(names)
+        current = [cb.cget("text") for cb in panel.list_frame.pack_slaves()]
+        
+        # Si la lista aun se estaba llenando o el orden cambio (por ejemplo se ordeno
+        # la hoja) es mas simple rehacerla
+        if panel.render_job is not None or [n for n in current if n in wanted] != [n for n in names if n in rows]:
+            self.render_list(panel, names, selected, kind)
+            return
+        
+        for name in [n for n in rows if n not in wanted]:
+            rows.pop(name).destroy()
+        
+        # Insertar las nuevas en su lugar: antes de la siguiente que ya estaba
+        following = None
+        for name in reversed(names):
+            cb = rows.get(name)
+            if cb is None:
+                cb = self._make_checkbox(panel, name, selected, kind)
+                if following is None:
+                    cb.pack(fill = "x", padx = 5, pady = 2)
+                else:
+                    cb.pack(fill = "x", padx = 5, pady = 2, before = following)
+            following = cb
             
 
+    # ========== VISTA PREVIA DE PRODUCTOS ==========
+    
+    def show_product_preview(self, name):
+        """ Muestra la miniatura y la descripcion del producto """
+        from logic import data_manager, image_store
+        
+        self._preview_name = name
+        records = data_manager.get_products_by_names([name])
+        if not records:
+            self.product_preview.config(image = "", text = "")
+            return
+        product = records[0]
+        
+        image = None
+        thumb = image_store.thumbnail_path(product.foto)
+        if thumb is not None:
+            image = self._thumbnail_image(thumb)
+        elif image_store.is_image_ref(product.foto):
+            # La miniatura se genera en segundo plano: volver a mirar cuando este lista
+            job = image_store.schedule_variants(product.foto)
+            if job is not None and not job.done():
+                self.after(LOAD_POLL_MS, self._refresh_preview, name)
+        
+        text = product.nombre
+        if product.descripcion:
+            text += f"\n{product.descripcion}"
+        if image is None and product.foto:
+            text += "\n(sin miniatura)"
+        self.product_preview.config(image = image or "", text = text)
+        self.product_preview.image = image
+    
+    def _refresh_preview(self, name):
+        if self._preview_name == name:
+            self.show_product_preview(name)
+    
+    def _thumbnail_image(self, path):
+        """ PhotoImage de una miniatura PNG (Tk la lee sin Pillow); None si no se pudo abrir """
+        image = self._thumbnails.get(path)
+        if image is None:
+            try:
+                image = tk.PhotoImage(file = str(path))
+            except tk.TclError:
+                return None
+            if len(self._thumbnails) >= THUMBNAIL_CACHE:
+                self._thumbnails.clear()
+            self._thumbnails[path] = image
+        return image
+    
     # ========== EVENTOS ==========
     
     def on_search(self, query, tittle):
@@ -198,6 +349,8 @@ class MainApp(tk.Tk):
     
     def send_action(self):
         """ Enviar los correos a los proveedores seleccionado """
+        from logic import data_manager, email_sender
+        
         products = data_manager.get_products_by_names(self.selected_products)
         suppliers = data_manager.get_suppliers_by_names(self.selected_suppliers)
         
@@ -219,34 +372,246 @@ class MainApp(tk.Tk):
                 messagebox.showwarning("Advertencia", "Por favor ingresa un email válido para CC")
                 return
             
-            email_sender.send_bulk_emails(suppliers, products, cc_email)
-            messagebox.showinfo("Exito", f"Correos enviados correctamente con CC: {cc_email}")
+            self.start_send(
+                lambda progress, cancel: email_sender.send_bulk_emails(
+                    suppliers, products, cc_email, on_progress = progress, cancel = cancel),
+                f"Correos enviados correctamente con CC: {cc_email}",
+            )
         except Exception as e:
             messagebox.showerror("Error", str(e))
     
+    def start_send(self, run, success_message):
+        """ Corre run(progress, cancel) en segundo plano y muestra su avance en una ventana """
+        from ui.dialogs import SendProgressDialog
+        
+        if self._send_job is not None:
+            messagebox.showwarning("Advertencia", "Ya hay un envío en curso, espera a que termine o cancélalo")
+            return
+        
+        # Igual que la carga del Excel: el hilo envia y avisa por la cola, y
+        # _poll_send actualiza la ventana (tkinter solo desde el hilo principal)
+        job = {"run": run, "queue": queue.Queue(), "cancel": threading.Event(), "message": success_message}
+        job["dialog"] = SendProgressDialog(self, job["cancel"].set)
+        self._send_job = job
+        threading.Thread(target = _send_worker, args = (job,), daemon = True).start()
+        self.after(LOAD_POLL_MS, self._poll_send)
+    
+    def _poll_send(self):
+        job = self._send_job
+        dialog = job["dialog"]
+        
+        result = None
+        while True:
+            try:
+                message = job["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "progress":
+                if dialog.winfo_exists():
+                    dialog.update_progress(message[1], message[2])
+            else:
+                result = message
+        
+        if result is None:
+            self.after(LOAD_POLL_MS, self._poll_send)
+            return
+        
+        self._send_job = None
+        if result[0] == "done":
+            if dialog.winfo_exists():
+                dialog.finish(result[1])
+            self.show_send_results(result[1], job["message"])
+        else:
+            if dialog.winfo_exists():
+                dialog.fail(result[1])
+            messagebox.showerror("Error", result[1])
+    
+    def show_send_results(self, results, success_message):
+        """ Muestra el resumen de un envío masivo """
+        from logic import email_sender
+        
+        sent = sum(1 for r in results if r.ok)
+        if not results:
+            messagebox.showinfo("Envío", "No había correos pendientes")
+        elif sent == len(results):
+            messagebox.showinfo("Exito", success_message)
+        elif sent == 0:
+            messagebox.showerror("Error", "No se pudo enviar ningún email.\n\n" + email_sender.format_send_summary(results))
+        else:
+            messagebox.showwarning("Advertencia", email_sender.format_send_summary(results))
+    
+    def resume_pending_sends(self):
+        """ Ofrece continuar los envíos que quedaron a medias la última vez """
+        from logic import email_sender
+        
+        try:
+            batches = email_sender.pending_batches()
+        except Exception as e:
+            print(f"No se pudo revisar la bandeja de salida: {e}")
+            return
+        if not batches:
+            return
+        
+        pending = sum(batch["pendientes"] for batch in batches)
+        if not messagebox.askyesno(
+            "Envíos pendientes",
+            f"Hay {len(batches)} envío(s) que no terminaron ({pending} correo(s) sin enviar).\n\n"
+            "¿Continuarlos ahora? No se repetirán los correos que ya salieron."
+        ):
+            return
+        self.start_send(
+            lambda progress, cancel: email_sender.resume_pending_sends(on_progress = progress, cancel = cancel),
+            "Envíos pendientes completados",
+        )
+    
     def load_database(self):
-        """ Carga un archivo Excel con productos y proveedores """
+        """ Carga un archivo Excel con productos y proveedores en segundo plano """
+        if self._load_job is not None:
+            messagebox.showwarning("Advertencia", "Ya se esta cargando un archivo, espera a que termine o cancelalo")
+            return
+        
+        file_path = filedialog.askopenfilename(
+            parent = self,
+            title = "Seleccionar archivo Excel",
+            filetypes = [("Excel files", "*.xlsx *.xls"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        # El hilo solo lee el archivo y avisa por la cola; la ventana se actualiza
+        # desde _poll_load (tkinter no se puede usar fuera del hilo principal).
+        # Hasta que termine, el catalogo anterior se sigue usando normalmente.
+        job = {"path": file_path, "queue": queue.Queue(), "cancel": threading.Event()}
+        self._load_job = job
+        threading.Thread(target = _load_catalog_worker, args = (job,), daemon = True).start()
+        
+        self.load_label.config(text = "Abriendo archivo...")
+        self.cancel_load_btn.config(state = tk.NORMAL)
+        self.load_frame.pack(pady = 5)
+        self.load_bar.start(15)
+        self.after(LOAD_POLL_MS, self._poll_load)
+    
+    def watch_external_changes(self):
+        """ Timer: si el Excel cambio fuera de la app, lo relee en segundo plano """
+        from logic import data_manager
+        
         try:
-            success = data_manager.load_excel_file()
-            if success:
-                # Refrescar las listas después de cargar
-                self.refresh_products()
-                self.refresh_suppliers()
+            if self._load_job is None and data_manager.has_external_changes():
+                job = {"queue": queue.Queue(), "cancel": threading.Event()}
+                self._load_job = job
+                threading.Thread(target = _reload_catalog_worker, args = (job,), daemon = True).start()
+                
+                self.load_label.config(text = "El archivo cambio, actualizando...")
+                self.cancel_load_btn.config(state = tk.DISABLED)
+                self.load_frame.pack(pady = 5)
+                self.load_bar.start(15)
+                self.after(LOAD_POLL_MS, self._poll_load)
         except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar la base de datos: {str(e)}")
+            print(f"Error revisando cambios del archivo: {e}")
+        
+        self.after(WATCH_INTERVAL_MS, self.watch_external_changes)
+    
+    def apply_catalog_diff(self, diff):
+        """ Actualiza solo las filas de las listas afectadas por una recarga """
+        from logic import data_manager
+        
+        if diff["products"]["added"] or diff["products"]["removed"] or diff["products"]["changed"]:
+            # Lo que ya no existe deja de estar seleccionado
+            self.selected_products.difference_update(diff["products"]["removed"])
+            names = data_manager.search_products(self.product_frame.search_var.get())["Nombre"].tolist()
+            self.update_list(self.product_frame, names, self.selected_products, "products")
+        
+        if diff["suppliers"]["added"] or diff["suppliers"]["removed"] or diff["suppliers"]["changed"]:
+            self.selected_suppliers.difference_update(diff["suppliers"]["removed"])
+            names = data_manager.search_suppliers(self.supplier_frame.search_var.get())["Nombre"].tolist()
+            self.update_list(self.supplier_frame, names, self.selected_suppliers, "suppliers")
+    
+    def cancel_load(self):
+        """ Pide cancelar la carga en curso (el catalogo actual no cambia) """
+        if self._load_job is not None:
+            self._load_job["cancel"].set()
+            self.load_label.config(text = "Cancelando...")
+            self.cancel_load_btn.config(state = tk.DISABLED)
+    
+    def _poll_load(self):
+        job = self._load_job
+        if job is None:
+            return
+        
+        result = None
+        while True:
+            try:
+                message = job["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == "progress":
+                if not job["cancel"].is_set():
+                    self.load_label.config(text = _progress_text(message[1], message[2]))
+            else:
+                result = message
+        
+        if result is None:
+            self.after(LOAD_POLL_MS, self._poll_load)
+            return
+        
+        self._load_job = None
+        self.load_bar.stop()
+        self.load_frame.pack_forget()
+        
+        if result[0] == "reloaded":
+            if result[1] is not None:
+                self.apply_catalog_diff(result[1])
+        elif result[0] == "done":
+            summary = result[1]
+            # Refrescar las listas después de cargar
+            self.refresh_products(self.product_frame.search_var.get())
+            self.refresh_suppliers(self.supplier_frame.search_var.get())
+            messagebox.showinfo("Éxito", 
+                f"Archivo Excel cargado exitosamente!\n\n"
+                f"Productos cargados: {summary['products']}\n"
+                f"Proveedores cargados: {summary['suppliers']}\n"
+                f"Archivo: {Path(summary['path']).name}"
+            )
+            if summary.get("images_error"):
+                messagebox.showwarning("Imágenes",
+                    f"No se pudieron migrar las imágenes de productos al nuevo formato: {summary['images_error']}\n\n"
+                    "El catálogo se cargó igual; se volverá a intentar la próxima vez que lo abras."
+                )
+        elif result[0] == "error":
+            messagebox.showerror("Error", result[1])
     
     def diagnose_outlook(self):
-        """ Diagnostica problemas con Outlook """
+        """ Diagnostica problemas con Outlook en segundo plano (conectar puede tardar o colgarse) """
+        if self._diagnose_job is not None:
+            return
+        
+        job = {"queue": queue.Queue()}
+        self._diagnose_job = job
+        threading.Thread(target = _diagnose_outlook_worker, args = (job,), daemon = True).start()
+        
+        self.diagnose_btn.config(text = "Diagnosticando...", state = tk.DISABLED)
+        self.after(LOAD_POLL_MS, self._poll_diagnose)
+    
+    def _poll_diagnose(self):
+        job = self._diagnose_job
         try:
-            diagnosis = email_sender.diagnose_outlook_issues()
-            messagebox.showinfo("Diagnóstico de Outlook", diagnosis)
-        except Exception as e:
-            messagebox.showerror("Error en diagnóstico", f"Error al diagnosticar Outlook: {str(e)}")
+            result = job["queue"].get_nowait()
+        except queue.Empty:
+            self.after(LOAD_POLL_MS, self._poll_diagnose)
+            return
         
+        self._diagnose_job = None
+        self.diagnose_btn.config(text = "Diagnosticar Outlook", state = tk.NORMAL)
+        if result[0] == "done":
+            messagebox.showinfo("Diagnóstico de Outlook", result[1])
+        else:
+            messagebox.showerror("Error en diagnóstico", f"Error al diagnosticar Outlook: {result[1]}")
+    
     
     # ========== CRUD ==========
     
     def create_product(self):
+        from ui.dialogs import CreateProductDialog
         CreateProductDialog(self, lambda: self.refresh_products())
     
     def delete_product(self):
@@ -259,15 +624,16 @@ class MainApp(tk.Tk):
                               f"¿Estás seguro de que deseas eliminar los siguientes productos?\n\n" + 
                               "\n".join(f"- {p}" for p in products_to_delete)):
             try:
-                for product in products_to_delete:
-                    data_manager.delete_product(product)
-                    self.selected_products.discard(product)
+                from logic import data_manager
+                data_manager.delete_products(products_to_delete)
+                self.selected_products.difference_update(products_to_delete)
                 messagebox.showinfo("Éxito", f"Se eliminaron {len(products_to_delete)} productos")
                 self.refresh_products()
             except Exception as e:
                 messagebox.showerror("Error", f"Error al eliminar productos: {str(e)}")
         
     def create_supplier(self):
+        from ui.dialogs import CreateSupplierDialog
         CreateSupplierDialog(self, lambda: self.refresh_suppliers())
     
     def delete_supplier(self):
@@ -280,14 +646,96 @@ class MainApp(tk.Tk):
                               f"¿Estás seguro de que deseas eliminar los siguientes proveedores?\n\n" + 
                               "\n".join(f"- {s}" for s in suppliers_to_delete)):
             try:
-                for supplier in suppliers_to_delete:
-                    data_manager.delete_supplier(supplier)
-                    self.selected_suppliers.discard(supplier)
+                from logic import data_manager
+                data_manager.delete_suppliers(suppliers_to_delete)
+                self.selected_suppliers.difference_update(suppliers_to_delete)
                 messagebox.showinfo("Éxito", f"Se eliminaron {len(suppliers_to_delete)} proveedores")
                 self.refresh_suppliers()
             except Exception as e:
                 messagebox.showerror("Error", f"Error al eliminar proveedores: {str(e)}")
 
+# ========== CARGA EN SEGUNDO PLANO ==========
+
+def _load_catalog_worker(job):
+    """ Corre en un hilo aparte: carga el Excel y deja los avisos en job["queue"] """
+    from logic import data_manager
+    
+    def progress(stage, **info):
+        if job["cancel"].is_set():
+            raise data_manager.LoadCancelled()
+        job["queue"].put(("progress", stage, info))
+    
+    try:
+        summary = data_manager.load_catalog_file(job["path"], progress)
+    except data_manager.LoadCancelled:
+        job["queue"].put(("cancelled",))
+        return
+    except ValueError as e:
+        job["queue"].put(("error", str(e)))
+        return
+    except Exception as e:
+        job["queue"].put(("error", f"Error al cargar el archivo Excel: {str(e)}"))
+        return
+    
+    # Fotos guardadas con el esquema anterior -> almacen por contenido (solo si queda alguna).
+    # El catalogo ya se cargo: si falla, se avisa aparte y se reintenta en la proxima carga
+    try:
+        if data_manager.needs_image_migration():
+            job["queue"].put(("progress", "images", {}))
+            data_manager.migrate_product_images()
+    except Exception as e:
+        print(f"Error migrando imagenes de productos: {e}")
+        summary = {**summary, "images_error": str(e)}
+    job["queue"].put(("done", summary))
+
+def _reload_catalog_worker(job):
+    """ Corre en un hilo aparte: relee el Excel modificado afuera y devuelve las diferencias """
+    from logic import data_manager
+    
+    def progress(stage, **info):
+        job["queue"].put(("progress", stage, info))
+    
+    try:
+        job["queue"].put(("reloaded", data_manager.reload_external_changes(progress)))
+    except Exception as e:
+        # Por ejemplo, el archivo quedo a medio guardar: el proximo chequeo lo reintenta
+        print(f"No se pudo releer el archivo modificado: {e}")
+        job["queue"].put(("reloaded", None))
+
+def _send_worker(job):
+    """ Corre en un hilo aparte: hace el envio masivo y deja el avance en job["queue"] """
+    def progress(stage, **info):
+        job["queue"].put(("progress", stage, info))
+    
+    try:
+        job["queue"].put(("done", job["run"](progress, job["cancel"])))
+    except Exception as e:
+        job["queue"].put(("error", str(e)))
+
+def _diagnose_outlook_worker(job):
+    """ Corre en un hilo aparte: la prueba de Outlook tiene tiempo maximo (ver email_sender) """
+    from logic import email_sender
+    
+    try:
+        job["queue"].put(("done", email_sender.diagnose_outlook_issues()))
+    except Exception as e:
+        job["queue"].put(("error", str(e)))
+
+def _progress_text(stage, info):
+    """ Texto de la etiqueta de avance para cada etapa de data_manager.load_catalog_file """
+    if stage == "rows":
+        return f"Leyendo hoja {info['sheet']}: {info['rows']} filas..."
+    if stage == "sheet":
+        return f"Hoja {info['sheet']} leida ({info['rows']} filas)"
+    if stage == "journal":
+        return f"Aplicando {info['rows']} cambio(s) pendientes..."
+    if stage == "index":
+        kind = "productos" if info["kind"] == "products" else "proveedores"
+        return f"Construyendo indice de {kind} ({info['rows']} filas)..."
+    if stage == "images":
+        return "Migrando imagenes de productos..."
+    return "Actualizando catalogo..."
+
 if __name__ == "__main__":
     app = MainApp()
     app.mainloop()